@@ -0,0 +1,21 @@
+"""
+Benchmark beban untuk aplikasi polling di folder 005.
+
+Aplikasi ASGI dijalankan di dalam proses yang sama terhadap database
+SQLite sementara, lalu dibebani sejumlah pemilih dan listener SSE
+bersamaan. Hasil ditulis sebagai JSON agar bisa dibandingkan antar commit.
+
+Jalankan dari folder ``005``::
+
+    python -m benchmarks polling_app --voters 1000 --concurrency 50 --listeners 20
+    python -m benchmarks polling --voters 1000 --output hasil.json
+
+Benchmark terpisah untuk laju insert Vote per strategi primary key::
+
+    python -m benchmarks.insert_rate --existing 200000 --rows 20000
+
+Perbandingan throughput vote dengan profil database (``polls_common.dbtuning``)
+aktif dan nonaktif::
+
+    python -m benchmarks.db_profile polling_app --voters 2000 --concurrency 50
+"""
@@ -0,0 +1,74 @@
+"""
+CLI benchmark. Contoh (dari folder 005)::
+
+    python -m benchmarks polling_app --voters 2000 --concurrency 50 --listeners 50 --readers 2
+    python -m benchmarks polling --output hasil-polling.json
+"""
+import argparse
+import asyncio
+import platform
+import tempfile
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+from .harness import git_commit, load_asgi_application, peak_rss_mb, setup_django, write_report
+from .load import run_vote_load
+from .projects import PROJECTS
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('project', choices=sorted(PROJECTS))
+    parser.add_argument('--voters', type=int, default=500, help='jumlah vote (satu IP per vote)')
+    parser.add_argument('--concurrency', type=int, default=20, help='request vote bersamaan')
+    parser.add_argument('--listeners', type=int, default=10, help='koneksi SSE yang dibuka')
+    parser.add_argument('--readers', type=int, default=0, help='pembaca API hasil yang berjalan terus')
+    parser.add_argument('--options', type=int, default=4, help='jumlah opsi poll')
+    parser.add_argument('--settle', type=float, default=1.0,
+                        help='detik menunggu fan-out SSE setelah vote terakhir')
+    parser.add_argument('--trace-memory', action='store_true',
+                        help='ukur puncak alokasi Python dengan tracemalloc (memperlambat)')
+    parser.add_argument('--no-db-profile', dest='db_profile', action='store_false',
+                        help='matikan tuning database (WAL, busy_timeout, transaction_mode)')
+    parser.add_argument('--output', help='tulis hasil JSON ke file ini')
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    project = PROJECTS[args.project]
+
+    with tempfile.TemporaryDirectory(prefix='polls-bench-') as tmp:
+        setup_django(project, Path(tmp) / 'bench.sqlite3', db_profile=args.db_profile)
+        app = load_asgi_application()
+
+        if args.trace_memory:
+            tracemalloc.start()
+        results = asyncio.run(run_vote_load(
+            app, project,
+            voters=args.voters,
+            concurrency=args.concurrency,
+            listeners=args.listeners,
+            readers=args.readers,
+            options=args.options,
+            settle=args.settle,
+        ))
+        if args.trace_memory:
+            results['peak_traced_mb'] = round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 1)
+            tracemalloc.stop()
+        results['peak_rss_mb'] = peak_rss_mb()
+
+    write_report({
+        'project': project.name,
+        'commit': git_commit(),
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'config': {key: value for key, value in vars(args).items() if key not in ('project', 'output')},
+        'results': results,
+    }, args.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""
+Membandingkan throughput vote dengan profil database aktif dan nonaktif.
+
+Setiap varian dijalankan di proses dan database SQLite terpisah lewat
+CLI utama (``python -m benchmarks``)::
+
+    python -m benchmarks.db_profile polling_app --voters 2000 --concurrency 50 --readers 4
+"""
+import argparse
+import json
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+
+from .harness import BASE_DIR, git_commit, write_report
+from .projects import PROJECTS
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.db_profile', description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('project', choices=sorted(PROJECTS))
+    parser.add_argument('--voters', type=int, default=1000)
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--readers', type=int, default=4, help='pembaca API hasil bersamaan')
+    parser.add_argument('--output', help='tulis hasil JSON ke file ini')
+    return parser
+
+
+def run_variant(args, db_profile):
+    command = [
+        sys.executable, '-m', 'benchmarks', args.project,
+        '--voters', str(args.voters), '--concurrency', str(args.concurrency),
+        '--readers', str(args.readers), '--listeners', '0',
+    ]
+    if not db_profile:
+        command.append('--no-db-profile')
+    output = subprocess.run(command, cwd=BASE_DIR, capture_output=True, text=True, check=True).stdout
+    return json.loads(output)['results']
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    results = {
+        'profile_off': run_variant(args, db_profile=False),
+        'profile_on': run_variant(args, db_profile=True),
+    }
+    off, on = results['profile_off']['votes_per_sec'], results['profile_on']['votes_per_sec']
+    if off and on:
+        results['speedup'] = round(on / off, 2)
+    write_report({
+        'benchmark': 'db_profile',
+        'commit': git_commit(),
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'config': {key: value for key, value in vars(args).items() if key != 'output'},
+        'results': results,
+    }, args.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,242 @@
+"""
+Perkakas dasar benchmark: setup Django, klien ASGI in-process, penghitung
+query per request, dan statistik.
+"""
+import asyncio
+import contextvars
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+# Penghitung query untuk request yang sedang berjalan. ContextVar ikut
+# terbawa ke thread sync_to_async, sehingga query dari view sync tetap
+# terhitung pada request asalnya.
+_query_counter = contextvars.ContextVar('benchmark_query_counter', default=None)
+
+
+def _count_queries(execute, sql, params, many, context):
+    counter = _query_counter.get()
+    if counter is not None:
+        counter[0] += 1
+    return execute(sql, params, many, context)
+
+
+def _install_query_counter(sender, connection, **kwargs):
+    connection.execute_wrappers.append(_count_queries)
+
+
+# OPTIONS SQLite dari profil database produksi (lihat polls_common.dbtuning)
+DB_PROFILE_OPTIONS = {'transaction_mode': 'IMMEDIATE'}
+
+
+def setup_django(project, database_path, settings_overrides=None, db_profile=True):
+    """
+    Menyiapkan Django untuk ``project`` dengan database SQLite di
+    ``database_path`` lalu menjalankan migrasi. ``db_profile=False``
+    mematikan tuning database (PRAGMA per koneksi dan ``transaction_mode``).
+    """
+    sys.path.insert(0, str(BASE_DIR / project.directory))
+    os.environ['DJANGO_SETTINGS_MODULE'] = project.settings_module
+
+    from django.conf import settings
+    settings.DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': str(database_path),
+            'OPTIONS': dict(DB_PROFILE_OPTIONS) if db_profile else {},
+        }
+    }
+    if not db_profile:
+        settings.POLLS_DB_PROFILE = {'ENABLED': False}
+    settings.DEBUG = False
+    for name, value in (settings_overrides or {}).items():
+        setattr(settings, name, value)
+
+    import django
+    from django.core.management import call_command
+    from django.db.backends.signals import connection_created
+
+    django.setup()
+    connection_created.connect(_install_query_counter)
+    call_command('migrate', verbosity=0, interactive=False)
+
+
+def load_asgi_application():
+    from django.conf import settings
+    from django.utils.module_loading import import_string
+    return import_string(settings.ASGI_APPLICATION)
+
+
+def _scope(method, path, headers, client_ip):
+    path, _, query = path.partition('?')
+    return {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': method,
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': query.encode(),
+        'root_path': '',
+        'headers': [(b'host', b'testserver')] + [
+            (name.lower().encode(), value.encode()) for name, value in headers
+        ],
+        'client': (client_ip, 50000),
+        'server': ('testserver', 80),
+    }
+
+
+@dataclass
+class Response:
+    status: int
+    body: bytes
+    queries: int
+    latency: float
+
+
+async def asgi_request(app, method, path, body=b'', headers=(), client_ip='127.0.0.1'):
+    """Mengirim satu request HTTP ke aplikasi ASGI dan menunggu responnya"""
+    scope = _scope(method, path, headers, client_ip)
+    disconnected = asyncio.Event()
+    request_sent = False
+    status = None
+    chunks = []
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {'type': 'http.request', 'body': body, 'more_body': False}
+        await disconnected.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        nonlocal status
+        if message['type'] == 'http.response.start':
+            status = message['status']
+        elif message['type'] == 'http.response.body':
+            chunks.append(message.get('body', b''))
+
+    counter = [0]
+    token = _query_counter.set(counter)
+    start = time.perf_counter()
+    try:
+        await app(scope, receive, send)
+    finally:
+        _query_counter.reset(token)
+        disconnected.set()
+    return Response(status, b''.join(chunks), counter[0], time.perf_counter() - start)
+
+
+@dataclass
+class SSEListener:
+    """Satu koneksi SSE yang menghitung event dan byte yang diterima"""
+    app: object
+    path: str
+    client_ip: str = '127.0.0.1'
+    headers: tuple = ()
+    status: int = None
+    events: int = 0
+    keepalives: int = 0
+    bytes: int = 0
+    _disconnected: asyncio.Event = field(default_factory=asyncio.Event)
+
+    async def run(self):
+        scope = _scope('GET', self.path, self.headers, self.client_ip)
+        request_sent = False
+
+        async def receive():
+            nonlocal request_sent
+            if not request_sent:
+                request_sent = True
+                return {'type': 'http.request', 'body': b'', 'more_body': False}
+            await self._disconnected.wait()
+            return {'type': 'http.disconnect'}
+
+        async def send(message):
+            if message['type'] == 'http.response.start':
+                self.status = message['status']
+            elif message['type'] == 'http.response.body':
+                chunk = message.get('body', b'')
+                self.bytes += len(chunk)
+                for block in chunk.split(b'\n\n'):
+                    if block.startswith(b':'):
+                        self.keepalives += 1
+                    elif block.strip():
+                        self.events += 1
+
+        await self.app(scope, receive, send)
+
+    def disconnect(self):
+        self._disconnected.set()
+
+
+async def stop_tasks(tasks, stop_callbacks, timeout=2):
+    """Memutus koneksi streaming, lalu membatalkan yang tidak berhenti sendiri"""
+    for stop in stop_callbacks:
+        stop()
+    done, pending = await asyncio.wait(tasks, timeout=timeout) if tasks else (set(), set())
+    for task in pending:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    return len(pending)
+
+
+def summarize(values, scale=1000):
+    """Statistik latency (default dalam milidetik)"""
+    if not values:
+        return {}
+    values = sorted(value * scale for value in values)
+    if len(values) == 1:
+        p50 = p95 = p99 = values[0]
+    else:
+        quantiles = statistics.quantiles(values, n=100, method='inclusive')
+        p50, p95, p99 = quantiles[49], quantiles[94], quantiles[98]
+    return {
+        'mean': round(statistics.fmean(values), 3),
+        'p50': round(p50, 3),
+        'p95': round(p95, 3),
+        'p99': round(p99, 3),
+        'max': round(values[-1], 3),
+    }
+
+
+def peak_rss_mb():
+    """Puncak resident memory proses ini (MB), None jika tidak tersedia"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux melaporkan KB, macOS byte
+    divisor = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return round(peak / divisor, 1)
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], cwd=BASE_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_report(report, output=None):
+    """Menulis hasil ke file JSON (jika ``output``) dan mencetak ke stdout"""
+    text = json.dumps(report, indent=2, default=str)
+    if output:
+        Path(output).write_text(text + '\n')
+    print(text)
@@ -0,0 +1,114 @@
+"""
+Benchmark laju insert Vote per strategi primary key (polling_app).
+
+Tabel vote diisi lebih dulu dengan ``--existing`` baris (tidak diukur),
+lalu ``--rows`` vote di-insert satu per satu dalam transaksi berisi
+``--batch`` vote, seperti jalur vote biasa. Tanpa ``--vote-id`` kedua
+strategi dijalankan di proses dan database terpisah lalu dibandingkan::
+
+    python -m benchmarks.insert_rate --existing 200000 --rows 20000
+    python -m benchmarks.insert_rate --vote-id uuid4 --output uuid4.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from .harness import BASE_DIR, git_commit, peak_rss_mb, setup_django, write_report
+from .projects import PROJECTS, voter_ip
+
+STRATEGIES = ('uuid4', 'uuid7')
+PRELOAD_BATCH = 5000
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.insert_rate', description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--vote-id', choices=STRATEGIES,
+                        help='jalankan satu strategi saja (default: bandingkan semua)')
+    parser.add_argument('--existing', type=int, default=100_000, help='baris vote yang sudah ada')
+    parser.add_argument('--rows', type=int, default=10_000, help='vote yang di-insert dan diukur')
+    parser.add_argument('--batch', type=int, default=100, help='vote per transaksi')
+    parser.add_argument('--output', help='tulis hasil JSON ke file ini')
+    return parser
+
+
+def measure(strategy, existing, rows, batch):
+    """Menjalankan benchmark untuk satu strategi di proses ini"""
+    project = PROJECTS['polling_app']
+    with tempfile.TemporaryDirectory(prefix='polls-insert-') as tmp:
+        database = Path(tmp) / 'bench.sqlite3'
+        setup_django(project, database, {'POLLS_VOTE_ID': strategy})
+
+        from django.db import connection, transaction
+        from polls.models import Vote
+
+        poll_id, option_ids = project.create_poll(4)
+        for start in range(0, existing, PRELOAD_BATCH):
+            Vote.objects.bulk_create([
+                Vote(poll_id=poll_id, option_id=option_ids[i % 4], voter_key=f'pre-{i}', ip_address=voter_ip(i))
+                for i in range(start, min(start + PRELOAD_BATCH, existing))
+            ])
+
+        started = time.perf_counter()
+        for start in range(0, rows, batch):
+            with transaction.atomic():
+                for i in range(start, min(start + batch, rows)):
+                    Vote.objects.create(
+                        poll_id=poll_id, option_id=option_ids[i % 4],
+                        voter_key=f'new-{i}', ip_address=voter_ip(i),
+                    )
+        elapsed = time.perf_counter() - started
+
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA page_count')
+            pages = cursor.fetchone()[0]
+        connection.close()
+        return {
+            'vote_id': strategy,
+            'rows': rows,
+            'elapsed_sec': round(elapsed, 3),
+            'rows_per_sec': round(rows / elapsed, 1) if elapsed else None,
+            'db_pages': pages,
+            'db_size_mb': round(os.path.getsize(database) / (1024 * 1024), 2),
+            'peak_rss_mb': peak_rss_mb(),
+        }
+
+
+def compare(args):
+    """Setiap strategi di subprocess sendiri: django.setup hanya sekali per proses"""
+    results = []
+    for strategy in STRATEGIES:
+        command = [
+            sys.executable, '-m', 'benchmarks.insert_rate', '--vote-id', strategy,
+            '--existing', str(args.existing), '--rows', str(args.rows), '--batch', str(args.batch),
+        ]
+        output = subprocess.run(command, cwd=BASE_DIR, capture_output=True, text=True, check=True).stdout
+        results.append(json.loads(output)['results'])
+    return results
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.vote_id:
+        results = measure(args.vote_id, args.existing, args.rows, args.batch)
+    else:
+        results = compare(args)
+    write_report({
+        'benchmark': 'insert_rate',
+        'commit': git_commit(),
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'config': {key: value for key, value in vars(args).items() if key != 'output'},
+        'results': results,
+    }, args.output)
+
+
+if __name__ == '__main__':
+    main()
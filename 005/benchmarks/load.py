@@ -0,0 +1,91 @@
+"""
+Skenario beban utama: pemilih bersamaan, pembaca hasil dan listener SSE.
+"""
+import asyncio
+import itertools
+import time
+from collections import Counter
+
+from asgiref.sync import sync_to_async
+
+from .harness import SSEListener, asgi_request, stop_tasks, summarize
+from .projects import voter_ip
+
+
+async def run_vote_load(app, project, voters=500, concurrency=20, listeners=10,
+                        readers=0, options=4, connect_delay=0.5, settle=1.0):
+    """
+    Menjalankan ``voters`` vote (masing-masing dari IP berbeda) dengan paling
+    banyak ``concurrency`` request bersamaan, sementara ``listeners`` koneksi
+    SSE dan ``readers`` pembaca hasil aktif.
+    """
+    poll_id, option_ids = await sync_to_async(project.create_poll)(options)
+
+    sse = [
+        SSEListener(app, project.stream_path(poll_id), client_ip=f'192.168.0.{i % 250 + 1}')
+        for i in range(listeners)
+    ]
+    sse_tasks = [asyncio.create_task(listener.run()) for listener in sse]
+    # Beri waktu listener tersambung sebelum vote dimulai
+    await asyncio.sleep(connect_delay if sse else 0)
+
+    vote_latencies, vote_queries, statuses = [], [], Counter()
+    semaphore = asyncio.Semaphore(concurrency)
+    choices = itertools.cycle(option_ids)
+
+    async def vote(index, option_id):
+        method, path, body, headers = project.vote_request(poll_id, option_id)
+        async with semaphore:
+            response = await asgi_request(app, method, path, body, headers, client_ip=voter_ip(index))
+        vote_latencies.append(response.latency)
+        vote_queries.append(response.queries)
+        statuses[response.status] += 1
+
+    read_latencies, read_queries = [], []
+    voting_done = asyncio.Event()
+    results_path = project.results_path(poll_id)
+
+    async def read_results():
+        while not voting_done.is_set():
+            response = await asgi_request(app, 'GET', results_path)
+            read_latencies.append(response.latency)
+            read_queries.append(response.queries)
+            await asyncio.sleep(0)
+
+    reader_tasks = [
+        asyncio.create_task(read_results()) for _ in range(readers if results_path else 0)
+    ]
+
+    start = time.perf_counter()
+    await asyncio.gather(*(vote(index, next(choices)) for index in range(voters)))
+    elapsed = time.perf_counter() - start
+    voting_done.set()
+    await asyncio.gather(*reader_tasks)
+
+    # Tunggu fan-out SSE terakhir sebelum memutus listener
+    await asyncio.sleep(settle if sse else 0)
+    stuck = await stop_tasks(sse_tasks, [listener.disconnect for listener in sse])
+
+    report = {
+        'votes': voters,
+        'elapsed_sec': round(elapsed, 3),
+        'votes_per_sec': round(voters / elapsed, 1) if elapsed else None,
+        'vote_status': {str(status): count for status, count in sorted(statuses.items())},
+        'vote_latency_ms': summarize(vote_latencies),
+        'queries_per_vote': round(sum(vote_queries) / len(vote_queries), 2) if vote_queries else None,
+    }
+    if reader_tasks:
+        report['results_requests'] = len(read_latencies)
+        report['results_latency_ms'] = summarize(read_latencies)
+        report['queries_per_results_request'] = (
+            round(sum(read_queries) / len(read_queries), 2) if read_queries else None
+        )
+    if sse:
+        report['sse'] = {
+            'listeners': len(sse),
+            'events_received': sum(listener.events for listener in sse),
+            'keepalives_received': sum(listener.keepalives for listener in sse),
+            'bytes_received': sum(listener.bytes for listener in sse),
+            'not_closed_on_disconnect': stuck,
+        }
+    return report
@@ -0,0 +1,57 @@
+"""
+Adaptor per proyek: cara membuat poll dan URL yang dipakai benchmark.
+"""
+import json
+
+
+def voter_ip(index):
+    """IP unik per pemilih agar tidak ditolak sebagai vote ganda"""
+    return f'10.{(index >> 16) & 255}.{(index >> 8) & 255}.{index & 255}'
+
+
+class PollingAppProject:
+    """005/polling_app"""
+    name = 'polling_app'
+    directory = 'polling_app'
+    settings_module = 'polling_app.settings'
+
+    def create_poll(self, options):
+        from polls.models import Poll, Option
+        poll = Poll.objects.create(title='Benchmark poll')
+        Option.objects.bulk_create([Option(poll=poll, text=f'Opsi {i}') for i in range(options)])
+        return poll.id, list(poll.options.values_list('id', flat=True))
+
+    def vote_request(self, poll_id, option_id):
+        body = json.dumps({'option_id': str(option_id)}).encode()
+        return 'POST', f'/api/vote/{poll_id}/', body, [('content-type', 'application/json')]
+
+    def results_path(self, poll_id):
+        return f'/api/results/{poll_id}/'
+
+    def stream_path(self, poll_id):
+        return f'/stream/{poll_id}/'
+
+
+class PollingProject:
+    """005/polling"""
+    name = 'polling'
+    directory = 'polling'
+    settings_module = 'polling.settings'
+
+    def create_poll(self, options):
+        from polls.models import Poll, Option
+        poll = Poll.objects.create(question='Benchmark poll')
+        Option.objects.bulk_create([Option(poll=poll, text=f'Opsi {i}') for i in range(options)])
+        return poll.id, list(poll.options.values_list('id', flat=True))
+
+    def vote_request(self, poll_id, option_id):
+        return 'POST', f'/vote/{option_id}/', b'', []
+
+    def results_path(self, poll_id):
+        return f'/results/{poll_id}/'
+
+    def stream_path(self, poll_id):
+        return f'/sse/{poll_id}/'
+
+
+PROJECTS = {project.name: project for project in (PollingAppProject(), PollingProject())}
@@ -1,10 +1,20 @@
 # polling/routing.py
+import os
+
+from django.core.asgi import get_asgi_application
+from django.urls import path, re_path
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'polling.settings')
+
+# Inisialisasi Django sebelum mengimpor consumer yang memakai model
+django_asgi_app = get_asgi_application()
+
 from channels.routing import ProtocolTypeRouter, URLRouter
-from django.urls import path
 from sse.consumers import SSEConsumer
 
 application = ProtocolTypeRouter({
     "http": URLRouter([
         path('sse/<uuid:poll_id>/', SSEConsumer.as_asgi()),
+        re_path(r'', django_asgi_app),
     ]),
-})
\ No newline at end of file
+})
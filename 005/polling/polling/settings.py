@@ -43,6 +43,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'polls_common.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -84,9 +85,26 @@ DATABASES = {
         'PASSWORD': 'sevima',
         'HOST': 'localhost',
         'PORT': '5431',
+        # Pakai ulang koneksi antar request alih-alih connect per request;
+        # koneksi yang putus dideteksi sebelum dipakai. Jika dijalankan di
+        # ASGI dengan Django >= 5.1 dan psycopg 3, lebih baik ganti dengan
+        # pool bawaan: 'OPTIONS': {'pool': True} dan CONN_MAX_AGE 0.
+        'CONN_MAX_AGE': 60,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'connect_timeout': 5,
+        },
     }
 }
 
+# Tuning per koneksi, mis. parameter sesi PostgreSQL (lihat polls_common.dbtuning)
+POLLS_DB_PROFILE = {
+    'ENABLED': True,
+    'POSTGRES_SETTINGS': {
+        'idle_in_transaction_session_timeout': '60s',
+    },
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -131,9 +149,27 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 
 # Channels Configuration
-ASGI_APPLICATION = 'project.routing.application'
+ASGI_APPLICATION = 'polling.routing.application'
 CHANNEL_LAYERS = {
     "default": {
         "BACKEND": "channels.layers.InMemoryChannelLayer",
     }
-}
\ No newline at end of file
+}
+
+# Interval (detik) watcher SSE memeriksa vote baru. Satu watcher per poll per
+# proses, dipakai bersama oleh semua koneksi SSE poll tersebut.
+POLLS_SSE_POLL_INTERVAL = 1
+
+# Batas koneksi SSE per proses (lebih dari ini ditolak 503), interval (detik)
+# komentar keep-alive saat tidak ada update, dan batas waktu (detik) satu
+# pengiriman sebelum klien yang tidak membaca diputus
+POLLS_SSE_MAX_CONNECTIONS = 1000
+POLLS_SSE_HEARTBEAT = 15
+POLLS_SSE_SEND_TIMEOUT = 10
+
+# Instrumentasi per view yang diekspos di /metrics (lihat polls_common.metrics).
+# Isi SLOW_REQUEST_MS (mis. 500) untuk mencatat SQL dari query paling lambat.
+POLLS_METRICS = {
+    'SLOW_REQUEST_MS': None,
+    'SLOW_QUERY_COUNT': 5,
+}
@@ -0,0 +1,16 @@
+"""
+Settings untuk menjalankan test tanpa server PostgreSQL: sama dengan
+``polling.settings`` tetapi memakai SQLite, seperti benchmark::
+
+    python manage.py test --settings=polling.test_settings
+    DJANGO_SETTINGS_MODULE=polling.test_settings python -m pytest
+"""
+from .settings import *  # noqa: F401,F403
+from .settings import BASE_DIR
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'db.sqlite3',
+    }
+}
@@ -0,0 +1,18 @@
+from django.apps import AppConfig
+
+
+class PollsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'polls'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+        from django.db.models.signals import post_delete, post_save
+        from polls_common.dbtuning import configure_connection
+
+        from .changes import option_deleted, vote_saved
+        from .models import Option, Vote
+
+        post_save.connect(vote_saved, sender=Vote)
+        post_delete.connect(option_deleted, sender=Option)
+        connection_created.connect(configure_connection, dispatch_uid='polls.dbtuning')
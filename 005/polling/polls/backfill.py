@@ -0,0 +1,93 @@
+# polls/backfill.py
+"""
+Backfill kolom denormalisasi secara bertahap.
+
+Setiap potongan adalah satu statement ``UPDATE`` berbasis set (nilai dari
+subquery/ekspresi, bukan ``save()`` per baris) untuk rentang primary key
+sebanyak ``chunk_size`` baris, dan di-commit sendiri. Baris yang sudah
+benar dilewati lewat filter ``pending``, jadi backfill yang terhenti aman
+dijalankan ulang; untuk melompati bagian yang sudah selesai, teruskan pk
+terakhir dari laporan progres sebagai ``start``.
+
+Backfill baru didaftarkan di ``BACKFILLS`` sebagai fungsi ``(apps, **opsi)``
+agar bisa dipakai dari migrasi (model historis) maupun command
+``manage.py backfill``.
+"""
+import logging
+
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import F, OuterRef, Q, Subquery
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 10_000
+
+
+class Backfill:
+    def __init__(self, model, values, pending=None, chunk_size=DEFAULT_CHUNK_SIZE, using=DEFAULT_DB_ALIAS):
+        self.model = model
+        self.values = values
+        self.pending = pending
+        self.chunk_size = chunk_size
+        self.using = using
+
+    def chunks(self, start=None):
+        """
+        Batas ``(lower, upper)`` setiap potongan: pk > lower dan pk <= upper.
+        ``upper`` None untuk potongan terakhir (sampai akhir tabel).
+        """
+        lower = start
+        while True:
+            keys = self.model._default_manager.using(self.using).order_by('pk')
+            if lower is not None:
+                keys = keys.filter(pk__gt=lower)
+            # Satu probe index untuk batas atas potongan
+            upper = list(keys.values_list('pk', flat=True)[self.chunk_size - 1:self.chunk_size])
+            upper = upper[0] if upper else None
+            yield lower, upper
+            if upper is None:
+                return
+            lower = upper
+
+    def run(self, start=None, progress=None):
+        """
+        Menjalankan backfill mulai setelah pk ``start``. ``progress`` dipanggil
+        setelah setiap potongan di-commit dengan ``(pk_terakhir, diperbarui,
+        total_diperbarui)``. Mengembalikan total baris yang diperbarui.
+        """
+        progress = progress or log_progress
+        total = 0
+        for lower, upper in self.chunks(start):
+            rows = self.model._default_manager.using(self.using).all()
+            if lower is not None:
+                rows = rows.filter(pk__gt=lower)
+            if upper is not None:
+                rows = rows.filter(pk__lte=upper)
+            if self.pending is not None:
+                rows = rows.filter(self.pending)
+            with transaction.atomic(using=self.using):
+                updated = rows.update(**self.values)
+            total += updated
+            progress(upper, updated, total)
+        return total
+
+
+def log_progress(last_pk, updated, total):
+    logger.info('Backfill sampai pk %s: %d baris diperbarui (total %d)', last_pk or 'akhir', updated, total)
+
+
+def vote_poll(apps, **options):
+    """``Vote.poll`` diisi dari ``Vote.option.poll``"""
+    Vote = apps.get_model('polls', 'Vote')
+    Option = apps.get_model('polls', 'Option')
+    return Backfill(
+        Vote,
+        values={'poll_id': Subquery(Option.objects.filter(pk=OuterRef('option_id')).values('poll_id')[:1])},
+        pending=Q(poll__isnull=True) | ~Q(poll_id=F('option__poll_id')),
+        **options,
+    )
+
+
+BACKFILLS = {
+    'vote_poll': vote_poll,
+}
@@ -0,0 +1,52 @@
+"""
+Deteksi perubahan poll tanpa memuat baris Vote.
+
+Versi perubahan sebuah poll adalah kolom ``Poll.version``, yang dinaikkan
+setiap vote masuk (``post_save`` Vote) atau dihapus (``VoteQuerySet.delete``
+dan penghapusan Option). Probe perubahan cukup membaca satu kolom lewat
+primary key, berapa pun jumlah vote poll tersebut.
+
+Versi dinaikkan setelah perubahan vote itu sendiri di transaksi yang sama,
+jadi vote yang commit belakangan (termasuk yang id-nya lebih kecil) selalu
+terlihat bersama versi barunya.
+
+Pemakai (consumer SSE, cache hasil, dashboard) menyimpan versi terakhir
+yang dilihat lalu bertanya "berubah sejak versi ini?".
+"""
+from django.db.models import F
+
+from .models import Poll
+
+
+def bump_version(poll_ids):
+    Poll.objects.filter(pk__in=poll_ids).update(version=F('version') + 1)
+
+
+def vote_saved(sender, instance, created, **kwargs):
+    """Receiver post_save Vote"""
+    if created:
+        bump_version([instance.poll_id])
+
+
+def option_deleted(sender, instance, origin=None, **kwargs):
+    """
+    Receiver post_delete Option: vote opsi ikut terhapus lewat cascade.
+    Dilewati jika yang dihapus adalah Poll-nya sendiri.
+    """
+    if isinstance(origin, Poll) or getattr(origin, 'model', None) is Poll:
+        return
+    bump_version([instance.poll_id])
+
+
+def vote_version(poll_id):
+    """Versi perubahan poll saat ini; melempar ``Poll.DoesNotExist``"""
+    return Poll.objects.values_list('version', flat=True).get(pk=poll_id)
+
+
+def changed_since(poll_id, since):
+    """
+    Versi baru jika poll berubah dari versi ``since``, selain itu None.
+    ``since`` None berarti belum pernah dilihat, jadi versi selalu dikembalikan.
+    """
+    version = vote_version(poll_id)
+    return version if version != since else None
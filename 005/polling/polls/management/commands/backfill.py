@@ -0,0 +1,29 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from polls.backfill import BACKFILLS, DEFAULT_CHUNK_SIZE
+
+
+class Command(BaseCommand):
+    help = 'Menjalankan backfill kolom denormalisasi per potongan primary key'
+
+    def add_arguments(self, parser):
+        parser.add_argument('name', choices=sorted(BACKFILLS))
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+        parser.add_argument(
+            '--start', type=int, metavar='PK',
+            help='Lanjutkan setelah pk ini (pk terakhir dari progres sebelumnya)',
+        )
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, name, chunk_size, start, database, **options):
+        if chunk_size < 1:
+            raise CommandError('--chunk-size harus lebih dari 0')
+        backfill = BACKFILLS[name](apps, chunk_size=chunk_size, using=database)
+
+        def progress(last_pk, updated, total):
+            self.stdout.write(f'sampai pk {last_pk or "akhir"}: {updated} diperbarui (total {total})')
+
+        total = backfill.run(start=start, progress=progress)
+        self.stdout.write(self.style.SUCCESS(f'Backfill {name} selesai: {total} baris diperbarui.'))
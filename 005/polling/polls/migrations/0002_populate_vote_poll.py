@@ -1,17 +1,22 @@
 # polls/migrations/0002_populate_vote_poll.py
 from django.db import migrations
 
+from polls.backfill import vote_poll
+
+
 def populate_vote_poll(apps, schema_editor):
-    Vote = apps.get_model('polls', 'Vote')
-    for vote in Vote.objects.all():
-        vote.poll = vote.option.poll
-        vote.save()
+    # UPDATE berbasis set per potongan pk; setiap potongan di-commit sendiri
+    vote_poll(apps, using=schema_editor.connection.alias).run()
+
 
 class Migration(migrations.Migration):
+    # Tanpa transaksi pembungkus agar progres per potongan tersimpan
+    atomic = False
+
     dependencies = [
         ('polls', '0001_initial'),
     ]
 
     operations = [
-        migrations.RunPython(populate_vote_poll),
-    ]
\ No newline at end of file
+        migrations.RunPython(populate_vote_poll, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('polls', '0002_populate_vote_poll'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='vote',
+            index=models.Index(fields=['poll', 'id'], name='vote_poll_seq_idx'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+    Deteksi perubahan memakai ``Poll.version`` (lihat polls.changes);
+    index ``(poll, id)`` untuk probe MAX(id) tidak dipakai lagi.
+    """
+
+    dependencies = [
+        ('polls', '0003_vote_poll_seq_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='poll',
+            name='version',
+            field=models.PositiveBigIntegerField(default=0, editable=False),
+        ),
+        migrations.RemoveIndex(
+            model_name='vote',
+            name='vote_poll_seq_idx',
+        ),
+    ]
@@ -1,29 +1,54 @@
 # polls/models.py
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F
 import uuid
 
 class Poll(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     question = models.CharField(max_length=200)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Naik setiap ada vote masuk atau dihapus (lihat polls.changes)
+    version = models.PositiveBigIntegerField(default=0, editable=False)
 
 class Option(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     poll = models.ForeignKey(Poll, related_name='options', on_delete=models.CASCADE)
     text = models.CharField(max_length=100)
 
+class VoteQuerySet(models.QuerySet):
+    def delete(self):
+        # Versi poll dinaikkan setelah vote terhapus; cascade dari Poll tidak lewat sini
+        with transaction.atomic(using=self.db):
+            poll_ids = list(self.order_by().values_list('poll_id', flat=True).distinct())
+            deleted = super().delete()
+            Poll.objects.using(self.db).filter(pk__in=poll_ids).update(version=F('version') + 1)
+        return deleted
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
 class Vote(models.Model):
     option = models.ForeignKey(Option, related_name='votes', on_delete=models.CASCADE)
     poll = models.ForeignKey(Poll, related_name='votes', on_delete=models.CASCADE)  # Field langsung
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = VoteQuerySet.as_manager()
+
     class Meta:
         indexes = [
             models.Index(fields=['poll', 'option']),  # Composite Index yang benar
         ]
         
     def save(self, *args, **kwargs):
-        # Pastikan poll diisi dari option jika belum ada
+        # Pastikan poll diisi dari option jika belum ada: pakai Option yang sudah
+        # dimuat, selain itu cukup baca poll_id-nya tanpa memuat Option maupun Poll
         if not self.poll_id and self.option_id:
-            self.poll = self.option.poll
-        super().save(*args, **kwargs)
\ No newline at end of file
+            if Vote.option.is_cached(self):
+                self.poll_id = self.option.poll_id
+            else:
+                self.poll_id = Option.objects.values_list('poll_id', flat=True).get(pk=self.option_id)
+        super().save(*args, **kwargs)
+
+    def delete(self, using=None, keep_parents=False):
+        # Lewat queryset agar versi poll ikut naik
+        return Vote.objects.using(using or self._state.db).filter(pk=self.pk).delete()
@@ -0,0 +1,191 @@
+import uuid
+from io import StringIO
+
+from django.apps import apps
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db.models import F
+from django.test import TestCase
+from django.urls import reverse
+
+from . import backfill
+from .changes import changed_since, vote_version
+from .models import Poll, Option, Vote
+
+
+class PollTestMixin:
+    """Helper untuk membuat poll beserta opsinya"""
+
+    def create_poll(self, question='Makanan favorit?', options=('Sate', 'Rendang', 'Soto')):
+        poll = Poll.objects.create(question=question)
+        for text in options:
+            Option.objects.create(poll=poll, text=text)
+        return poll
+
+
+class VoteModelTests(PollTestMixin, TestCase):
+    def test_poll_filled_from_option_id(self):
+        poll = self.create_poll()
+        option_id = poll.options.values_list('id', flat=True).first()
+        # Satu baca poll_id + satu insert + naikkan versi, tanpa memuat Option
+        with self.assertNumQueries(3):
+            vote = Vote.objects.create(option_id=option_id)
+        self.assertEqual(vote.poll_id, poll.id)
+
+    def test_poll_filled_from_loaded_option(self):
+        poll = self.create_poll()
+        option = poll.options.first()
+        with self.assertNumQueries(2):
+            vote = Vote.objects.create(option=option)
+        self.assertEqual(vote.poll_id, poll.id)
+
+
+class VoteViewTests(PollTestMixin, TestCase):
+    def setUp(self):
+        self.poll = self.create_poll()
+        self.sate = self.poll.options.get(text='Sate')
+
+    def test_vote_is_inserted(self):
+        response = self.client.post(reverse('vote', args=[self.sate.id]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'status': 'success'})
+
+        vote = Vote.objects.get()
+        self.assertEqual((vote.option_id, vote.poll_id), (self.sate.id, self.poll.id))
+
+    def test_unknown_option_is_404(self):
+        response = self.client.post(reverse('vote', args=[uuid.uuid4()]))
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(Vote.objects.exists())
+
+    def test_get_is_405(self):
+        response = self.client.get(reverse('vote', args=[self.sate.id]))
+        self.assertEqual(response.status_code, 405)
+        self.assertFalse(Vote.objects.exists())
+
+
+class PollResultsViewTests(PollTestMixin, TestCase):
+    def test_results_count_votes_per_option(self):
+        poll = self.create_poll()
+        rendang, sate, soto = poll.options.order_by('text')
+        for option in (sate, sate, rendang):
+            Vote.objects.create(option=option)
+        # Vote poll lain tidak ikut dihitung
+        Vote.objects.create(option=self.create_poll('Minuman favorit?').options.first())
+
+        response = self.client.get(reverse('poll_results', args=[poll.id]))
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['question'], 'Makanan favorit?')
+        self.assertEqual(
+            sorted((option['text'], option['votes']) for option in data['options']),
+            [('Rendang', 1), ('Sate', 2), ('Soto', 0)],
+        )
+        self.assertEqual({option['id'] for option in data['options']}, {str(o.id) for o in (sate, rendang, soto)})
+
+    def test_unknown_poll_is_404(self):
+        response = self.client.get(reverse('poll_results', args=[uuid.uuid4()]))
+        self.assertEqual(response.status_code, 404)
+
+
+class ChangeDetectionTests(PollTestMixin, TestCase):
+    def test_new_votes_change_version(self):
+        poll = self.create_poll()
+        sate = poll.options.first()
+        # Poll tanpa vote tetap punya versi untuk pemanggil yang belum melihatnya
+        empty = changed_since(poll.id, None)
+        self.assertEqual(empty, 0)
+        self.assertIsNone(changed_since(poll.id, empty))
+
+        Vote.objects.create(option=sate)
+        version = changed_since(poll.id, empty)
+        self.assertIsNotNone(version)
+        self.assertIsNone(changed_since(poll.id, version))
+
+    def test_probe_is_one_query_regardless_of_votes(self):
+        poll = self.create_poll()
+        Vote.objects.bulk_create(Vote(option=poll.options.first(), poll=poll) for _ in range(50))
+        with self.assertNumQueries(1):
+            vote_version(poll.id)
+
+    def test_late_committed_lower_id_is_detected(self):
+        poll = self.create_poll()
+        sate = poll.options.first()
+        Vote.objects.create(id=100, option=sate)
+        version = vote_version(poll.id)
+
+        # Transaksi dengan id lebih kecil yang commit belakangan
+        Vote.objects.create(id=50, option=sate)
+        self.assertIsNotNone(changed_since(poll.id, version))
+
+    def test_deleted_votes_are_detected(self):
+        poll = self.create_poll()
+        sate, rendang, _ = poll.options.all()
+        first = Vote.objects.create(option=sate)
+        Vote.objects.create(option=rendang)
+
+        version = vote_version(poll.id)
+        first.delete()
+        self.assertIsNotNone(changed_since(poll.id, version))
+
+        version = vote_version(poll.id)
+        Vote.objects.filter(poll=poll).delete()
+        self.assertIsNotNone(changed_since(poll.id, version))
+
+    def test_deleted_option_is_detected(self):
+        poll = self.create_poll()
+        sate = poll.options.first()
+        Vote.objects.create(option=sate)
+        version = vote_version(poll.id)
+
+        sate.delete()
+        self.assertIsNotNone(changed_since(poll.id, version))
+
+    def test_deleted_poll_raises(self):
+        poll = self.create_poll()
+        Vote.objects.create(option=poll.options.first())
+        poll.delete()
+        with self.assertRaises(Poll.DoesNotExist):
+            vote_version(poll.id)
+
+
+class BackfillTests(PollTestMixin, TestCase):
+    def setUp(self):
+        self.poll = self.create_poll()
+        other = self.create_poll('Minuman favorit?')
+        option = self.poll.options.first()
+        Vote.objects.bulk_create(Vote(option=option, poll=other) for _ in range(5))
+        self.pks = list(Vote.objects.order_by('pk').values_list('pk', flat=True))
+
+    def stale_pks(self):
+        return list(
+            Vote.objects.exclude(poll_id=F('option__poll_id')).order_by('pk').values_list('pk', flat=True)
+        )
+
+    def test_runs_in_chunks(self):
+        calls = []
+        job = backfill.vote_poll(apps, chunk_size=2)
+        total = job.run(progress=lambda *args: calls.append(args))
+
+        self.assertEqual(total, 5)
+        self.assertEqual(self.stale_pks(), [])
+        self.assertEqual(calls, [
+            (self.pks[1], 2, 2),
+            (self.pks[3], 2, 4),
+            (None, 1, 5),
+        ])
+
+    def test_rerun_skips_correct_rows(self):
+        backfill.vote_poll(apps, chunk_size=2).run(progress=lambda *args: None)
+        self.assertEqual(backfill.vote_poll(apps, chunk_size=2).run(progress=lambda *args: None), 0)
+
+    def test_command_resumes_after_start(self):
+        out = StringIO()
+        call_command('backfill', 'vote_poll', chunk_size=2, start=self.pks[1], stdout=out)
+
+        self.assertEqual(self.stale_pks(), self.pks[:2])
+        self.assertIn('3 baris diperbarui', out.getvalue())
+
+    def test_command_rejects_empty_chunk(self):
+        with self.assertRaises(CommandError):
+            call_command('backfill', 'vote_poll', chunk_size=0, stdout=StringIO())
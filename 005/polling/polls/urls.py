@@ -6,4 +6,5 @@ urlpatterns = [
     path('create/', views.create_poll, name='create_poll'),
     path('poll/<uuid:poll_id>/', views.poll_detail, name='poll_detail'),
     path('vote/<uuid:option_id>/', views.vote, name='vote'),
+    path('results/<uuid:poll_id>/', views.poll_results, name='poll_results'),
 ]
\ No newline at end of file
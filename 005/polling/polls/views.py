@@ -1,9 +1,12 @@
 # polls/views.py
-from django.shortcuts import render, get_object_or_404
+from django.shortcuts import render, get_object_or_404, aget_object_or_404
 from .models import Poll, Option, Vote
 from .forms import PollForm
 import json
-from django.http import JsonResponse
+from django.db.models import Count
+from django.http import Http404, JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
 
 def create_poll(request):
     if request.method == 'POST':
@@ -21,8 +24,26 @@ def poll_detail(request, poll_id):
     poll = get_object_or_404(Poll, id=poll_id)
     return render(request, 'poll.html', {'poll': poll})
 
-def vote(request, option_id):
-    option = get_object_or_404(Option, id=option_id)
-    # Buat vote dengan mengisi poll secara eksplisit
-    Vote.objects.create(option=option, poll=option.poll)
-    return JsonResponse({'status': 'success'})
\ No newline at end of file
+@csrf_exempt
+@require_POST
+async def vote(request, option_id):
+    # poll_id diambil dalam query yang sama dengan opsi: satu baca + satu insert
+    poll_id = await Option.objects.filter(id=option_id).values_list('poll_id', flat=True).afirst()
+    if poll_id is None:
+        raise Http404('Opsi tidak ditemukan')
+    await Vote.objects.acreate(option_id=option_id, poll_id=poll_id)
+    return JsonResponse({'status': 'success'})
+
+async def poll_results(request, poll_id):
+    poll = await aget_object_or_404(Poll, id=poll_id)
+    options = Option.objects.filter(poll_id=poll.id).annotate(vote_count=Count('votes'))
+    return JsonResponse({
+        'question': poll.question,
+        'options': [
+            {
+                'id': str(opt.id),
+                'text': opt.text,
+                'votes': opt.vote_count
+            } async for opt in options
+        ]
+    })
\ No newline at end of file
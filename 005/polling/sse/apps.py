@@ -0,0 +1,12 @@
+from django.apps import AppConfig
+
+
+class SseConfig(AppConfig):
+    name = 'sse'
+
+    def ready(self):
+        from polls_common.metrics import register_collector
+
+        from .consumers import sse_metrics
+
+        register_collector(sse_metrics)
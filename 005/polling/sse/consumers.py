@@ -1,54 +1,233 @@
 # sse/consumers.py
 import asyncio
 import json
+import logging
 from channels.generic.http import AsyncHttpConsumer
 from channels.db import database_sync_to_async
-from polls.models import Poll, Vote
+from django.conf import settings
+from polls.changes import changed_since
+from polls.models import Poll, Option
 from django.db.models import Prefetch, Count
 
+logger = logging.getLogger(__name__)
+
+
+class Listener:
+    """
+    Slot event untuk satu koneksi SSE. Setiap event berisi data poll
+    lengkap, jadi koneksi yang lambat cukup menerima event terbaru. Event
+    None berarti stream harus diakhiri (poll dihapus).
+    """
+
+    def __init__(self):
+        self.event = None
+        self.ready = asyncio.Event()
+
+    def push(self, event):
+        self.event = event
+        self.ready.set()
+
+    async def get(self):
+        await self.ready.wait()
+        self.ready.clear()
+        return self.event
+
+
+class PollWatcher:
+    """
+    Satu task per poll per proses: cek vote baru sekali per interval,
+    membangun payload sekali, lalu membagikannya ke semua koneksi.
+    """
+
+    def __init__(self, poll_id):
+        self.poll_id = poll_id
+        self.listeners = set()
+        self.last_event = None
+        self.closed = False
+        self.task = None
+
+    def start(self):
+        self.task = asyncio.create_task(self.run())
+
+    async def run(self):
+        interval = getattr(settings, 'POLLS_SSE_POLL_INTERVAL', 1)
+        # None: payload pertama selalu dibangun, juga untuk poll tanpa vote
+        version = None
+        while True:
+            try:
+                # Probe satu kolom lewat primary key; data lengkap hanya dibangun jika vote berubah
+                changed = await database_sync_to_async(changed_since)(self.poll_id, version)
+                if changed is not None:
+                    data = await get_poll_data(self.poll_id)
+                    self.last_event = f"data: {json.dumps(data)}\n\n".encode('utf-8')
+                    for listener in self.listeners:
+                        listener.push(self.last_event)
+                    # Dicatat setelah payload terkirim; jika gagal, dicoba lagi di putaran berikutnya
+                    version = changed
+            except Poll.DoesNotExist:
+                self.close()
+                return
+            except Exception:
+                # Error DB sesaat tidak boleh menghentikan stream semua koneksi
+                logger.exception('Gagal memeriksa vote poll %s', self.poll_id)
+            await asyncio.sleep(interval)
+
+    def close(self):
+        """Poll dihapus: akhiri semua stream dan lepas dari registry"""
+        self.closed = True
+        if _watchers.get(self.poll_id) is self:
+            del _watchers[self.poll_id]
+        for listener in self.listeners:
+            listener.push(None)
+
+    def add_listener(self):
+        listener = Listener()
+        if self.closed:
+            listener.push(None)
+        elif self.last_event is not None:
+            # Koneksi baru langsung menerima data terakhir tanpa query
+            listener.push(self.last_event)
+        self.listeners.add(listener)
+        return listener
+
+
+# Watcher aktif di proses ini, per poll_id
+_watchers = {}
+
+
+def subscribe(poll_id):
+    """Mendaftarkan listener ke watcher poll, membuat watcher jika belum ada"""
+    watcher = _watchers.get(poll_id)
+    if watcher is None:
+        watcher = _watchers[poll_id] = PollWatcher(poll_id)
+        watcher.start()
+    return watcher, watcher.add_listener()
+
+
+def unsubscribe(watcher, listener):
+    """Melepas listener; watcher dihentikan saat listener terakhir pergi"""
+    watcher.listeners.discard(listener)
+    if not watcher.listeners:
+        watcher.task.cancel()
+        if _watchers.get(watcher.poll_id) is watcher:
+            del _watchers[watcher.poll_id]
+
+
+# Statistik koneksi SSE di proses ini untuk /metrics
+stats = {
+    'connections': 0,
+    'rejected': 0,
+    'send_timeouts': 0,
+}
+
+
 class SSEConsumer(AsyncHttpConsumer):
+    async def __call__(self, scope, receive, send):
+        # Selama handle() berjalan, dispatcher channels tidak membaca pesan
+        # klien; receive disimpan agar handle bisa mendeteksi http.disconnect
+        self.receive = receive
+        return await super().__call__(scope, receive, send)
+
     async def handle(self, body):
         poll_id = self.scope['url_route']['kwargs']['poll_id']
-        await self.send_headers(headers=[
-            (b'Content-Type', b'text/event-stream'),
-            (b'Cache-Control', b'no-cache'),
-            (b'Connection', b'keep-alive'),
-        ])
-        last_vote_id = 0
-        
+        max_connections = getattr(settings, 'POLLS_SSE_MAX_CONNECTIONS', 1000)
+        if stats['connections'] >= max_connections:
+            stats['rejected'] += 1
+            await self.send_response(503, b'Terlalu banyak koneksi SSE, coba lagi nanti', headers=[
+                (b'Content-Type', b'text/plain; charset=utf-8'),
+                (b'Retry-After', b'5'),
+            ])
+            return
+        if not await poll_exists(poll_id):
+            await self.send_response(404, b'Poll tidak ditemukan', headers=[
+                (b'Content-Type', b'text/plain; charset=utf-8'),
+            ])
+            return
+
+        stats['connections'] += 1
+        try:
+            await self.send_headers(headers=[
+                (b'Content-Type', b'text/event-stream'),
+                (b'Cache-Control', b'no-cache'),
+                (b'Connection', b'keep-alive'),
+            ])
+            stream = asyncio.create_task(self.stream(poll_id))
+            disconnect = asyncio.create_task(self.wait_for_disconnect())
+            # Berhenti saat klien pergi atau stream selesai (mis. send timeout)
+            await asyncio.wait({stream, disconnect}, return_when=asyncio.FIRST_COMPLETED)
+            for task in (stream, disconnect):
+                task.cancel()
+            await asyncio.gather(stream, disconnect, return_exceptions=True)
+        finally:
+            stats['connections'] -= 1
+
+    async def wait_for_disconnect(self):
         while True:
-            # Gunakan field poll langsung untuk query
-            new_votes = await self.get_new_votes(poll_id, last_vote_id)
-            if new_votes:
-                last_vote_id = new_votes[-1].id
-                data = await self.get_poll_data(poll_id)
-                event = f"data: {json.dumps(data)}\n\n"
-                await self.send_body(event.encode('utf-8'), more_body=True)
-            await asyncio.sleep(1)
-
-    @database_sync_to_async
-    def get_new_votes(self, poll_id, last_vote_id):
-        # Query menggunakan field poll langsung
-        return list(Vote.objects.filter(
-            poll_id=poll_id, 
-            id__gt=last_vote_id
-        ).order_by('id')[:100])  # Batasi untuk menghindari overload
-
-    @database_sync_to_async
-    def get_poll_data(self, poll_id):
-        poll = Poll.objects.prefetch_related(
-            Prefetch(
-                'options',
-                queryset=Option.objects.annotate(vote_count=Count('votes'))
-        ).get(id=poll_id)
-        
-        return {
-            'question': poll.question,
-            'options': [
-                {
-                    'id': str(opt.id),
-                    'text': opt.text,
-                    'votes': opt.vote_count
-                } for opt in poll.options.all()
-            ]
-        }
\ No newline at end of file
+            message = await self.receive()
+            if message['type'] == 'http.disconnect':
+                return
+
+    async def stream(self, poll_id):
+        heartbeat = getattr(settings, 'POLLS_SSE_HEARTBEAT', 15)
+        send_timeout = getattr(settings, 'POLLS_SSE_SEND_TIMEOUT', 10)
+        watcher, listener = subscribe(poll_id)
+        try:
+            while True:
+                try:
+                    event = await asyncio.wait_for(listener.get(), heartbeat)
+                except asyncio.TimeoutError:
+                    # Komentar SSE agar proxy tidak memutus koneksi yang diam
+                    event = b': keep-alive\n\n'
+                try:
+                    if event is None:
+                        # Poll dihapus: akhiri response
+                        await asyncio.wait_for(self.send_body(b'', more_body=False), send_timeout)
+                        return
+                    await asyncio.wait_for(self.send_body(event, more_body=True), send_timeout)
+                except asyncio.TimeoutError:
+                    # Klien tidak membaca: putuskan alih-alih menumpuk buffer
+                    stats['send_timeouts'] += 1
+                    logger.info('Koneksi SSE poll %s diputus: send timeout', poll_id)
+                    return
+        finally:
+            unsubscribe(watcher, listener)
+
+
+def sse_metrics():
+    """Baris metrik Prometheus untuk ``/metrics``"""
+    return [
+        '# TYPE polls_sse_connections gauge',
+        f'polls_sse_connections {stats["connections"]}',
+        '# TYPE polls_sse_watchers gauge',
+        f'polls_sse_watchers {len(_watchers)}',
+        '# TYPE polls_sse_rejected_total counter',
+        f'polls_sse_rejected_total {stats["rejected"]}',
+        '# TYPE polls_sse_send_timeouts_total counter',
+        f'polls_sse_send_timeouts_total {stats["send_timeouts"]}',
+    ]
+
+
+@database_sync_to_async
+def poll_exists(poll_id):
+    return Poll.objects.filter(id=poll_id).exists()
+
+
+@database_sync_to_async
+def get_poll_data(poll_id):
+    poll = Poll.objects.prefetch_related(
+        Prefetch(
+            'options',
+            queryset=Option.objects.annotate(vote_count=Count('votes'))
+        )
+    ).get(id=poll_id)
+
+    return {
+        'question': poll.question,
+        'options': [
+            {
+                'id': str(opt.id),
+                'text': opt.text,
+                'votes': opt.vote_count
+            } for opt in poll.options.all()
+        ]
+    }
@@ -0,0 +1,168 @@
+import asyncio
+import json
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from asgiref.testing import ApplicationCommunicator
+from django.test import TestCase, override_settings
+
+from polls.models import Poll, Option, Vote
+
+from . import consumers
+
+
+@override_settings(POLLS_SSE_POLL_INTERVAL=0.01)
+class SSEConsumerTests(TestCase):
+    def setUp(self):
+        self.poll = Poll.objects.create(question='Makanan favorit?')
+        for text in ('Sate', 'Rendang'):
+            Option.objects.create(poll=self.poll, text=text)
+        self.stats = dict(consumers.stats)
+
+    async def connect(self):
+        stream = ApplicationCommunicator(consumers.SSEConsumer.as_asgi(), {
+            'type': 'http',
+            'method': 'GET',
+            'path': f'/sse/{self.poll.id}/',
+            'headers': [],
+            'url_route': {'args': (), 'kwargs': {'poll_id': self.poll.id}},
+        })
+        await stream.send_input({'type': 'http.request', 'body': b''})
+        start = await stream.receive_output(1)
+        self.assertEqual(start['type'], 'http.response.start')
+        return stream, start
+
+    async def receive(self, stream):
+        return (await stream.receive_output(1))['body']
+
+    async def close(self, stream):
+        await stream.send_input({'type': 'http.disconnect'})
+        await stream.wait(1)
+
+    def stat(self, name):
+        return consumers.stats[name] - self.stats[name]
+
+    async def test_stream_sends_poll_data_then_updates(self):
+        stream, start = await self.connect()
+        self.assertEqual(start['status'], 200)
+        self.assertIn((b'Content-Type', b'text/event-stream'), start['headers'])
+
+        data = json.loads((await self.receive(stream)).decode()[len('data: '):])
+        self.assertEqual(data['question'], 'Makanan favorit?')
+        self.assertEqual([option['votes'] for option in data['options']], [0, 0])
+
+        await Vote.objects.acreate(option=await self.poll.options.afirst())
+        data = json.loads((await self.receive(stream)).decode()[len('data: '):])
+        self.assertEqual(sum(option['votes'] for option in data['options']), 1)
+        await self.close(stream)
+
+    async def test_unknown_poll_is_404(self):
+        self.poll = await sync_to_async(Poll.objects.create)(question='Sementara')
+        await self.poll.adelete()
+
+        stream, start = await self.connect()
+        self.assertEqual(start['status'], 404)
+        await stream.wait(1)
+        self.assertEqual(self.stat('connections'), 0)
+        self.assertNotIn(self.poll.id, consumers._watchers)
+
+    async def test_deleted_poll_ends_stream(self):
+        stream, _ = await self.connect()
+        await self.receive(stream)
+
+        await Poll.objects.filter(pk=self.poll.pk).adelete()
+        end = await stream.receive_output(1)
+        self.assertEqual(end['body'], b'')
+        self.assertFalse(end.get('more_body', False))
+        await stream.wait(1)
+        self.assertNotIn(self.poll.id, consumers._watchers)
+
+    async def test_failed_payload_build_is_retried(self):
+        stream, _ = await self.connect()
+        await self.receive(stream)
+        real = consumers.get_poll_data
+        calls = []
+
+        async def flaky(poll_id):
+            calls.append(poll_id)
+            if len(calls) == 1:
+                raise RuntimeError('koneksi DB putus')
+            return await real(poll_id)
+
+        with mock.patch.object(consumers, 'get_poll_data', flaky), self.assertLogs('sse.consumers', 'ERROR'):
+            await Vote.objects.acreate(option=await self.poll.options.afirst())
+            data = json.loads((await self.receive(stream)).decode()[len('data: '):])
+
+        # Vote yang sama tetap terkirim pada percobaan berikutnya
+        self.assertEqual(sum(option['votes'] for option in data['options']), 1)
+        await self.close(stream)
+
+    async def test_watcher_is_shared_and_removed_with_last_listener(self):
+        first, _ = await self.connect()
+        second, _ = await self.connect()
+        # Event pertama dikirim setelah listener terdaftar
+        await self.receive(first)
+        await self.receive(second)
+        watcher = consumers._watchers[self.poll.id]
+        self.assertEqual(len(watcher.listeners), 2)
+        self.assertEqual(self.stat('connections'), 2)
+
+        await self.close(first)
+        self.assertIs(consumers._watchers[self.poll.id], watcher)
+        self.assertEqual(len(watcher.listeners), 1)
+
+        await self.close(second)
+        self.assertNotIn(self.poll.id, consumers._watchers)
+        await asyncio.sleep(0)
+        self.assertTrue(watcher.task.cancelled())
+        self.assertEqual(self.stat('connections'), 0)
+
+    async def test_disconnect_cancels_stream(self):
+        stream, _ = await self.connect()
+        await self.receive(stream)
+        await stream.send_input({'type': 'http.disconnect'})
+        # Aplikasi selesai tanpa menunggu event atau heartbeat berikutnya
+        await stream.wait(1)
+        self.assertEqual(self.stat('connections'), 0)
+        self.assertNotIn(self.poll.id, consumers._watchers)
+
+    @override_settings(POLLS_SSE_HEARTBEAT=0.05)
+    async def test_idle_stream_sends_heartbeat(self):
+        stream, _ = await self.connect()
+        await self.receive(stream)
+        self.assertEqual(await self.receive(stream), b': keep-alive\n\n')
+        await self.close(stream)
+
+    @override_settings(POLLS_SSE_MAX_CONNECTIONS=1)
+    async def test_connection_over_cap_is_rejected(self):
+        first, _ = await self.connect()
+        await self.receive(first)
+        second, start = await self.connect()
+
+        self.assertEqual(start['status'], 503)
+        self.assertIn((b'Retry-After', b'5'), start['headers'])
+        await second.wait(1)
+        self.assertEqual(self.stat('rejected'), 1)
+        self.assertEqual(self.stat('connections'), 1)
+        await self.close(first)
+
+    @override_settings(POLLS_SSE_SEND_TIMEOUT=0.05)
+    async def test_slow_client_is_dropped_after_send_timeout(self):
+        async def stalled(self, body, more_body=False):
+            await asyncio.Event().wait()
+
+        with mock.patch.object(consumers.SSEConsumer, 'send_body', stalled):
+            stream, _ = await self.connect()
+            # Consumer berhenti sendiri tanpa http.disconnect dari klien
+            await stream.wait(1)
+
+        self.assertEqual(self.stat('send_timeouts'), 1)
+        self.assertEqual(self.stat('connections'), 0)
+        self.assertNotIn(self.poll.id, consumers._watchers)
+
+    async def test_metrics_report_connections(self):
+        stream, _ = await self.connect()
+        lines = await sync_to_async(consumers.sse_metrics)()
+        self.assertIn(f'polls_sse_connections {consumers.stats["connections"]}', lines)
+        self.assertIn(f'polls_sse_watchers {len(consumers._watchers)}', lines)
+        await self.close(stream)
@@ -42,6 +42,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'polls_common.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -91,9 +92,64 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            # Ambil lock tulis di awal transaksi: penulis bersamaan antre lewat
+            # busy_timeout, bukan gagal "database is locked" saat upgrade lock
+            'transaction_mode': 'IMMEDIATE',
+        },
+        # Aplikasi berjalan di ASGI (setiap request punya thread sendiri), jadi
+        # koneksi persistent tidak dipakai ulang; membuka koneksi SQLite murah
+        'CONN_MAX_AGE': 0,
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
+# Tuning per koneksi: WAL, synchronous=NORMAL, busy_timeout, mmap (lihat polls_common.dbtuning)
+POLLS_DB_PROFILE = {
+    'ENABLED': True,
+    'SQLITE_PRAGMAS': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': 20_000,
+        'mmap_size': 256 * 1024 * 1024,
+        'temp_store': 'MEMORY',
+    },
+}
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Dipakai untuk cache hasil poll (polls.results_cache). Gunakan
+# django.core.cache.backends.filebased.FileBasedCache agar dibagi antar proses.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'polling-app',
+    },
+    # Bucket rate limit terpisah dari cache hasil: flood IP/poll baru tidak
+    # menggusur versi hasil, dan bucket tidak tergusur sebelum kedaluwarsa
+    # (satu kunci per IP/poll aktif, hidup paling lama BURST/RATE detik)
+    'ratelimit': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'polling-app-ratelimit',
+        'OPTIONS': {'MAX_ENTRIES': 100_000},
+    },
+}
+
+# Masa simpan (detik) body JSON hasil poll per versi
+POLLS_RESULTS_CACHE_TIMEOUT = 300
+
+# Rate limit token bucket untuk vote (lihat polls.ratelimit): RATE token per
+# detik, kapasitas BURST. Bucket disimpan di cache CACHE; pakai cache bersama
+# (Redis/Memcached) agar batasnya berlaku lintas worker.
+POLLS_RATE_LIMIT = {
+    'ENABLED': True,
+    'CACHE': 'ratelimit',
+    'IP': {'RATE': 2, 'BURST': 20},
+    'POLL': {'RATE': 1000, 'BURST': 5000},
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -144,6 +200,76 @@ CORS_ALLOW_CREDENTIALS = True
 # Channels Configuration
 ASGI_APPLICATION = 'polling_app.asgi.application'
 
+# Channel layer untuk fan-out update SSE per poll.
+# Gunakan channels_redis.core.RedisChannelLayer jika menjalankan >1 proses.
+CHANNEL_LAYERS = {
+    'default': {
+        'BACKEND': 'channels.layers.InMemoryChannelLayer',
+    },
+}
+
+# Interval (detik) komentar keep-alive pada stream SSE yang sedang diam
+POLLS_SSE_HEARTBEAT = 15
+
+# Jumlah delta SSE terakhir per poll yang disimpan untuk resume Last-Event-ID,
+# dan berapa lama (detik) feed poll dipertahankan setelah listener terakhir pergi
+POLLS_SSE_REPLAY_EVENTS = 256
+POLLS_SSE_FEED_LINGER = 30
+
+# Interval (detik) feed poll mendaftar ulang ke group channel layer; harus
+# lebih kecil dari group_expiry layer (default 86400)
+POLLS_SSE_GROUP_REFRESH = 3600
+
+# WebSocket multipleks (/ws/polls/): jendela penggabungan update (milidetik)
+# dan jumlah maksimal poll yang bisa dilangganan satu koneksi
+POLLS_WS_COALESCE_MS = 100
+POLLS_WS_MAX_SUBSCRIPTIONS = 100
+
+# Mode ingest vote write-behind (lihat polls.ingest). Vote ditulis ke log
+# lokal lalu disimpan per batch; aktifkan saat flash poll.
+POLLS_VOTE_BUFFER = {
+    'ENABLED': False,
+    'BATCH_SIZE': 500,
+    'FLUSH_INTERVAL_MS': 200,
+    'LOG_DIR': BASE_DIR / 'vote-log',
+    'FSYNC': False,
+}
+
+# Strategi primary key Vote baru: 'uuid7' (urut waktu) atau 'uuid4' (acak).
+# Vote lama tetap memakai id-nya; lihat polls.ids
+POLLS_VOTE_ID = 'uuid7'
+
+# Cache kunci pemilih per poll di memori (lihat polls.voters)
+POLLS_VOTED_SET = {
+    'MAX_POLLS': 1000,
+    'WARM_LIMIT': 100_000,
+}
+
+# Jumlah poll per halaman di halaman utama (pagination cursor)
+POLLS_INDEX_PAGE_SIZE = 12
+
+# Import poll massal (api/polls/import/ dan manage.py import_polls)
+POLLS_IMPORT_MAX_ROWS = 50_000
+POLLS_IMPORT_BATCH_SIZE = 500
+
+# Arsip vote poll nonaktif (manage.py archive_polls, lihat polls.archive)
+POLLS_ARCHIVE = {
+    'DIR': BASE_DIR / 'vote-archive',
+    'BATCH_SIZE': 5000,
+}
+
+# Resolusi rollup timeline yang dipelihara per vote (lihat polls.rollups) dan
+# jumlah bucket maksimal per request api/results/<poll_id>/timeline/
+POLLS_ROLLUP_RESOLUTIONS = ['1m', '1h']
+POLLS_TIMELINE_MAX_BUCKETS = 1440
+
+# Instrumentasi per view yang diekspos di /metrics (lihat polls_common.metrics).
+# Isi SLOW_REQUEST_MS (mis. 500) untuk mencatat SQL dari query paling lambat.
+POLLS_METRICS = {
+    'SLOW_REQUEST_MS': None,
+    'SLOW_QUERY_COUNT': 5,
+}
+
 # Static files directory
 STATICFILES_DIRS = [
     BASE_DIR / "static",
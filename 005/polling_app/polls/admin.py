@@ -1,5 +1,78 @@
+from django import forms
 from django.contrib import admin
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.utils.html import format_html, format_html_join
 from .models import Poll, Option, Vote
+from .pagination import EstimatedCountPaginator
+from .snapshot import PollSnapshot
+
+
+class AutocompleteFilter(admin.SimpleListFilter):
+    """
+    Filter FK dengan kotak autocomplete, tanpa memuat seluruh objek tujuan
+    seperti ``RelatedFieldListFilter``. Model tujuan harus punya admin
+    dengan ``search_fields``; ModelAdmin pemakai perlu ``AutocompleteFilterMixin``.
+    """
+    template = 'admin/polls/autocomplete_filter.html'
+    field_name = None
+
+    def __init__(self, request, params, model, model_admin):
+        self.field = model._meta.get_field(self.field_name)
+        self.parameter_name = f'{self.field_name}__{self.field.target_field.attname}__exact'
+        super().__init__(request, params, model, model_admin)
+        self.form_field = forms.ModelChoiceField(
+            queryset=self.field.remote_field.model._default_manager.all(),
+            widget=AutocompleteSelect(self.field, model_admin.admin_site),
+            required=False,
+        )
+        self.other_params = [
+            (name, value) for name, value in request.GET.items()
+            if name not in (self.parameter_name, 'p')
+        ]
+        self.clear_query_string = self.changelist_query_string(request, model_admin)
+
+    def changelist_query_string(self, request, model_admin):
+        params = request.GET.copy()
+        params.pop(self.parameter_name, None)
+        params.pop('p', None)
+        return f'?{params.urlencode()}'
+
+    def has_output(self):
+        return True
+
+    def lookups(self, request, model_admin):
+        return ()
+
+    def choices(self, changelist):
+        return ()
+
+    def rendered_widget(self):
+        return self.form_field.widget.render(
+            self.parameter_name, self.value(), attrs={'id': f'id_filter_{self.field_name}'},
+        )
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(**{self.parameter_name: self.value()})
+        return queryset
+
+
+class PollFilter(AutocompleteFilter):
+    title = 'poll'
+    field_name = 'poll'
+
+
+class AutocompleteFilterMixin:
+    """Menambahkan JS/CSS select2 admin ke changelist untuk AutocompleteFilter"""
+
+    @property
+    def media(self):
+        media = super().media
+        for list_filter in self.list_filter:
+            if isinstance(list_filter, type) and issubclass(list_filter, AutocompleteFilter):
+                field = self.model._meta.get_field(list_filter.field_name)
+                media += AutocompleteSelect(field, self.admin_site).media
+        return media
 
 
 class OptionInline(admin.TabularInline):
@@ -12,41 +85,73 @@ class OptionInline(admin.TabularInline):
 @admin.register(Poll)
 class PollAdmin(admin.ModelAdmin):
     """Admin interface untuk Poll"""
-    list_display = ['title', 'is_active', 'total_votes', 'created_at']
-    list_filter = ['is_active', 'created_at']
+    list_display = ['title', 'is_active', 'total_votes', 'archived_at', 'created_at']
+    list_filter = ['is_active', 'created_at', ('archived_at', admin.EmptyFieldListFilter)]
     search_fields = ['title', 'description']
-    readonly_fields = ['id', 'created_at', 'updated_at']
+    readonly_fields = ['id', 'created_at', 'updated_at', 'archived_at', 'results']
     inlines = [OptionInline]
     
     fieldsets = (
         (None, {
             'fields': ('title', 'description', 'is_active')
         }),
+        ('Hasil', {
+            'fields': ('results',)
+        }),
         ('Info', {
-            'fields': ('id', 'created_at', 'updated_at'),
+            'fields': ('id', 'created_at', 'updated_at', 'archived_at'),
             'classes': ('collapse',)
         }),
     )
+    
+    def results(self, obj):
+        if obj.pk is None:
+            return '-'
+        snapshot = PollSnapshot.build(obj)
+        rows = format_html_join(
+            '', '<tr><td>{}</td><td>{}</td><td>{}%</td></tr>',
+            ((option.text, option.votes, option.percentage) for option in snapshot.options),
+        )
+        return format_html(
+            '<table><tr><th>Opsi</th><th>Vote</th><th>%</th></tr>{}</table>'
+            '<p>Total: {} vote</p>',
+            rows, snapshot.total_votes,
+        )
+    results.short_description = 'Hasil'
 
 
 @admin.register(Option)
-class OptionAdmin(admin.ModelAdmin):
+class OptionAdmin(AutocompleteFilterMixin, admin.ModelAdmin):
     """Admin interface untuk Option"""
+    # vote_count dan vote_percentage dibaca dari kolom counter (lihat polls.counters)
     list_display = ['text', 'poll', 'vote_count', 'vote_percentage', 'created_at']
-    list_filter = ['poll', 'created_at']
+    list_filter = [PollFilter, 'created_at']
+    list_select_related = ['poll']
     search_fields = ['text', 'poll__title']
+    autocomplete_fields = ['poll']
     readonly_fields = ['id', 'created_at']
 
 
 @admin.register(Vote)
-class VoteAdmin(admin.ModelAdmin):
-    """Admin interface untuk Vote"""
-    list_display = ['option', 'poll', 'ip_address', 'created_at']
-    list_filter = ['option__poll', 'created_at']
-    search_fields = ['option__text', 'option__poll__title', 'ip_address']
+class VoteAdmin(AutocompleteFilterMixin, admin.ModelAdmin):
+    """
+    Admin interface untuk Vote.
+    
+    Dirancang untuk tabel berisi puluhan juta baris: satu query untuk
+    halaman (option dan poll di-join), jumlah baris dari statistik DB saat
+    tidak difilter, tanpa COUNT kedua untuk "tampilkan semua", dan filter
+    poll lewat autocomplete. Pencarian hanya exact match tanpa join.
+    """
+    list_display = ['option_text', 'poll', 'ip_address', 'created_at']
+    list_filter = [PollFilter, 'created_at']
+    list_select_related = ['option', 'poll']
+    search_fields = ['=voter_key', '=ip_address']
+    autocomplete_fields = ['poll', 'option']
     readonly_fields = ['id', 'created_at']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     
-    def poll(self, obj):
-        return obj.option.poll.title
-    poll.short_description = 'Poll'
-
+    @admin.display(description='Opsi', ordering='option__text')
+    def option_text(self, obj):
+        # Option.__str__ memuat option.poll lagi; cukup teks opsinya
+        return obj.option.text
@@ -4,3 +4,24 @@ from django.apps import AppConfig
 class PollsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'polls'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+        from django.db.models.signals import post_delete, post_save, pre_delete
+        from polls_common.dbtuning import configure_connection
+        from polls_common.metrics import register_collector
+
+        from .consumers import websocket_metrics
+        from .models import Option, Poll
+        from .ratelimit import rate_limit_metrics
+        from .results_cache import bump_poll_version, forget_poll
+        from .services import release_deleted_option
+        from .voters import voted_set_metrics
+
+        pre_delete.connect(release_deleted_option, sender=Option)
+        post_save.connect(bump_poll_version, sender=Poll)
+        post_delete.connect(forget_poll, sender=Poll)
+        register_collector(voted_set_metrics)
+        register_collector(websocket_metrics)
+        register_collector(rate_limit_metrics)
+        connection_created.connect(configure_connection, dispatch_uid='polls.dbtuning')
@@ -0,0 +1,170 @@
+"""
+Arsip vote untuk poll yang sudah ditutup.
+
+``archive_poll`` membekukan counter (dibangun ulang sekali dari tabel
+Vote), menulis seluruh vote poll ke file CSV gzip lewat ``polls.exporter``,
+memverifikasi isinya, lalu menghapus vote dari tabel secara bertahap.
+Setelah itu hasil poll hanya dibaca dari counter dan rollup yang beku;
+``rebuild_vote_counts`` melewati poll yang diarsipkan.
+
+``restore_poll`` memasukkan kembali vote dari file arsip (id dan
+``created_at`` asli dipertahankan) tanpa mengubah counter.
+
+Konfigurasi::
+
+    POLLS_ARCHIVE = {
+        'DIR': BASE_DIR / 'vote-archive',
+        'BATCH_SIZE': 5000,
+    }
+"""
+import csv
+import gzip
+import os
+import uuid
+from pathlib import Path
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from . import exporter
+from .counters import find_counter_mismatches, rebuild_vote_counters
+from .models import Vote
+from .voters import voted_set
+
+DEFAULTS = {
+    'DIR': None,
+    'BATCH_SIZE': 5000,
+}
+
+
+class ArchiveError(Exception):
+    """Poll tidak bisa diarsipkan atau dipulihkan"""
+
+
+def get_config():
+    config = {**DEFAULTS, **getattr(settings, 'POLLS_ARCHIVE', {})}
+    config['DIR'] = Path(config['DIR'] or settings.BASE_DIR / 'vote-archive')
+    return config
+
+
+def archive_path(poll_id):
+    return get_config()['DIR'] / exporter.filename(poll_id, 'csv', compress=True)
+
+
+def count_archived_rows(path):
+    with gzip.open(path, 'rt', encoding='utf-8', newline='') as fh:
+        return sum(1 for _ in csv.reader(fh)) - 1
+
+
+def archive_poll(poll):
+    """
+    Mengarsipkan vote ``poll`` yang sudah tidak aktif. Aman dijalankan ulang
+    jika proses sebelumnya terhenti di tengah penghapusan. Mengembalikan
+    jumlah vote yang dihapus dari tabel.
+    """
+    if poll.is_active:
+        raise ArchiveError(f'Poll {poll.id} masih aktif')
+    config = get_config()
+    path = archive_path(poll.id)
+
+    if poll.archived_at is None:
+        # Bekukan counter agar sesuai dengan vote yang akan diarsipkan
+        rebuild_vote_counters([poll.id])
+        poll.refresh_from_db(fields=['total_votes'])
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        partial = path.with_name(path.name + '.partial')
+        with open(partial, 'wb') as fh:
+            for chunk in exporter.export_votes(poll.id, 'csv', compress=True):
+                fh.write(chunk)
+            fh.flush()
+            os.fsync(fh.fileno())
+
+        archived = count_archived_rows(partial)
+        if archived != poll.total_votes:
+            partial.unlink()
+            raise ArchiveError(
+                f'Arsip poll {poll.id} berisi {archived} vote, counter {poll.total_votes}'
+            )
+        os.replace(partial, path)
+
+        # Mulai saat ini hasil poll dibaca dari counter beku
+        poll.archived_at = timezone.now()
+        poll.save(update_fields=['archived_at'])
+    elif not path.exists():
+        raise ArchiveError(f'File arsip poll {poll.id} tidak ditemukan: {path}')
+
+    deleted = 0
+    while True:
+        batch = list(
+            Vote.objects.filter(poll_id=poll.id).values_list('pk', flat=True)[:config['BATCH_SIZE']]
+        )
+        if not batch:
+            break
+        with transaction.atomic():
+            deleted += Vote.objects.filter(pk__in=batch).delete()[0]
+
+    voted_set.forget(poll.id)
+    return deleted
+
+
+def restore_poll(poll):
+    """
+    Memasukkan kembali vote dari file arsip ``poll`` dan menghapus status
+    arsipnya. Mengembalikan jumlah vote yang benar-benar di-insert; vote
+    yang sudah ada (mis. restore sebelumnya terputus) tidak dihitung.
+    """
+    if poll.archived_at is None:
+        raise ArchiveError(f'Poll {poll.id} tidak diarsipkan')
+    config = get_config()
+    path = archive_path(poll.id)
+    if not path.exists():
+        raise ArchiveError(f'File arsip poll {poll.id} tidak ditemukan: {path}')
+
+    restored = 0
+    with gzip.open(path, 'rt', encoding='utf-8', newline='') as fh:
+        batch = []
+        for row in csv.DictReader(fh):
+            batch.append(Vote(
+                id=uuid.UUID(row['id']),
+                poll_id=poll.id,
+                option_id=uuid.UUID(row['option_id']),
+                voter_key=row['voter_key'],
+                ip_address=row['ip_address'],
+                user_agent=row['user_agent'],
+                created_at=parse_datetime(row['created_at']),
+            ))
+            if len(batch) >= config['BATCH_SIZE']:
+                restored += _restore_batch(batch)
+                batch = []
+        restored += _restore_batch(batch)
+
+    poll.archived_at = None
+    poll.save(update_fields=['archived_at'])
+    mismatches = find_counter_mismatches([poll.id])
+    if mismatches:
+        raise ArchiveError(f'Counter poll {poll.id} tidak cocok setelah restore: {mismatches}')
+    path.unlink()
+    return restored
+
+
+def _restore_batch(votes):
+    if not votes:
+        return 0
+    with transaction.atomic():
+        existing = set(Vote.objects.filter(pk__in=[vote.pk for vote in votes]).values_list('pk', flat=True))
+        missing = [vote for vote in votes if vote.pk not in existing]
+        if not missing:
+            return 0
+        created = {vote.pk: vote.created_at for vote in missing}
+        Vote.objects.bulk_create(missing, ignore_conflicts=True)
+        # ignore_conflicts tidak melaporkan baris yang dilewati; hitung yang benar-benar masuk
+        present = set(Vote.objects.filter(pk__in=created).values_list('pk', flat=True))
+        inserted = [vote for vote in missing if vote.pk in present]
+        # auto_now_add menimpa created_at saat insert; kembalikan nilai aslinya
+        for vote in inserted:
+            vote.created_at = created[vote.pk]
+        Vote.objects.bulk_update(inserted, ['created_at'])
+    return len(inserted)
@@ -0,0 +1,319 @@
+"""
+WebSocket multipleks: banyak poll lewat satu koneksi.
+
+Klien berlangganan dan berhenti berlangganan poll kapan saja, serta bisa
+memberikan vote tanpa request HTTP terpisah. Setiap langganan memakai
+``PollFeed`` yang sama dengan SSE (lihat ``polls.live``), jadi tidak ada
+query tambahan per socket. Update semua poll dikumpulkan selama
+``POLLS_WS_COALESCE_MS`` lalu dikirim sebagai satu frame; beberapa delta
+untuk poll yang sama dalam jendela itu digabung menjadi satu.
+
+Pesan klien (JSON)::
+
+    {"action": "subscribe", "poll_ids": ["<uuid>", ...], "since": {"<uuid>": <event_id>}}
+    {"action": "unsubscribe", "poll_ids": ["<uuid>", ...]}
+    {"action": "vote", "poll_id": "<uuid>", "option_id": "<uuid>", "ref": <apa saja>}
+
+Pesan server::
+
+    {"type": "subscribed", "poll_ids": [...], "rejected": [...]}
+    {"type": "unsubscribed", "poll_ids": [...]}
+    {"type": "updates", "polls": [{"poll_id", "event": "snapshot" | "delta", "id", "data"}, ...]}
+    {"type": "vote", "ref", "success": true, "vote_id", "queued"}
+    {"type": "error", "ref", "error"}
+
+``id`` sama dengan ID event SSE (``Poll.sequence``); kirim kembali lewat
+``since`` saat reconnect agar hanya menerima delta yang terlewat.
+"""
+import asyncio
+import json
+import math
+import uuid
+
+from asgiref.sync import sync_to_async
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+from django.conf import settings
+from django.core.exceptions import ValidationError
+
+from . import live, ratelimit
+from .ingest import get_vote_buffer
+from .models import Option, Poll
+from .services import AlreadyVoted, cast_vote
+from .voters import voted_set
+
+_connections = set()
+
+
+class PollSubscription:
+    """Listener ``PollFeed`` untuk satu poll di satu socket"""
+
+    def __init__(self, consumer, poll_id, feed):
+        self.consumer = consumer
+        self.poll_id = poll_id
+        self.feed = feed
+
+    def push(self, event):
+        self.consumer.queue_delta(self.poll_id, event)
+
+
+class PollMultiplexConsumer(AsyncJsonWebsocketConsumer):
+    actions = {
+        'subscribe': 'subscribe',
+        'unsubscribe': 'unsubscribe',
+        'vote': 'vote',
+    }
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.subscriptions = {}
+        # Update yang belum terkirim per poll: {'event': 'snapshot'} atau delta gabungan
+        self.pending = {}
+        self.wakeup = asyncio.Event()
+        self.sender = None
+
+    async def connect(self):
+        self.client_ip = get_client_ip(self.scope)
+        # Sama dengan views.get_voter_key: satu vote per IP per poll
+        self.voter_key = self.client_ip
+        await self.accept()
+        self.sender = asyncio.create_task(self.send_updates())
+        _connections.add(self)
+
+    async def disconnect(self, code):
+        _connections.discard(self)
+        if self.sender is not None:
+            self.sender.cancel()
+        for subscription in self.subscriptions.values():
+            subscription.feed.remove_listener(subscription)
+        self.subscriptions.clear()
+        self.pending.clear()
+
+    async def receive(self, text_data=None, bytes_data=None, **kwargs):
+        try:
+            content = json.loads(text_data or bytes_data)
+        except (TypeError, ValueError):
+            await self.send_error(None, 'Invalid JSON')
+            return
+        if not isinstance(content, dict):
+            await self.send_error(None, 'Pesan harus berupa objek JSON')
+            return
+        handler = self.actions.get(content.get('action'))
+        if handler is None:
+            await self.send_error(content.get('ref'), 'Aksi tidak dikenal')
+            return
+        await getattr(self, handler)(content)
+
+    async def send_error(self, ref, message):
+        await self.send_json({'type': 'error', 'ref': ref, 'error': message})
+
+    async def subscribe(self, content):
+        poll_ids, rejected = parse_poll_ids(content.get('poll_ids'))
+        if poll_ids is None:
+            await self.send_error(content.get('ref'), 'poll_ids harus berupa list')
+            return
+        since = content.get('since')
+        if not isinstance(since, dict):
+            since = {}
+
+        new_ids = [poll_id for poll_id in poll_ids if poll_id not in self.subscriptions]
+        limit = getattr(settings, 'POLLS_WS_MAX_SUBSCRIPTIONS', 100)
+        if len(self.subscriptions) + len(new_ids) > limit:
+            await self.send_error(content.get('ref'), f'Maksimal {limit} poll per koneksi')
+            return
+
+        polls = [poll async for poll in Poll.objects.filter(id__in=new_ids, is_active=True)]
+        found = {str(poll.id) for poll in polls}
+        rejected.extend(poll_id for poll_id in new_ids if poll_id not in found)
+
+        for poll in polls:
+            poll_id = str(poll.id)
+            feed = await live.open_feed(poll)
+            subscription = PollSubscription(self, poll_id, feed)
+            feed.add_listener(subscription)
+            self.subscriptions[poll_id] = subscription
+
+            last_event_id = since.get(poll_id)
+            missed = feed.missed_since(last_event_id) if isinstance(last_event_id, int) else None
+            if missed is None:
+                self.pending[poll_id] = {'event': 'snapshot'}
+                self.wakeup.set()
+            else:
+                for event in missed:
+                    self.queue_delta(poll_id, event)
+
+        await self.send_json({
+            'type': 'subscribed',
+            'poll_ids': [poll_id for poll_id in poll_ids if poll_id in self.subscriptions],
+            'rejected': rejected,
+        })
+
+    async def unsubscribe(self, content):
+        poll_ids, _ = parse_poll_ids(content.get('poll_ids'))
+        if poll_ids is None:
+            await self.send_error(content.get('ref'), 'poll_ids harus berupa list')
+            return
+        removed = []
+        for poll_id in poll_ids:
+            subscription = self.subscriptions.pop(poll_id, None)
+            if subscription is not None:
+                subscription.feed.remove_listener(subscription)
+                self.pending.pop(poll_id, None)
+                removed.append(poll_id)
+        await self.send_json({'type': 'unsubscribed', 'poll_ids': removed})
+
+    async def vote(self, content):
+        ref = content.get('ref')
+        try:
+            poll_id = str(uuid.UUID(str(content.get('poll_id'))))
+            option_id = str(uuid.UUID(str(content.get('option_id'))))
+        except ValueError:
+            await self.send_error(ref, 'poll_id dan option_id diperlukan')
+            return
+        try:
+            vote_id, queued = await sync_to_async(record_vote)(
+                poll_id, option_id, self.voter_key, self.client_ip, get_user_agent(self.scope)
+            )
+        except ratelimit.RateLimited as exc:
+            await self.send_json({
+                'type': 'error',
+                'ref': ref,
+                'error': 'Terlalu banyak request, coba lagi nanti',
+                'retry_after': math.ceil(exc.retry_after),
+            })
+            return
+        except AlreadyVoted:
+            await self.send_error(ref, 'Anda sudah memberikan vote untuk poll ini')
+            return
+        except (Option.DoesNotExist, ValidationError):
+            await self.send_error(ref, 'Opsi tidak ditemukan')
+            return
+        await self.send_json({
+            'type': 'vote',
+            'ref': ref,
+            'success': True,
+            'vote_id': str(vote_id),
+            'queued': queued,
+        })
+
+    def queue_delta(self, poll_id, event):
+        """Menggabungkan delta ke update poll yang belum terkirim"""
+        entry = self.pending.get(poll_id)
+        if entry is None:
+            payload = event['payload']
+            self.pending[poll_id] = {
+                'event': 'delta',
+                'id': event['id'],
+                'prev': event['prev'],
+                'total_votes': payload['total_votes'],
+                'changes': {change['id']: dict(change) for change in payload['changes']},
+            }
+        elif entry['event'] == 'delta':
+            entry['id'] = event['id']
+            entry['total_votes'] = event['payload']['total_votes']
+            for change in event['payload']['changes']:
+                entry['changes'].setdefault(change['id'], {}).update(change)
+        # Snapshot yang tertunda selalu dibaca dari data terbaru feed saat dikirim
+        self.wakeup.set()
+
+    async def send_updates(self):
+        """Mengirim semua update tertunda sebagai satu frame per jendela"""
+        interval = getattr(settings, 'POLLS_WS_COALESCE_MS', 100) / 1000
+        while True:
+            await self.wakeup.wait()
+            await asyncio.sleep(interval)
+            self.wakeup.clear()
+            pending, self.pending = self.pending, {}
+
+            frames = []
+            for poll_id, entry in pending.items():
+                subscription = self.subscriptions.get(poll_id)
+                if subscription is None:
+                    continue
+                if entry['event'] == 'snapshot':
+                    feed = subscription.feed
+                    frames.append({'poll_id': poll_id, 'event': 'snapshot', 'id': feed.event_id, 'data': feed.data})
+                else:
+                    frames.append({
+                        'poll_id': poll_id,
+                        'event': 'delta',
+                        'id': entry['id'],
+                        'prev': entry['prev'],
+                        'data': {
+                            'poll_id': poll_id,
+                            'total_votes': entry['total_votes'],
+                            'changes': list(entry['changes'].values()),
+                        },
+                    })
+            if frames:
+                # Klien lambat menahan loop ini; update baru terus digabung di pending
+                await self.send_json({'type': 'updates', 'polls': frames})
+
+
+def parse_poll_ids(value):
+    """(poll_ids valid dalam bentuk string UUID, nilai yang ditolak); (None, []) jika bukan list"""
+    if not isinstance(value, list):
+        return None, []
+    poll_ids, rejected = [], []
+    for raw in value:
+        try:
+            poll_id = str(uuid.UUID(str(raw)))
+        except ValueError:
+            rejected.append(raw)
+            continue
+        if poll_id not in poll_ids:
+            poll_ids.append(poll_id)
+    return poll_ids, rejected
+
+
+def record_vote(poll_id, option_id, voter_key, ip_address, user_agent):
+    """
+    Alur vote yang sama dengan ``views.vote``. Mengembalikan
+    ``(vote_id, queued)``; melempar ``RateLimited`` sebelum query apa pun,
+    ``Option.DoesNotExist``, atau ``AlreadyVoted``.
+    """
+    ratelimit.check(ip=ip_address, poll=ratelimit.poll_key(poll_id))
+    option = Option.objects.select_related('poll').get(id=option_id, poll_id=poll_id, poll__is_active=True)
+    if voted_set.contains(poll_id, voter_key):
+        raise AlreadyVoted(voter_key)
+
+    buffer = get_vote_buffer()
+    try:
+        if buffer is not None:
+            vote_id = buffer.submit(option, voter_key, ip_address, user_agent)
+        else:
+            vote_id = cast_vote(option, voter_key, ip_address, user_agent).id
+    except AlreadyVoted:
+        voted_set.add(poll_id, voter_key)
+        raise
+    voted_set.add(poll_id, voter_key)
+    return vote_id, buffer is not None
+
+
+def get_header(scope, name):
+    for key, value in scope.get('headers', []):
+        if key == name:
+            return value.decode('latin-1')
+    return ''
+
+
+def get_client_ip(scope):
+    """Padanan ``views.get_client_ip`` untuk scope ASGI"""
+    forwarded = get_header(scope, b'x-forwarded-for')
+    if forwarded:
+        return forwarded.split(',')[0]
+    client = scope.get('client')
+    return client[0] if client else None
+
+
+def get_user_agent(scope):
+    return get_header(scope, b'user-agent')
+
+
+def websocket_metrics():
+    """Baris metrik Prometheus untuk ``/metrics``"""
+    return [
+        '# TYPE polls_ws_connections gauge',
+        f'polls_ws_connections {len(_connections)}',
+        '# TYPE polls_ws_subscriptions gauge',
+        f'polls_ws_subscriptions {sum(len(consumer.subscriptions) for consumer in _connections)}',
+    ]
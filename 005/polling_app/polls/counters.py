@@ -0,0 +1,112 @@
+"""
+Counter vote yang didenormalisasi pada Poll dan Option.
+
+Hasil poll dibaca dari kolom ``Option.vote_count`` dan ``Poll.total_votes``
+sehingga biaya baca O(opsi), bukan O(vote). Counter dinaikkan dengan
+``UPDATE ... SET x = x + n`` di transaksi yang sama dengan insert Vote,
+dan bisa dibangun ulang dari tabel Vote lewat ``rebuild_vote_counts``.
+Vote yang dihapus menurunkan counter per kelompok opsi lewat
+``services.release_deleted_votes``; vote yang ikut terhapus bersama Poll-nya
+tidak perlu diturunkan karena counternya ikut hilang.
+"""
+from django.db import transaction
+from django.db.models import Count, F
+from django.db.models.functions import Greatest
+
+from .models import Poll, Option, Vote
+
+
+def increment_vote_counters(poll_id, option_counts):
+    """
+    Menaikkan counter secara atomik.
+
+    ``option_counts`` adalah dict ``{option_id: jumlah_vote_baru}``. Harus
+    dipanggil di dalam ``transaction.atomic()`` yang sama dengan insert Vote.
+    """
+    total = 0
+    for option_id, count in option_counts.items():
+        if count:
+            Option.objects.filter(pk=option_id).update(vote_count=F('vote_count') + count)
+            total += count
+    if total:
+        Poll.objects.filter(pk=poll_id).update(total_votes=F('total_votes') + total, sequence=F('sequence') + 1)
+
+
+def decrement_vote_counters(poll_counts, option_counts):
+    """
+    Kebalikan ``increment_vote_counters`` untuk vote yang dihapus: satu
+    UPDATE per opsi dan per poll. ``poll_counts``/``option_counts`` adalah
+    dict ``{id: jumlah_vote_dihapus}``. Counter tidak pernah di bawah 0,
+    mis. jika sudah meleset sebelum rebuild.
+    """
+    for option_id, count in option_counts.items():
+        Option.objects.filter(pk=option_id).update(vote_count=Greatest(F('vote_count') - count, 0))
+    for poll_id, count in poll_counts.items():
+        Poll.objects.filter(pk=poll_id).update(
+            total_votes=Greatest(F('total_votes') - count, 0), sequence=F('sequence') + 1,
+        )
+
+
+def find_counter_mismatches(poll_ids=None, lock=False):
+    """
+    Membandingkan counter dengan jumlah Vote sebenarnya.
+
+    Mengembalikan list tuple ``(obj, tersimpan, sebenarnya)`` untuk setiap
+    Option dan Poll yang counternya tidak cocok. Dengan ``lock=True`` baris
+    counter dikunci lebih dulu, sehingga vote yang masuk bersamaan menunggu
+    dan kenaikannya diterapkan di atas nilai hasil rebuild.
+    """
+    # Counter poll yang diarsipkan beku; vote-nya sudah tidak ada di tabel
+    votes = Vote.objects.all()
+    options = Option.objects.filter(poll__archived_at__isnull=True)
+    polls = Poll.objects.filter(archived_at__isnull=True)
+    if poll_ids is not None:
+        votes = votes.filter(option__poll_id__in=poll_ids)
+        options = options.filter(poll_id__in=poll_ids)
+        polls = polls.filter(id__in=poll_ids)
+    if lock:
+        options = options.select_for_update()
+        polls = polls.select_for_update()
+
+    options = list(options.only('id', 'poll_id', 'vote_count'))
+    polls = list(polls.only('id', 'title', 'total_votes'))
+
+    # Satu query agregat untuk seluruh opsi
+    actual = dict(
+        votes.order_by().values('option_id').annotate(n=Count('id')).values_list('option_id', 'n')
+    )
+
+    mismatches = []
+    poll_totals = {}
+    for option in options:
+        count = actual.get(option.id, 0)
+        poll_totals[option.poll_id] = poll_totals.get(option.poll_id, 0) + count
+        if option.vote_count != count:
+            mismatches.append((option, option.vote_count, count))
+
+    for poll in polls:
+        count = poll_totals.get(poll.id, 0)
+        if poll.total_votes != count:
+            mismatches.append((poll, poll.total_votes, count))
+
+    return mismatches
+
+
+def rebuild_vote_counters(poll_ids=None):
+    """Membangun ulang counter yang tidak cocok. Mengembalikan daftar mismatch."""
+    with transaction.atomic():
+        mismatches = find_counter_mismatches(poll_ids, lock=True)
+        options, polls = [], []
+        for obj, _, actual in mismatches:
+            if isinstance(obj, Option):
+                obj.vote_count = actual
+                options.append(obj)
+            else:
+                obj.total_votes = actual
+                polls.append(obj)
+        Option.objects.bulk_update(options, ['vote_count'], batch_size=500)
+        Poll.objects.bulk_update(polls, ['total_votes'], batch_size=500)
+        # Hasil yang dikirim ke listener ikut berubah
+        changed = {option.poll_id for option in options} | {poll.id for poll in polls}
+        Poll.objects.filter(pk__in=changed).update(sequence=F('sequence') + 1)
+    return mismatches
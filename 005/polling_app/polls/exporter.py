@@ -0,0 +1,118 @@
+"""
+Export vote sebuah poll secara streaming (CSV atau NDJSON, opsional gzip).
+
+Vote dibaca dengan ``iterator(chunk_size=...)`` (server-side cursor di
+PostgreSQL) dan ditulis per blok, sehingga pemakaian memori tetap datar
+berapa pun jumlah vote. Urutan mengikuti index unik ``(poll, voter_key)``
+agar DB tidak perlu mengurutkan seluruh vote poll.
+"""
+import csv
+import json
+import zlib
+
+from asgiref.sync import sync_to_async
+
+from .models import Option, Vote
+
+FORMATS = ('csv', 'ndjson')
+COLUMNS = ['id', 'option_id', 'option', 'voter_key', 'ip_address', 'user_agent', 'created_at']
+CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson',
+}
+CHUNK_SIZE = 2000
+# Ukuran blok yang dikirim ke klien; baris-baris kecil digabung dulu
+BLOCK_SIZE = 64 * 1024
+
+
+def vote_rows(poll_id, chunk_size=CHUNK_SIZE):
+    """Dict per vote untuk ``poll_id``, dibaca bertahap dari DB"""
+    # Teks opsi dari satu query kecil, bukan join per baris vote
+    option_texts = dict(Option.objects.filter(poll_id=poll_id).values_list('id', 'text'))
+    votes = (
+        Vote.objects.filter(poll_id=poll_id)
+        .order_by('voter_key')
+        .values_list('id', 'option_id', 'voter_key', 'ip_address', 'user_agent', 'created_at')
+    )
+    for vote_id, option_id, voter_key, ip_address, user_agent, created_at in votes.iterator(chunk_size=chunk_size):
+        yield {
+            'id': str(vote_id),
+            'option_id': str(option_id),
+            'option': option_texts.get(option_id, ''),
+            'voter_key': voter_key,
+            'ip_address': ip_address,
+            'user_agent': user_agent,
+            'created_at': created_at.isoformat(),
+        }
+
+
+class _LineBuffer:
+    """Target ``csv.writer`` yang hanya mengembalikan baris yang ditulis"""
+
+    def write(self, value):
+        return value
+
+
+def csv_lines(rows):
+    writer = csv.writer(_LineBuffer())
+    yield writer.writerow(COLUMNS)
+    for row in rows:
+        yield writer.writerow([row[column] for column in COLUMNS])
+
+
+def ndjson_lines(rows):
+    for row in rows:
+        yield json.dumps(row, ensure_ascii=False) + '\n'
+
+
+def blocks(lines, size=BLOCK_SIZE):
+    """Menggabungkan baris teks menjadi blok bytes sekitar ``size`` byte"""
+    buffer, length = [], 0
+    for line in lines:
+        data = line.encode('utf-8')
+        buffer.append(data)
+        length += len(data)
+        if length >= size:
+            yield b''.join(buffer)
+            buffer, length = [], 0
+    if buffer:
+        yield b''.join(buffer)
+
+
+def gzip_blocks(chunks, level=6):
+    """Kompresi gzip on the fly atas aliran blok bytes"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_votes(poll_id, fmt='csv', compress=False, chunk_size=CHUNK_SIZE):
+    """Iterator bytes berisi seluruh vote ``poll_id`` dalam format ``fmt``"""
+    if fmt not in FORMATS:
+        raise ValueError(f'Format tidak dikenal: {fmt}')
+    rows = vote_rows(poll_id, chunk_size=chunk_size)
+    lines = csv_lines(rows) if fmt == 'csv' else ndjson_lines(rows)
+    chunks = blocks(lines)
+    return gzip_blocks(chunks) if compress else chunks
+
+
+def filename(poll_id, fmt, compress=False):
+    return f'votes-{poll_id}.{fmt}' + ('.gz' if compress else '')
+
+
+async def aiter_blocks(chunks):
+    """
+    Membungkus iterator sync agar bisa di-stream di ASGI tanpa dikumpulkan
+    ke list oleh ``StreamingHttpResponse``. Setiap blok diambil di thread
+    sync yang sama sehingga cursor DB tetap valid.
+    """
+    chunks = iter(chunks)
+    done = object()
+    while True:
+        chunk = await sync_to_async(next)(chunks, done)
+        if chunk is done:
+            return
+        yield chunk
@@ -0,0 +1,58 @@
+"""
+Pembuat primary key Vote.
+
+Default-nya UUIDv7 (RFC 9562): 48 bit pertama berisi timestamp milidetik,
+sehingga id baru selalu masuk di ujung kanan B-tree primary key alih-alih
+di posisi acak seperti uuid4. Tipe kolom tetap UUID, jadi vote lama dan
+``vote_id`` yang sudah diberikan ke klien tidak berubah.
+
+Pilih strategi lewat ``settings.POLLS_VOTE_ID`` (``'uuid7'`` atau ``'uuid4'``).
+"""
+import os
+import threading
+import time
+import uuid
+
+from django.conf import settings
+
+_lock = threading.Lock()
+_last_ms = 0
+_sequence = 0
+
+
+def uuid7():
+    """
+    UUIDv7 yang monoton di dalam satu proses: id yang dibuat pada milidetik
+    yang sama diurutkan dengan counter 12 bit di field ``rand_a``.
+    """
+    global _last_ms, _sequence
+    with _lock:
+        now_ms = time.time_ns() // 1_000_000
+        if now_ms > _last_ms:
+            _last_ms = now_ms
+            _sequence = int.from_bytes(os.urandom(2), 'big') & 0x7FF
+        else:
+            # Jam mundur atau milidetik sama: lanjutkan dari timestamp terakhir
+            _sequence += 1
+            if _sequence > 0xFFF:
+                _last_ms += 1
+                _sequence = 0
+        timestamp, sequence = _last_ms, _sequence
+
+    value = (timestamp & 0xFFFF_FFFF_FFFF) << 80
+    value |= 0x7 << 76
+    value |= sequence << 64
+    value |= 0b10 << 62
+    value |= int.from_bytes(os.urandom(8), 'big') & 0x3FFF_FFFF_FFFF_FFFF
+    return uuid.UUID(int=value)
+
+
+GENERATORS = {
+    'uuid4': uuid.uuid4,
+    'uuid7': uuid7,
+}
+
+
+def new_vote_id():
+    """Default ``Vote.id`` sesuai ``POLLS_VOTE_ID``"""
+    return GENERATORS[getattr(settings, 'POLLS_VOTE_ID', 'uuid7')]()
@@ -0,0 +1,159 @@
+"""
+Import poll secara massal dari JSON atau CSV.
+
+JSON berupa list (atau ``{"polls": [...]}``) dengan item::
+
+    {"title": "...", "description": "...", "is_active": true, "options": ["A", "B"]}
+
+CSV memakai header ``title,description,is_active,options`` dengan opsi
+dipisah ``|``. Kolom ``description`` dan ``is_active`` boleh tidak ada.
+
+Seluruh payload divalidasi lebih dulu; jika ada baris yang salah tidak ada
+yang dibuat. Poll dan opsinya lalu dibuat dengan ``bulk_create`` per batch,
+masing-masing dalam transaksinya sendiri.
+"""
+import csv
+import io
+import json
+from dataclasses import dataclass, field
+
+from django.db import transaction
+
+from .models import Poll, Option
+
+FORMATS = ('json', 'csv')
+CSV_OPTION_SEPARATOR = '|'
+TITLE_MAX_LENGTH = Poll._meta.get_field('title').max_length
+OPTION_MAX_LENGTH = Option._meta.get_field('text').max_length
+TRUE_VALUES = {'1', 'true', 'yes', 'ya', 'y'}
+FALSE_VALUES = {'0', 'false', 'no', 'tidak', 'n'}
+
+
+class PayloadError(ValueError):
+    """File/body tidak bisa dibaca sebagai JSON atau CSV yang valid"""
+
+
+@dataclass
+class PollRow:
+    """Satu baris poll yang sudah divalidasi; ``row`` dimulai dari 1"""
+    row: int
+    title: str
+    description: str = ''
+    is_active: bool = True
+    options: list = field(default_factory=list)
+
+
+def read_rows(stream, fmt):
+    """Membaca ``stream`` (file biner) menjadi list dict mentah"""
+    if fmt not in FORMATS:
+        raise PayloadError(f'Format tidak dikenal: {fmt}')
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig')
+    try:
+        if fmt == 'json':
+            data = json.load(text)
+            if isinstance(data, dict):
+                data = data.get('polls')
+            if not isinstance(data, list):
+                raise PayloadError('JSON harus berupa list poll atau {"polls": [...]}')
+            return data
+        reader = csv.DictReader(text)
+        if not reader.fieldnames or 'title' not in reader.fieldnames:
+            raise PayloadError('CSV harus memiliki header dengan kolom title dan options')
+        return [
+            {**row, 'options': (row.get('options') or '').split(CSV_OPTION_SEPARATOR)}
+            for row in reader
+        ]
+    except (UnicodeDecodeError, json.JSONDecodeError, csv.Error) as exc:
+        raise PayloadError(str(exc)) from exc
+    finally:
+        text.detach()
+
+
+def parse_bool(value):
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in TRUE_VALUES:
+        return True
+    if text in FALSE_VALUES:
+        return False
+    raise ValueError(value)
+
+
+def validate_row(number, raw):
+    """Mengembalikan ``(PollRow, [])`` atau ``(None, [pesan error])``"""
+    if not isinstance(raw, dict):
+        return None, ['Baris harus berupa objek']
+    errors = []
+
+    title = str(raw.get('title') or '').strip()
+    if not title:
+        errors.append('title wajib diisi')
+    elif len(title) > TITLE_MAX_LENGTH:
+        errors.append(f'title maksimal {TITLE_MAX_LENGTH} karakter')
+
+    options = raw.get('options')
+    if not isinstance(options, list):
+        errors.append('options harus berupa list')
+        options = []
+    options = [str(option).strip() for option in options if str(option).strip()]
+    if len(options) < 2:
+        errors.append('minimal 2 opsi')
+    if any(len(option) > OPTION_MAX_LENGTH for option in options):
+        errors.append(f'teks opsi maksimal {OPTION_MAX_LENGTH} karakter')
+
+    is_active = raw.get('is_active')
+    if is_active in (None, ''):
+        is_active = True
+    else:
+        try:
+            is_active = parse_bool(is_active)
+        except ValueError:
+            errors.append('is_active harus true/false')
+
+    if errors:
+        return None, errors
+    return PollRow(
+        row=number,
+        title=title,
+        description=str(raw.get('description') or '').strip(),
+        is_active=is_active,
+        options=options,
+    ), []
+
+
+def validate_rows(rows):
+    """Memvalidasi seluruh payload; mengembalikan ``(list PollRow, list (row, errors))``"""
+    valid, invalid = [], []
+    for number, raw in enumerate(rows, start=1):
+        poll_row, errors = validate_row(number, raw)
+        if errors:
+            invalid.append((number, errors))
+        else:
+            valid.append(poll_row)
+    return valid, invalid
+
+
+def create_polls(poll_rows, batch_size=500):
+    """
+    Membuat poll dan opsi dari ``poll_rows`` yang sudah divalidasi.
+
+    Generator: menghasilkan ``(row, poll_id)`` setelah setiap batch
+    ter-commit, sehingga pemanggil bisa melaporkan progres secara streaming.
+    """
+    for start in range(0, len(poll_rows), batch_size):
+        batch = poll_rows[start:start + batch_size]
+        polls = [
+            Poll(title=row.title, description=row.description, is_active=row.is_active)
+            for row in batch
+        ]
+        options = [
+            Option(poll=poll, text=text, position=position)
+            for poll, row in zip(polls, batch)
+            for position, text in enumerate(row.options)
+        ]
+        with transaction.atomic():
+            Poll.objects.bulk_create(polls)
+            Option.objects.bulk_create(options, batch_size=batch_size)
+        for poll, row in zip(polls, batch):
+            yield row.row, poll.id
@@ -0,0 +1,371 @@
+"""
+Mode ingest vote write-behind untuk lonjakan traffic (flash poll).
+
+Vote yang lolos validasi ditulis ke log append-only lokal dan antrean di
+memori, lalu thread flusher menyimpannya dengan ``bulk_create`` setiap
+``FLUSH_INTERVAL_MS`` atau setiap ``BATCH_SIZE`` vote, dan menaikkan
+counter sekali per batch.
+
+Log dipakai untuk pemulihan setelah crash: setiap entri membawa UUID vote
+yang sudah final, sehingga replay bersifat idempotent dan counter hanya
+dinaikkan untuk baris yang benar-benar baru tersimpan.
+
+Konfigurasi lewat ``settings.POLLS_VOTE_BUFFER``::
+
+    POLLS_VOTE_BUFFER = {
+        'ENABLED': True,
+        'BATCH_SIZE': 500,
+        'FLUSH_INTERVAL_MS': 200,
+        'LOG_DIR': BASE_DIR / 'vote-log',
+        'FSYNC': False,
+    }
+"""
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import defaultdict
+from pathlib import Path
+
+from django.conf import settings
+from django.db import DatabaseError, DataError, IntegrityError, close_old_connections, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .counters import increment_vote_counters
+from .ids import new_vote_id
+from .models import Option, Poll, Vote
+from .rollups import increment_rollups
+from .services import AlreadyVoted, notify_poll_changed
+
+try:
+    import fcntl
+except ImportError:  # Windows: tanpa lock, LOG_DIR harus milik satu proses
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'ENABLED': False,
+    'BATCH_SIZE': 500,
+    'FLUSH_INTERVAL_MS': 200,
+    'LOG_DIR': None,
+    'FSYNC': False,
+}
+
+ACTIVE_SUFFIX = '.log'
+FLUSHING_SUFFIX = '.flushing'
+FAILED_SUFFIX = '.failed'
+LOOKUP_CHUNK = 500
+
+
+def _try_lock(fh):
+    """Mengunci file log secara eksklusif; False jika dipegang proses lain"""
+    if fcntl is None:
+        return True
+    try:
+        fcntl.flock(fh.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        return False
+    return True
+
+
+def live_options(entries):
+    """Pasangan ``(option_id, poll_id)`` dari entri yang opsinya masih ada"""
+    option_ids = list({uuid.UUID(entry['option_id']) for entry in entries})
+    found = set()
+    for start in range(0, len(option_ids), LOOKUP_CHUNK):
+        chunk = option_ids[start:start + LOOKUP_CHUNK]
+        found.update(Option.objects.filter(pk__in=chunk).values_list('pk', 'poll_id'))
+    return found
+
+
+def accepted_at(entry):
+    """Waktu vote diterima buffer; log lama tanpa ``accepted_at`` memakai waktu sekarang"""
+    value = entry.get('accepted_at')
+    return parse_datetime(value) if value else timezone.now()
+
+
+def write_votes(entries):
+    """
+    Menyimpan entri vote dari buffer/log dalam satu transaksi.
+
+    Entri yang UUID-nya sudah ada (replay), bentrok dengan constraint
+    ``(poll, voter_key)``, atau opsinya sudah dihapus dilewati. ``created_at``
+    diisi dari ``accepted_at`` entri. Mengembalikan jumlah vote yang baru
+    tersimpan.
+    """
+    if not entries:
+        return 0
+    ids = [uuid.UUID(entry['id']) for entry in entries]
+
+    def stored_ids():
+        found = set()
+        for start in range(0, len(ids), LOOKUP_CHUNK):
+            chunk = ids[start:start + LOOKUP_CHUNK]
+            found.update(Vote.objects.filter(pk__in=chunk).values_list('pk', flat=True))
+        return found
+
+    with transaction.atomic():
+        existing = stored_ids()
+        options = live_options(entries)
+        votes, accepted = [], []
+        for vote_id, entry in zip(ids, entries):
+            if vote_id in existing:
+                continue
+            if (uuid.UUID(entry['option_id']), uuid.UUID(entry['poll_id'])) not in options:
+                # Poll/opsi dihapus sebelum flush; FK-nya akan menggagalkan seluruh batch
+                logger.warning(
+                    'Melewati vote %s: opsi %s di poll %s sudah tidak ada',
+                    vote_id, entry['option_id'], entry['poll_id'],
+                )
+                continue
+            votes.append(Vote(
+                id=vote_id,
+                poll_id=entry['poll_id'],
+                option_id=entry['option_id'],
+                voter_key=entry['voter_key'],
+                ip_address=entry['ip_address'],
+                user_agent=entry['user_agent'],
+            ))
+            # Waktu vote diterima, bukan waktu flush/replay
+            accepted.append(accepted_at(entry))
+        Vote.objects.bulk_create(votes, batch_size=LOOKUP_CHUNK, ignore_conflicts=True)
+        inserted = stored_ids() - existing
+
+        # auto_now_add menimpa created_at saat insert; kembalikan nilai aslinya
+        for vote, created_at in zip(votes, accepted):
+            vote.created_at = created_at
+        Vote.objects.bulk_update(
+            [vote for vote in votes if vote.id in inserted], ['created_at'], batch_size=LOOKUP_CHUNK,
+        )
+
+        counts = defaultdict(lambda: defaultdict(int))
+        rollups = defaultdict(list)
+        for vote in votes:
+            if vote.id in inserted:
+                counts[vote.poll_id][vote.option_id] += 1
+                rollups[vote.poll_id].append((vote.option_id, vote.created_at))
+        for poll_id, option_counts in counts.items():
+            increment_vote_counters(poll_id, option_counts)
+            increment_rollups(poll_id, rollups[poll_id])
+
+    # Satu notifikasi (cache + SSE) per poll per batch
+    for poll in Poll.objects.filter(pk__in=list(counts)):
+        notify_poll_changed(poll)
+    return len(inserted)
+
+
+def recover_log_dir(log_dir, skip=()):
+    """
+    Menyimpan ulang semua log/segmen di ``log_dir`` yang tidak sedang dikunci
+    proses lain. Segmen yang isinya ditolak DB diganti akhiran ``.failed``
+    untuk diperiksa manual; gangguan DB lain membiarkan segmen untuk replay
+    berikutnya. Mengembalikan jumlah vote yang baru tersimpan.
+    """
+    recovered = 0
+    for path in sorted(Path(log_dir).iterdir()):
+        if path in skip or path.suffix not in (ACTIVE_SUFFIX, FLUSHING_SUFFIX):
+            continue
+        with open(path, 'r+', encoding='utf-8') as fh:
+            if not _try_lock(fh):
+                continue  # masih dipakai proses lain
+            entries = []
+            for line in fh:
+                try:
+                    entries.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # Baris terakhir terpotong saat crash
+                    logger.warning('Melewati baris log rusak di %s', path)
+            try:
+                recovered += write_votes(entries)
+            except (IntegrityError, DataError):
+                # Isi segmen tidak bisa disimpan; pisahkan agar tidak memblokir
+                # replay segmen lain dan startup buffer
+                logger.exception('Segmen vote %s gagal disimpan; dipindah ke %s', path, FAILED_SUFFIX)
+                path.rename(path.with_suffix(FAILED_SUFFIX))
+                continue
+            except DatabaseError:
+                # Gangguan DB sementara: segmen dibiarkan untuk dicoba lagi
+                logger.exception('Gagal replay segmen vote %s; dicoba lagi nanti', path)
+                continue
+            path.unlink()
+    return recovered
+
+
+class VoteBuffer:
+    """Antrean vote di memori yang didukung log append-only"""
+
+    def __init__(self, log_dir, batch_size=500, flush_interval_ms=200, fsync=False):
+        self.log_dir = Path(log_dir)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000
+        self.fsync = fsync
+
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+        self._pending = []
+        # Kunci pemilih yang sudah diterima tapi belum tersimpan di DB
+        self._pending_keys = set()
+        # Segmen batch yang gagal di-flush -> kunci pemilihnya, dilepas setelah replay
+        self._failed_segments = {}
+        self._sequence = 0
+        self._needs_recovery = False
+
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+        self._log_path = self.log_dir / f'votes-{os.getpid()}-{uuid.uuid4().hex[:8]}{ACTIVE_SUFFIX}'
+        self._log = self._open_log(self._log_path)
+
+    def _open_log(self, path):
+        fh = open(path, 'a', encoding='utf-8')
+        _try_lock(fh)
+        return fh
+
+    def submit(self, option, voter_key, ip_address, user_agent=''):
+        """
+        Menerima vote yang sudah divalidasi dan mengembalikan UUID-nya.
+
+        Melempar ``AlreadyVoted`` jika pemilih sudah ada di antrean atau di DB.
+        """
+        key = (option.poll_id, voter_key)
+        with self._lock:
+            if key in self._pending_keys:
+                raise AlreadyVoted(voter_key)
+        if Vote.objects.filter(poll_id=option.poll_id, voter_key=voter_key).exists():
+            raise AlreadyVoted(voter_key)
+
+        entry = {
+            'id': new_vote_id().hex,
+            'poll_id': str(option.poll_id),
+            'option_id': str(option.id),
+            'voter_key': voter_key,
+            'ip_address': ip_address,
+            'user_agent': user_agent,
+            'accepted_at': timezone.now().isoformat(),
+        }
+        line = json.dumps(entry) + '\n'
+        with self._lock:
+            if key in self._pending_keys:
+                raise AlreadyVoted(voter_key)
+            self._log.write(line)
+            self._log.flush()
+            if self.fsync:
+                os.fsync(self._log.fileno())
+            self._pending.append(entry)
+            self._pending_keys.add(key)
+            full = len(self._pending) >= self.batch_size
+        if full:
+            self._wakeup.set()
+        return uuid.UUID(entry['id'])
+
+    def flush(self):
+        """Menyimpan semua vote di antrean ke DB. Mengembalikan jumlah yang tersimpan."""
+        with self._flush_lock:
+            with self._lock:
+                if not self._pending:
+                    return 0
+                batch, self._pending = self._pending, []
+                # Putar log: segmen lama tetap terkunci sampai batch tersimpan
+                self._sequence += 1
+                segment_path = self._log_path.with_suffix(f'.{self._sequence}{FLUSHING_SUFFIX}')
+                self._log_path.rename(segment_path)
+                segment = self._log
+                self._log = self._open_log(self._log_path)
+
+            try:
+                written = write_votes(batch)
+            except Exception:
+                # Segmen tetap di disk dan direplay oleh recover() pada tick
+                # berikutnya; kunci pemilih tetap tercatat agar tidak bisa
+                # vote ulang sebelum itu.
+                logger.exception('Gagal menyimpan batch vote; segmen %s disimpan', segment_path)
+                segment.close()
+                with self._lock:
+                    self._failed_segments[segment_path] = [
+                        (uuid.UUID(entry['poll_id']), entry['voter_key']) for entry in batch
+                    ]
+                self._needs_recovery = True
+                raise
+
+            segment_path.unlink()
+            segment.close()
+            with self._lock:
+                self._pending_keys.difference_update(
+                    (uuid.UUID(entry['poll_id']), entry['voter_key']) for entry in batch
+                )
+            return written
+
+    def recover(self):
+        """
+        Replay log/segmen yang ditinggalkan proses yang sudah mati atau batch
+        yang gagal di-flush. Kunci pemilih dari segmen yang sudah selesai
+        (tersimpan atau dipindah ke ``.failed``) dilepas dari antrean.
+        """
+        recovered = recover_log_dir(self.log_dir, skip=(self._log_path,))
+        with self._lock:
+            for path in [path for path in self._failed_segments if not path.exists()]:
+                self._pending_keys.difference_update(self._failed_segments.pop(path))
+        return recovered
+
+    def start(self):
+        """Memulai thread flusher di background"""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name='vote-buffer-flusher', daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def stop(self):
+        """Menghentikan flusher dan menyimpan sisa antrean"""
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            close_old_connections()
+            try:
+                if self._needs_recovery:
+                    self.recover()
+                    # Segmen yang masih tertinggal dicoba lagi pada tick berikutnya
+                    self._needs_recovery = bool(self._failed_segments)
+                self.flush()
+            except Exception:
+                # Sudah dicatat di flush(); coba lagi pada tick berikutnya
+                time.sleep(self.flush_interval)
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_vote_buffer():
+    """Mengembalikan VoteBuffer proses ini, atau None jika mode buffer nonaktif"""
+    global _buffer
+    config = {**DEFAULTS, **getattr(settings, 'POLLS_VOTE_BUFFER', {})}
+    if not config['ENABLED']:
+        return None
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                buffer = VoteBuffer(
+                    config['LOG_DIR'] or Path(settings.BASE_DIR) / 'vote-log',
+                    batch_size=config['BATCH_SIZE'],
+                    flush_interval_ms=config['FLUSH_INTERVAL_MS'],
+                    fsync=config['FSYNC'],
+                )
+                buffer.recover()
+                buffer.start()
+                _buffer = buffer
+    return _buffer
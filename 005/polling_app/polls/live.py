@@ -0,0 +1,267 @@
+"""
+Fan-out update hasil poll melalui channel layer.
+
+Setiap poll memiliki satu group di channel layer. ``views.vote`` menerbitkan
+satu snapshot per vote yang diterima. Di setiap proses, satu ``PollFeed``
+per poll berlangganan group tersebut, mengubah snapshot menjadi delta
+bernomor dan membagikannya ke semua koneksi SSE lokal, sehingga listener
+yang diam tidak menjalankan query.
+
+Format event SSE::
+
+    id: <sequence>
+    event: snapshot | delta
+    data: <json>
+
+ID event adalah ``Poll.sequence`` setelah perubahan, yang bernilai sama di
+semua proses dan selalu naik, juga saat vote dihapus dan ``total_votes``
+turun. Klien yang tersambung ulang dengan
+``Last-Event-ID`` hanya menerima delta yang terlewat dari ring buffer
+(``POLLS_SSE_REPLAY_EVENTS``), atau snapshot penuh jika sudah terlalu jauh.
+"""
+import asyncio
+import json
+import uuid
+from collections import deque
+
+from asgiref.sync import async_to_sync, sync_to_async
+from channels.layers import get_channel_layer
+from django.conf import settings
+
+from .snapshot import PollSnapshot
+
+
+UPDATE_MESSAGE_TYPE = 'poll.update'
+LISTENER_QUEUE_SIZE = 100
+
+
+def poll_group_name(poll_id):
+    """Nama group channel layer untuk sebuah poll"""
+    return f'poll.{uuid.UUID(str(poll_id)).hex}'
+
+
+def sse_event(data, event=None, event_id=None):
+    """Memformat satu event Server-Sent Events"""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}\n")
+    if event is not None:
+        lines.append(f"event: {event}\n")
+    lines.append(f"data: {json.dumps(data)}\n\n")
+    return ''.join(lines)
+
+
+def snapshot_event(data):
+    """Event SSE berisi snapshot penuh (payload ``PollSnapshot.as_dict()``)"""
+    return sse_event(data, event='snapshot', event_id=data['sequence'])
+
+
+def make_delta(counts, data):
+    """
+    Membandingkan snapshot ``data`` dengan ``counts`` ({option_id: votes})
+    dan mengembalikan payload delta yang hanya memuat opsi yang berubah.
+    """
+    changes = []
+    for option in data['results']:
+        previous = counts.get(option['id'])
+        if previous != option['votes']:
+            change = {'id': option['id'], 'votes': option['votes']}
+            if previous is None:
+                # Opsi baru: klien belum tahu teksnya
+                change['text'] = option['text']
+            changes.append(change)
+    return {
+        'poll_id': data['poll_id'],
+        'total_votes': data['total_votes'],
+        'changes': changes,
+    }
+
+
+def counts_of(data):
+    return {option['id']: option['votes'] for option in data['results']}
+
+
+def publish_snapshot(snapshot):
+    """Mengirim snapshot ke semua listener poll (no-op tanpa channel layer)"""
+    channel_layer = get_channel_layer()
+    if channel_layer is None:
+        return
+    async_to_sync(channel_layer.group_send)(
+        poll_group_name(snapshot.poll_id),
+        {'type': UPDATE_MESSAGE_TYPE, 'data': snapshot.as_dict()},
+    )
+
+
+class Listener:
+    """Antrean delta untuk satu koneksi SSE"""
+
+    def __init__(self):
+        self.queue = asyncio.Queue(maxsize=LISTENER_QUEUE_SIZE)
+        # Klien terlalu lambat: delta dibuang dan klien dikirimi snapshot penuh
+        self.overflowed = False
+
+    def push(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+
+class PollFeed:
+    """Satu langganan group per poll per proses, dibagikan ke semua listener"""
+
+    def __init__(self, poll):
+        self.poll = poll
+        self.data = None
+        self.counts = {}
+        self.event_id = None
+        self.events = deque(maxlen=getattr(settings, 'POLLS_SSE_REPLAY_EVENTS', 256))
+        self.listeners = set()
+        self.ready = asyncio.Event()
+        self._channel = None
+        self._task = None
+        self._close_handle = None
+
+    async def start(self):
+        channel_layer = get_channel_layer()
+        self._channel = await channel_layer.new_channel()
+        # Bergabung ke group sebelum membaca DB agar tidak ada vote yang
+        # terlewat; pesan yang lebih lama dari snapshot awal diabaikan.
+        await channel_layer.group_add(poll_group_name(self.poll.id), self._channel)
+        snapshot = await sync_to_async(PollSnapshot.build)(self.poll)
+        self.data = snapshot.as_dict()
+        self.counts = counts_of(self.data)
+        self.event_id = self.data['sequence']
+        self._task = asyncio.create_task(self._run(channel_layer))
+        self.ready.set()
+
+    async def _run(self, channel_layer):
+        # Keanggotaan group kedaluwarsa setelah group_expiry channel layer
+        # (default 1 hari); daftarkan ulang secara berkala agar feed yang
+        # hidup lama tetap menerima update.
+        refresh = getattr(settings, 'POLLS_SSE_GROUP_REFRESH', 3600)
+        loop = asyncio.get_running_loop()
+        refresh_at = loop.time() + refresh
+        while True:
+            try:
+                message = await asyncio.wait_for(
+                    channel_layer.receive(self._channel), max(refresh_at - loop.time(), 0)
+                )
+            except asyncio.TimeoutError:
+                message = None
+            if loop.time() >= refresh_at:
+                await channel_layer.group_add(poll_group_name(self.poll.id), self._channel)
+                refresh_at = loop.time() + refresh
+            if message is not None and message.get('type') == UPDATE_MESSAGE_TYPE:
+                self.apply(message['data'])
+
+    def apply(self, data):
+        """Menerapkan snapshot baru dan membagikan deltanya"""
+        if data['sequence'] <= self.event_id:
+            return  # duplikat atau datang tidak berurutan
+        event = {
+            'id': data['sequence'],
+            'prev': self.event_id,
+            'payload': make_delta(self.counts, data),
+        }
+        self.events.append(event)
+        self.data = data
+        self.counts = counts_of(data)
+        self.event_id = event['id']
+        for listener in self.listeners:
+            listener.push(event)
+
+    def missed_since(self, last_event_id):
+        """
+        Delta setelah ``last_event_id``, atau None jika tidak bisa dilanjutkan
+        dari ring buffer (klien harus menerima snapshot penuh).
+        """
+        if last_event_id == self.event_id:
+            return []
+        for index, event in enumerate(self.events):
+            if event['prev'] == last_event_id:
+                return list(self.events)[index:]
+        return None
+
+    def add_listener(self, listener=None):
+        """
+        Mendaftarkan listener baru. ``listener`` boleh objek apa pun dengan
+        method ``push(event)``; default-nya antrean ``Listener`` untuk SSE.
+        """
+        if self._close_handle is not None:
+            self._close_handle.cancel()
+            self._close_handle = None
+        listener = listener or Listener()
+        self.listeners.add(listener)
+        return listener
+
+    def remove_listener(self, listener):
+        self.listeners.discard(listener)
+        if not self.listeners:
+            # Dibiarkan hidup sebentar agar klien yang reconnect masih bisa resume
+            linger = getattr(settings, 'POLLS_SSE_FEED_LINGER', 30)
+            self._close_handle = asyncio.get_running_loop().call_later(linger, self._close)
+
+    def _close(self):
+        if self.listeners:
+            return
+        _feeds.pop(self.poll.id, None)
+        self._task.cancel()
+        channel_layer = get_channel_layer()
+        asyncio.ensure_future(
+            channel_layer.group_discard(poll_group_name(self.poll.id), self._channel)
+        )
+
+
+_feeds = {}
+
+
+async def open_feed(poll):
+    """PollFeed proses ini untuk ``poll``, dibuat jika belum ada"""
+    feed = _feeds.get(poll.id)
+    if feed is None:
+        feed = _feeds[poll.id] = PollFeed(poll)
+        try:
+            await feed.start()
+        except BaseException:
+            _feeds.pop(poll.id, None)
+            raise
+    else:
+        await feed.ready.wait()
+    return feed
+
+
+async def stream(poll, last_event_id=None):
+    """
+    Async generator event SSE untuk satu koneksi.
+
+    Mengirim snapshot penuh (atau delta yang terlewat jika ``last_event_id``
+    masih ada di ring buffer), lalu delta setiap ada vote. Komentar
+    keep-alive dikirim setiap ``POLLS_SSE_HEARTBEAT`` detik tanpa update.
+    """
+    heartbeat = getattr(settings, 'POLLS_SSE_HEARTBEAT', 15)
+    feed = await open_feed(poll)
+    listener = feed.add_listener()
+    try:
+        missed = feed.missed_since(last_event_id) if last_event_id is not None else None
+        if missed is None:
+            yield snapshot_event(feed.data)
+        else:
+            for event in missed:
+                yield sse_event(event['payload'], event='delta', event_id=event['id'])
+
+        while True:
+            try:
+                event = await asyncio.wait_for(listener.queue.get(), heartbeat)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            if listener.overflowed:
+                while not listener.queue.empty():
+                    listener.queue.get_nowait()
+                listener.overflowed = False
+                yield snapshot_event(feed.data)
+                continue
+            yield sse_event(event['payload'], event='delta', event_id=event['id'])
+    finally:
+        feed.remove_listener(listener)
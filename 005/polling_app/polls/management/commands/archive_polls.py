@@ -0,0 +1,54 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from polls.archive import ArchiveError, archive_poll, restore_poll
+from polls.models import Poll
+
+
+class Command(BaseCommand):
+    help = 'Memindahkan vote poll nonaktif ke file arsip, atau memulihkannya (lihat polls.archive)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--poll', action='append', dest='poll_ids', metavar='POLL_ID',
+            help='Poll yang diproses (bisa diulang)',
+        )
+        parser.add_argument(
+            '--closed-days', type=int, metavar='N',
+            help='Arsipkan semua poll nonaktif yang tidak berubah selama N hari',
+        )
+        parser.add_argument('--restore', action='store_true', help='Pulihkan vote dari arsip')
+
+    def handle(self, *args, poll_ids=None, closed_days=None, restore=False, **options):
+        if not poll_ids and closed_days is None:
+            raise CommandError('Isi --poll atau --closed-days.')
+
+        polls = Poll.objects.all()
+        if poll_ids:
+            polls = polls.filter(id__in=poll_ids)
+        if closed_days is not None:
+            if restore:
+                raise CommandError('--closed-days tidak bisa dipakai bersama --restore.')
+            polls = polls.filter(
+                is_active=False,
+                archived_at__isnull=True,
+                updated_at__lt=timezone.now() - timedelta(days=closed_days),
+            )
+
+        failed = 0
+        for poll in polls.iterator():
+            try:
+                if restore:
+                    count = restore_poll(poll)
+                    self.stdout.write(f'{poll.id}: {count} vote dipulihkan')
+                else:
+                    count = archive_poll(poll)
+                    self.stdout.write(f'{poll.id}: {count} vote diarsipkan')
+            except ArchiveError as e:
+                failed += 1
+                self.stderr.write(str(e))
+
+        if failed:
+            raise CommandError(f'{failed} poll gagal diproses.')
@@ -0,0 +1,36 @@
+import sys
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from polls.exporter import CHUNK_SIZE, FORMATS, export_votes
+from polls.models import Poll
+
+
+class Command(BaseCommand):
+    help = 'Export seluruh vote sebuah poll ke CSV/NDJSON secara streaming (lihat polls.exporter)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('poll_id')
+        parser.add_argument('--format', choices=FORMATS, default='csv')
+        parser.add_argument('--gzip', action='store_true', help='Kompresi output dengan gzip')
+        parser.add_argument('--output', '-o', help='File tujuan (default: stdout)')
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE,
+                            help='Jumlah baris yang diambil dari DB per fetch')
+
+    def handle(self, *args, poll_id, format='csv', gzip=False, output=None, chunk_size=CHUNK_SIZE, **options):
+        try:
+            poll = Poll.objects.only('id').get(id=poll_id)
+        except (Poll.DoesNotExist, ValidationError):
+            raise CommandError(f'Poll {poll_id} tidak ditemukan.')
+
+        chunks = export_votes(poll.id, format, compress=gzip, chunk_size=chunk_size)
+        if output:
+            with open(output, 'wb') as fh:
+                for chunk in chunks:
+                    fh.write(chunk)
+            self.stderr.write(self.style.SUCCESS(f'Vote poll {poll.id} diekspor ke {output}.'))
+        else:
+            for chunk in chunks:
+                sys.stdout.buffer.write(chunk)
+            sys.stdout.buffer.flush()
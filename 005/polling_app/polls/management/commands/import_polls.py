@@ -0,0 +1,49 @@
+import sys
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from polls.importer import FORMATS, PayloadError, create_polls, read_rows, validate_rows
+
+
+class Command(BaseCommand):
+    help = 'Membuat poll secara massal dari file JSON atau CSV (lihat polls.importer)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='File JSON/CSV, atau - untuk stdin')
+        parser.add_argument('--format', choices=FORMATS, help='Default: dari ekstensi file, atau json')
+        parser.add_argument(
+            '--batch-size', type=int,
+            default=getattr(settings, 'POLLS_IMPORT_BATCH_SIZE', 500),
+            help='Jumlah poll per transaksi',
+        )
+        parser.add_argument('--dry-run', action='store_true', help='Hanya validasi, tanpa menyimpan')
+
+    def handle(self, *args, path, format=None, batch_size=500, dry_run=False, **options):
+        if format is None:
+            format = 'csv' if path.lower().endswith('.csv') else 'json'
+        try:
+            if path == '-':
+                rows = read_rows(sys.stdin.buffer, format)
+            else:
+                with open(Path(path), 'rb') as fh:
+                    rows = read_rows(fh, format)
+        except (OSError, PayloadError) as e:
+            raise CommandError(f'Tidak bisa membaca {path}: {e}')
+
+        poll_rows, invalid = validate_rows(rows)
+        for row, errors in invalid:
+            self.stderr.write(f'Baris {row}: {"; ".join(errors)}')
+        if invalid:
+            raise CommandError(f'{len(invalid)} dari {len(rows)} baris tidak valid, tidak ada poll yang dibuat.')
+
+        if dry_run:
+            self.stdout.write(self.style.SUCCESS(f'{len(poll_rows)} poll valid (dry run).'))
+            return
+
+        created = 0
+        for created, _ in enumerate(create_polls(poll_rows, batch_size=batch_size), start=1):
+            if created % batch_size == 0:
+                self.stdout.write(f'{created}/{len(poll_rows)} poll dibuat...')
+        self.stdout.write(self.style.SUCCESS(f'{created} poll berhasil diimpor.'))
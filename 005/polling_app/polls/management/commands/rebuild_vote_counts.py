@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from polls.counters import find_counter_mismatches, rebuild_vote_counters
+from polls.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = 'Membangun ulang dan memverifikasi counter vote Poll/Option dari tabel Vote'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--poll', action='append', dest='poll_ids', metavar='POLL_ID',
+            help='Batasi ke poll tertentu (bisa diulang)',
+        )
+        parser.add_argument(
+            '--check', action='store_true',
+            help='Hanya verifikasi; gagal jika ada counter yang tidak cocok',
+        )
+        parser.add_argument(
+            '--rollups', action='store_true',
+            help='Bangun ulang juga rollup timeline (VoteRollup)',
+        )
+
+    def handle(self, *args, poll_ids=None, check=False, rollups=False, **options):
+        if check:
+            mismatches = find_counter_mismatches(poll_ids)
+        else:
+            mismatches = rebuild_vote_counters(poll_ids)
+
+        for obj, stored, actual in mismatches:
+            self.stdout.write(
+                f'{obj._meta.verbose_name} {obj.pk}: tersimpan={stored} sebenarnya={actual}'
+            )
+
+        if not mismatches:
+            self.stdout.write(self.style.SUCCESS('Semua counter vote sudah cocok.'))
+        elif check:
+            raise CommandError(f'{len(mismatches)} counter vote tidak cocok.')
+        else:
+            self.stdout.write(self.style.SUCCESS(f'{len(mismatches)} counter vote diperbaiki.'))
+
+        if rollups and not check:
+            buckets = rebuild_rollups(poll_ids)
+            self.stdout.write(self.style.SUCCESS(f'{buckets} bucket rollup dibangun ulang.'))
@@ -0,0 +1,22 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from polls.ingest import DEFAULTS, recover_log_dir
+
+
+class Command(BaseCommand):
+    help = 'Menyimpan ulang vote dari log buffer write-behind yang belum ter-flush'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--log-dir', help='Direktori log (default: POLLS_VOTE_BUFFER["LOG_DIR"])')
+
+    def handle(self, *args, log_dir=None, **options):
+        config = {**DEFAULTS, **getattr(settings, 'POLLS_VOTE_BUFFER', {})}
+        log_dir = Path(log_dir or config['LOG_DIR'] or settings.BASE_DIR / 'vote-log')
+        if not log_dir.exists():
+            self.stdout.write('Direktori log tidak ada, tidak ada yang dipulihkan.')
+            return
+        recovered = recover_log_dir(log_dir)
+        self.stdout.write(self.style.SUCCESS(f'{recovered} vote dipulihkan dari {log_dir}.'))
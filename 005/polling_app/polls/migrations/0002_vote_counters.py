@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-17 05:59
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def populate_vote_counters(apps, schema_editor):
+    Poll = apps.get_model('polls', 'Poll')
+    Option = apps.get_model('polls', 'Option')
+    Vote = apps.get_model('polls', 'Vote')
+
+    counts = dict(
+        Vote.objects.order_by().values('option_id').annotate(n=Count('id')).values_list('option_id', 'n')
+    )
+    options = list(Option.objects.filter(id__in=counts.keys()).only('id', 'poll_id'))
+    totals = {}
+    for option in options:
+        option.vote_count = counts[option.id]
+        totals[option.poll_id] = totals.get(option.poll_id, 0) + option.vote_count
+    Option.objects.bulk_update(options, ['vote_count'], batch_size=500)
+
+    polls = list(Poll.objects.filter(id__in=totals.keys()).only('id'))
+    for poll in polls:
+        poll.total_votes = totals[poll.id]
+    Poll.objects.bulk_update(polls, ['total_votes'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('polls', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='option',
+            name='vote_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Jumlah Vote'),
+        ),
+        migrations.AddField(
+            model_name='poll',
+            name='total_votes',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Total Vote'),
+        ),
+        migrations.RunPython(populate_vote_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('polls', '0002_vote_counters'),
+    ]
+
+    operations = [
+        # Nullable dulu; diisi oleh 0004 lalu dijadikan NOT NULL di 0005
+        migrations.AddField(
+            model_name='vote',
+            name='poll',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='votes', to='polls.poll'),
+        ),
+        migrations.AddField(
+            model_name='vote',
+            name='voter_key',
+            field=models.CharField(default='', max_length=64, verbose_name='Kunci Pemilih'),
+            preserve_default=False,
+        ),
+    ]
@@ -0,0 +1,54 @@
+from django.db import migrations, transaction
+from django.db.models import Count
+
+BATCH_SIZE = 1000
+
+
+def backfill_vote_poll(apps, schema_editor):
+    """Mengisi Vote.poll dan Vote.voter_key per batch, commit tiap batch"""
+    Vote = apps.get_model('polls', 'Vote')
+
+    last_pk = None
+    while True:
+        batch = Vote.objects.order_by('pk')
+        if last_pk is not None:
+            batch = batch.filter(pk__gt=last_pk)
+        rows = list(batch.values_list('pk', 'option__poll_id', 'ip_address', 'voter_key')[:BATCH_SIZE])
+        if not rows:
+            break
+        last_pk = rows[-1][0]
+
+        votes = [
+            Vote(pk=pk, poll_id=poll_id, voter_key=voter_key or ip_address)
+            for pk, poll_id, ip_address, voter_key in rows
+        ]
+        with transaction.atomic():
+            Vote.objects.bulk_update(votes, ['poll', 'voter_key'])
+
+    # Duplikat lama (sebelum ada constraint) diberi kunci unik agar
+    # constraint bisa dibuat tanpa menghapus data; vote tertua dipertahankan.
+    duplicates = (
+        Vote.objects.order_by().values('poll_id', 'voter_key')
+        .annotate(n=Count('pk')).filter(n__gt=1)
+    )
+    for duplicate in duplicates.iterator():
+        extra = list(
+            Vote.objects.filter(poll_id=duplicate['poll_id'], voter_key=duplicate['voter_key'])
+            .order_by('created_at', 'pk')[1:]
+        )
+        for vote in extra:
+            vote.voter_key = f'dup:{vote.pk.hex}'
+        with transaction.atomic():
+            Vote.objects.bulk_update(extra, ['voter_key'])
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('polls', '0003_vote_poll_voter_key'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_vote_poll, migrations.RunPython.noop),
+    ]
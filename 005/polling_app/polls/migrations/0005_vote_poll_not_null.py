@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('polls', '0004_backfill_vote_poll'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='vote',
+            name='poll',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='votes', to='polls.poll'),
+        ),
+        migrations.AddConstraint(
+            model_name='vote',
+            constraint=models.UniqueConstraint(fields=('poll', 'voter_key'), name='unique_poll_voter'),
+        ),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:11
+
+from collections import defaultdict
+from datetime import datetime, timezone
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Resolusi default polls.rollups (1m, 1h). Jika POLLS_ROLLUP_RESOLUTIONS
+# diubah, jalankan ``rebuild_vote_counts --rollups`` setelah migrasi.
+RESOLUTIONS = (60, 3600)
+
+
+def populate_rollups(apps, schema_editor):
+    Vote = apps.get_model('polls', 'Vote')
+    VoteRollup = apps.get_model('polls', 'VoteRollup')
+
+    rows = defaultdict(int)
+    votes = Vote.objects.order_by().values_list('poll_id', 'option_id', 'created_at')
+    for poll_id, option_id, created_at in votes.iterator(chunk_size=2000):
+        epoch = int(created_at.timestamp())
+        for resolution in RESOLUTIONS:
+            start = datetime.fromtimestamp(epoch - epoch % resolution, tz=timezone.utc)
+            rows[poll_id, option_id, resolution, start] += 1
+    VoteRollup.objects.bulk_create(
+        [
+            VoteRollup(poll_id=poll_id, option_id=option_id, resolution=resolution,
+                       bucket_start=start, count=count)
+            for (poll_id, option_id, resolution, start), count in rows.items()
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('polls', '0005_vote_poll_not_null'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VoteRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('resolution', models.PositiveIntegerField(verbose_name='Resolusi (detik)')),
+                ('bucket_start', models.DateTimeField(verbose_name='Awal Bucket')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='Jumlah Vote')),
+                ('option', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rollups', to='polls.option')),
+                ('poll', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rollups', to='polls.poll')),
+            ],
+            options={
+                'verbose_name': 'Rollup Vote',
+                'verbose_name_plural': 'Rollup Vote',
+                'ordering': ['bucket_start'],
+                'indexes': [models.Index(fields=['poll', 'resolution', 'bucket_start'], name='rollup_poll_range_idx')],
+                'constraints': [models.UniqueConstraint(fields=('option', 'resolution', 'bucket_start'), name='unique_rollup_bucket')],
+            },
+        ),
+        migrations.RunPython(populate_rollups, migrations.RunPython.noop),
+    ]
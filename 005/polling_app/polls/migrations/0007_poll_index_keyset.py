@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('polls', '0006_vote_rollups'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='poll',
+            index=models.Index(fields=['is_active', '-created_at', '-id'], name='poll_active_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='poll',
+            index=models.Index(fields=['is_active', '-total_votes', '-created_at', '-id'], name='poll_active_votes_idx'),
+        ),
+    ]
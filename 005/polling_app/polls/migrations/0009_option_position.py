@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('polls', '0008_vote_recent_idx'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='option',
+            options={'ordering': ['position', 'created_at'], 'verbose_name': 'Opsi', 'verbose_name_plural': 'Opsi'},
+        ),
+        migrations.AddField(
+            model_name='option',
+            name='position',
+            field=models.PositiveSmallIntegerField(default=0, verbose_name='Urutan'),
+        ),
+    ]
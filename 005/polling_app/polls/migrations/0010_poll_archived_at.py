@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('polls', '0009_option_position'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='poll',
+            name='archived_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Diarsipkan'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:19
+
+import polls.ids
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+    Hanya default Python yang berubah: tipe kolom tetap UUID dan id vote
+    lama dipertahankan. Dibuat state-only karena SQLite akan membangun
+    ulang seluruh tabel vote untuk AlterField biasa.
+    """
+
+    dependencies = [
+        ('polls', '0010_poll_archived_at'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name='vote',
+                    name='id',
+                    field=models.UUIDField(default=polls.ids.new_vote_id, editable=False, primary_key=True, serialize=False),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,25 @@
+from django.db import migrations, models
+from django.db.models import F
+
+
+def start_from_total_votes(apps, schema_editor):
+    # ID event lama adalah total_votes; mulai dari sana agar klien yang
+    # resume dengan Last-Event-ID lama tidak melihat ID yang mundur
+    Poll = apps.get_model('polls', 'Poll')
+    Poll.objects.update(sequence=F('total_votes'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('polls', '0011_vote_time_ordered_id'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='poll',
+            name='sequence',
+            field=models.PositiveBigIntegerField(default=0, editable=False, verbose_name='Nomor Urut Perubahan'),
+        ),
+        migrations.RunPython(start_from_total_votes, migrations.RunPython.noop),
+    ]
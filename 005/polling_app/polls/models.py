@@ -1,7 +1,15 @@
-from django.db import models
+from django.db import models, transaction
 from django.urls import reverse
 import uuid
 
+from .ids import new_vote_id
+
+
+class PollQuerySet(models.QuerySet):
+    def with_results(self):
+        """Poll yang hasilnya boleh ditampilkan: aktif, atau sudah diarsipkan"""
+        return self.filter(models.Q(is_active=True) | models.Q(archived_at__isnull=False))
+
 
 class Poll(models.Model):
     """Model untuk poll/survei"""
@@ -11,21 +19,31 @@ class Poll(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     is_active = models.BooleanField(default=True, verbose_name="Aktif")
+    # Counter denormalisasi, dinaikkan secara atomik bersama insert Vote
+    total_votes = models.PositiveIntegerField(default=0, editable=False, verbose_name="Total Vote")
+    # Naik setiap kali hasil berubah (vote masuk atau dihapus), tidak pernah
+    # turun; dipakai sebagai ID event SSE/WebSocket (lihat polls.live)
+    sequence = models.PositiveBigIntegerField(default=0, editable=False, verbose_name="Nomor Urut Perubahan")
+    # Diisi saat vote dipindah ke file arsip (lihat polls.archive)
+    archived_at = models.DateTimeField(null=True, blank=True, editable=False, verbose_name="Diarsipkan")
+    
+    objects = PollQuerySet.as_manager()
     
     class Meta:
         ordering = ['-created_at']
         verbose_name = "Poll"
         verbose_name_plural = "Polls"
+        # Index untuk pagination keyset halaman utama (terbaru / vote terbanyak)
+        indexes = [
+            models.Index(fields=['is_active', '-created_at', '-id'], name='poll_active_recent_idx'),
+            models.Index(fields=['is_active', '-total_votes', '-created_at', '-id'], name='poll_active_votes_idx'),
+        ]
     
     def __str__(self):
         return self.title
     
     def get_absolute_url(self):
         return reverse('polls:detail', kwargs={'poll_id': self.id})
-    
-    def total_votes(self):
-        """Menghitung total votes untuk poll ini"""
-        return Vote.objects.filter(option__poll=self).count()
 
 
 class Option(models.Model):
@@ -33,10 +51,14 @@ class Option(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     poll = models.ForeignKey(Poll, on_delete=models.CASCADE, related_name='options')
     text = models.CharField(max_length=200, verbose_name="Teks Opsi")
+    # Urutan tampil; opsi yang dibuat dengan bulk_create bisa memiliki created_at sama
+    position = models.PositiveSmallIntegerField(default=0, verbose_name="Urutan")
     created_at = models.DateTimeField(auto_now_add=True)
+    # Counter denormalisasi, lihat polls.counters
+    vote_count = models.PositiveIntegerField(default=0, editable=False, verbose_name="Jumlah Vote")
     
     class Meta:
-        ordering = ['created_at']
+        ordering = ['position', 'created_at']
         verbose_name = "Opsi"
         verbose_name_plural = "Opsi"
         # Composite index untuk optimasi query
@@ -47,25 +69,45 @@ class Option(models.Model):
     def __str__(self):
         return f"{self.poll.title} - {self.text}"
     
-    def vote_count(self):
-        """Menghitung jumlah vote untuk opsi ini"""
-        return self.votes.count()
-    
     def vote_percentage(self):
         """Menghitung persentase vote untuk opsi ini"""
-        total = self.poll.total_votes()
+        total = self.poll.total_votes
         if total == 0:
             return 0
-        return round((self.vote_count() / total) * 100, 1)
+        return round((self.vote_count / total) * 100, 1)
+
+
+class VoteQuerySet(models.QuerySet):
+    def delete(self):
+        """
+        Menghapus vote sekaligus menurunkan counter dan rollup per kelompok
+        (lihat ``services.release_deleted_votes``). Cascade dari Poll tidak
+        melewati method ini dan tetap berupa DELETE massal.
+        """
+        from .services import release_deleted_votes
+
+        with transaction.atomic(using=self.db):
+            release_deleted_votes(self)
+            return super().delete()
+
+    delete.alters_data = True
+    delete.queryset_only = True
 
 
 class Vote(models.Model):
     """Model untuk vote/suara"""
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    # Time-ordered (UUIDv7) secara default, lihat polls.ids
+    id = models.UUIDField(primary_key=True, default=new_vote_id, editable=False)
+    # Denormalisasi dari option.poll agar cek duplikat tidak perlu join ke Option
+    poll = models.ForeignKey(Poll, on_delete=models.CASCADE, related_name='votes')
     option = models.ForeignKey(Option, on_delete=models.CASCADE, related_name='votes')
+    # Identitas pemilih per poll (saat ini diturunkan dari IP address)
+    voter_key = models.CharField(max_length=64, verbose_name="Kunci Pemilih")
     ip_address = models.GenericIPAddressField(verbose_name="IP Address")
     user_agent = models.TextField(blank=True, verbose_name="User Agent")
     created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = VoteQuerySet.as_manager()
     
     class Meta:
         ordering = ['-created_at']
@@ -74,13 +116,52 @@ class Vote(models.Model):
         # Index untuk optimasi query
         indexes = [
             models.Index(fields=['option', 'created_at'], name='option_created_idx'),
+            # Urutan default (+ pk penentu dari admin) tanpa sort seluruh tabel
+            models.Index(fields=['-created_at', '-id'], name='vote_recent_idx'),
+        ]
+        # Satu vote per pemilih per poll; index ini juga dipakai untuk cek duplikat
+        constraints = [
+            models.UniqueConstraint(fields=['poll', 'voter_key'], name='unique_poll_voter'),
         ]
     
     def __str__(self):
         return f"Vote untuk {self.option.text} dari {self.ip_address}"
     
-    @property
-    def poll(self):
-        """Shortcut untuk mengakses poll dari vote"""
-        return self.option.poll
+    def save(self, *args, **kwargs):
+        # Isi poll dari option jika belum ada, tanpa memuat objek Option penuh
+        if not self.poll_id and self.option_id:
+            self.poll_id = Option.objects.values_list('poll_id', flat=True).get(pk=self.option_id)
+        if not self.voter_key:
+            self.voter_key = self.ip_address
+        super().save(*args, **kwargs)
 
+    def delete(self, using=None, keep_parents=False):
+        # Lewat queryset agar counter ikut diturunkan
+        return Vote.objects.using(using or self._state.db).filter(pk=self.pk).delete()
+
+
+class VoteRollup(models.Model):
+    """Jumlah vote per opsi dalam bucket waktu tetap (lihat polls.rollups)"""
+    poll = models.ForeignKey(Poll, on_delete=models.CASCADE, related_name='rollups')
+    option = models.ForeignKey(Option, on_delete=models.CASCADE, related_name='rollups')
+    # Lebar bucket dalam detik, mis. 60 untuk per menit
+    resolution = models.PositiveIntegerField(verbose_name="Resolusi (detik)")
+    bucket_start = models.DateTimeField(verbose_name="Awal Bucket")
+    count = models.PositiveIntegerField(default=0, verbose_name="Jumlah Vote")
+    
+    class Meta:
+        ordering = ['bucket_start']
+        verbose_name = "Rollup Vote"
+        verbose_name_plural = "Rollup Vote"
+        # Range scan timeline: satu poll, satu resolusi, urut waktu
+        indexes = [
+            models.Index(fields=['poll', 'resolution', 'bucket_start'], name='rollup_poll_range_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['option', 'resolution', 'bucket_start'], name='unique_rollup_bucket',
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.option_id} @ {self.bucket_start:%Y-%m-%d %H:%M} ({self.resolution}s): {self.count}"
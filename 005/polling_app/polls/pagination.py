@@ -0,0 +1,179 @@
+"""
+Pagination keyset (cursor) untuk daftar yang panjang.
+
+Berbeda dengan ``OFFSET``, setiap halaman dimulai dari nilai kunci urutan
+baris terakhir halaman sebelumnya, sehingga halaman ke-1000 sama cepatnya
+dengan halaman pertama selama ada index yang cocok dengan urutannya.
+Kolom urutan harus unik secara gabungan (sertakan ``id`` sebagai penentu).
+
+``EstimatedCountPaginator`` untuk changelist admin memakai statistik DB
+sebagai jumlah baris tabel besar alih-alih ``COUNT(*)``.
+"""
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from datetime import date, datetime
+from functools import reduce
+from operator import or_
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db import DatabaseError, connections
+from django.db.models import Q, QuerySet
+from django.utils.functional import cached_property
+
+
+def _cursor_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+class InvalidCursor(ValueError):
+    """Cursor rusak atau tidak cocok dengan urutan yang diminta"""
+
+
+@dataclass
+class KeysetPage:
+    items: list
+    next_cursor: str = None
+    prev_cursor: str = None
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.prev_cursor is not None
+
+
+class KeysetPaginator:
+    """
+    Paginator untuk ``queryset`` dengan urutan ``ordering``, mis.
+    ``('-created_at', '-id')``.
+    """
+
+    def __init__(self, queryset, ordering, per_page=10):
+        self.queryset = queryset
+        self.ordering = tuple(ordering)
+        self.per_page = per_page
+        self.fields = [name.lstrip('-') for name in self.ordering]
+        self.descending = [name.startswith('-') for name in self.ordering]
+
+    def page(self, after=None, before=None):
+        """Halaman setelah cursor ``after`` atau sebelum cursor ``before``"""
+        if before:
+            return self._page_before(self.decode(before))
+        queryset = self.queryset.order_by(*self.ordering)
+        if after:
+            queryset = queryset.filter(self._seek(self.decode(after), forward=True))
+        items = list(queryset[:self.per_page + 1])
+        has_next = len(items) > self.per_page
+        items = items[:self.per_page]
+        return KeysetPage(
+            items=items,
+            next_cursor=self.encode(items[-1]) if has_next else None,
+            prev_cursor=self.encode(items[0]) if after and items else None,
+        )
+
+    def _page_before(self, values):
+        reverse = [name[1:] if name.startswith('-') else f'-{name}' for name in self.ordering]
+        queryset = self.queryset.order_by(*reverse).filter(self._seek(values, forward=False))
+        items = list(queryset[:self.per_page + 1])
+        has_previous = len(items) > self.per_page
+        items = items[:self.per_page][::-1]
+        return KeysetPage(
+            items=items,
+            next_cursor=self.encode(items[-1]) if items else None,
+            prev_cursor=self.encode(items[0]) if has_previous else None,
+        )
+
+    def _seek(self, values, forward):
+        """
+        Kondisi "sesudah" (atau "sebelum") posisi ``values`` dalam urutan,
+        dalam bentuk ``a < x OR (a = x AND b < y) ...``. Batas pada kolom
+        pertama ditambahkan agar DB bisa memakai range scan pada index.
+        """
+        def lookup(index):
+            going_down = self.descending[index] == forward
+            return f'{self.fields[index]}__{"lt" if going_down else "gt"}'
+
+        branches = []
+        for index in range(len(self.fields)):
+            equal = {field: value for field, value in zip(self.fields[:index], values)}
+            branches.append(Q(**equal, **{lookup(index): values[index]}))
+        first = f'{self.fields[0]}__{"lte" if self.descending[0] == forward else "gte"}'
+        return Q(**{first: values[0]}) & reduce(or_, branches)
+
+    def encode(self, obj):
+        values = [getattr(obj, field) for field in self.fields]
+        # isoformat() penuh: DjangoJSONEncoder memotong mikrodetik sehingga
+        # baris dengan created_at yang hampir sama bisa terlewat
+        raw = json.dumps(values, default=_cursor_value, separators=(',', ':')).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+    def decode(self, cursor):
+        try:
+            raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            values = json.loads(raw)
+        except (binascii.Error, ValueError) as exc:
+            raise InvalidCursor(cursor) from exc
+        if not isinstance(values, list) or len(values) != len(self.fields):
+            raise InvalidCursor(cursor)
+        model = self.queryset.model
+        try:
+            return [model._meta.get_field(field).to_python(value)
+                    for field, value in zip(self.fields, values)]
+        except ValidationError as exc:
+            raise InvalidCursor(cursor) from exc
+
+
+def estimated_row_count(model, using='default'):
+    """
+    Perkiraan jumlah baris tabel dari statistik DB (tanpa ``COUNT(*)``).
+    ``None`` jika backend tidak didukung atau statistik belum ada.
+    """
+    connection = connections[using]
+    table = model._meta.db_table
+    if connection.vendor == 'postgresql':
+        sql = 'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass'
+    elif connection.vendor == 'mysql':
+        sql = ('SELECT table_rows FROM information_schema.tables '
+               'WHERE table_schema = DATABASE() AND table_name = %s')
+    elif connection.vendor == 'sqlite':
+        # Diisi oleh ANALYZE; angka pertama kolom stat = jumlah baris
+        sql = 'SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1'
+    else:
+        return None
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [table])
+            row = cursor.fetchone()
+    except DatabaseError:
+        return None
+    if row is None or row[0] is None:
+        return None
+    estimate = int(str(row[0]).split()[0])
+    # reltuples = -1 pada PostgreSQL untuk tabel yang belum pernah di-ANALYZE
+    return estimate if estimate >= 0 else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator admin yang memakai perkiraan jumlah baris untuk changelist
+    tanpa filter pada tabel besar, alih-alih ``COUNT(*)`` atas seluruh tabel.
+    Queryset yang difilter tetap dihitung tepat.
+    """
+    # Di bawah angka ini COUNT(*) cukup murah dan hasilnya tepat
+    estimate_threshold = 100_000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if isinstance(queryset, QuerySet) and not queryset.query.where:
+            estimate = estimated_row_count(queryset.model, using=queryset.db)
+            if estimate is not None and estimate >= self.estimate_threshold:
+                return estimate
+        return super().count
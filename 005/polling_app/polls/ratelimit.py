@@ -0,0 +1,157 @@
+"""
+Rate limit token bucket untuk jalur vote.
+
+Dicek sebelum query apa pun: flood bot ditolak dengan 429 tanpa menyentuh
+database. Setiap scope (per IP, per poll) memiliki bucket sendiri dengan
+kapasitas ``BURST`` token yang terisi ``RATE`` token per detik.
+
+Bucket disimpan di cache Django sebagai satu angka, yaitu waktu teoretis
+bucket kembali penuh (GCRA), sehingga satu request cukup satu ``get_many``
+dan satu ``set`` per scope. Token baru diambil setelah semua scope lolos:
+request yang ditolak bucket poll tidak menghabiskan token IP-nya.
+
+Pakai alias cache tersendiri yang cukup besar: bucket yang tergusur dari
+cache yang penuh berarti batasnya hilang, dan flood kunci baru tidak boleh
+menggusur isi cache lain (mis. versi cache hasil). Agar berlaku lintas
+worker, arahkan ``CACHE`` ke backend bersama (Redis/Memcached); LocMemCache
+hanya berlaku per proses. Tanpa operasi atomik di API cache, request
+bersamaan untuk kunci yang sama bisa sesekali lolos satu token lebih banyak.
+
+Konfigurasi::
+
+    POLLS_RATE_LIMIT = {
+        'ENABLED': True,
+        'CACHE': 'ratelimit',
+        'IP': {'RATE': 2, 'BURST': 20},
+        'POLL': {'RATE': 1000, 'BURST': 5000},
+    }
+"""
+import functools
+import math
+import time
+import uuid
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import JsonResponse
+
+DEFAULTS = {
+    'ENABLED': True,
+    'CACHE': 'default',
+    'IP': {'RATE': 2, 'BURST': 20},
+    'POLL': {'RATE': 1000, 'BURST': 5000},
+}
+
+KEY = 'polls:ratelimit:{}:{}'
+
+# Jumlah request yang ditolak per scope di proses ini
+throttled = Counter()
+
+
+class RateLimited(Exception):
+    """Bucket habis; ``retry_after`` dalam detik"""
+
+    def __init__(self, scope, retry_after):
+        super().__init__(scope, retry_after)
+        self.scope = scope
+        self.retry_after = retry_after
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, 'POLLS_RATE_LIMIT', {})}
+
+
+def next_full_at(stored, now, rate, burst):
+    """
+    ``(waktu_penuh_baru, detik_tunggu)`` jika satu token diambil dari bucket
+    yang tersimpan sebagai ``stored`` (None untuk bucket baru). Token hanya
+    boleh diambil jika ``detik_tunggu`` 0.
+    """
+    interval = 1 / rate
+    capacity = burst * interval
+    # Bucket penuh = waktu penuh di masa lalu; setiap token memajukannya satu interval
+    full_at = max(stored if stored is not None else now, now) + interval
+    return full_at, max(full_at - now - capacity, 0)
+
+
+def store(cache, cache_key, full_at, now):
+    cache.set(cache_key, full_at, timeout=math.ceil(full_at - now) + 1)
+
+
+def take(cache, scope, key, rate, burst, now=None):
+    """
+    Mengambil satu token dari bucket ``(scope, key)``. Mengembalikan 0 jika
+    berhasil, atau jumlah detik hingga token berikutnya tersedia.
+    """
+    now = time.time() if now is None else now
+    cache_key = KEY.format(scope, key)
+    full_at, retry_after = next_full_at(cache.get(cache_key), now, rate, burst)
+    if not retry_after:
+        store(cache, cache_key, full_at, now)
+    return retry_after
+
+
+def check(**keys):
+    """
+    Mengambil token dari setiap scope (mis. ``ip=...``, ``poll=...``).
+    Semua bucket diperiksa lebih dulu; ``RateLimited`` dilempar untuk scope
+    pertama yang habis tanpa mengambil token dari scope mana pun.
+    """
+    config = get_config()
+    if not config['ENABLED']:
+        return
+    cache = caches[config['CACHE']]
+    now = time.time()
+    cache_keys = {scope: KEY.format(scope, key) for scope, key in keys.items()}
+    stored = cache.get_many(list(cache_keys.values()))
+
+    updates = []
+    for scope, cache_key in cache_keys.items():
+        rule = config[scope.upper()]
+        full_at, retry_after = next_full_at(stored.get(cache_key), now, rule['RATE'], rule['BURST'])
+        if retry_after:
+            throttled[scope] += 1
+            raise RateLimited(scope, retry_after)
+        updates.append((cache_key, full_at))
+    for cache_key, full_at in updates:
+        store(cache, cache_key, full_at, now)
+
+
+def rate_limit(**key_funcs):
+    """
+    Decorator view: setiap argumen adalah scope dengan fungsi
+    ``(request, **view_kwargs) -> kunci`` yang tidak boleh menyentuh DB.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(request, *args, **kwargs):
+            try:
+                check(**{scope: func(request, **kwargs) for scope, func in key_funcs.items()})
+            except RateLimited as exc:
+                return too_many_requests(exc)
+            return view(request, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def too_many_requests(exc):
+    retry_after = math.ceil(exc.retry_after)
+    response = JsonResponse(
+        {'error': 'Terlalu banyak request, coba lagi nanti', 'retry_after': retry_after},
+        status=429,
+    )
+    response['Retry-After'] = str(retry_after)
+    return response
+
+
+def poll_key(poll_id):
+    return uuid.UUID(str(poll_id)).hex
+
+
+def rate_limit_metrics():
+    """Baris metrik Prometheus untuk ``/metrics``"""
+    lines = ['# TYPE polls_rate_limited_total counter']
+    for scope in ('ip', 'poll'):
+        lines.append(f'polls_rate_limited_total{{scope="{scope}"}} {throttled[scope]}')
+    return lines
@@ -0,0 +1,74 @@
+"""
+Cache hasil poll berbasis nomor versi per poll.
+
+Setiap vote menaikkan versi poll; body JSON hasil disimpan di cache Django
+dengan kunci ``(poll, versi)`` dan ETag diturunkan dari versi yang sama.
+Poll yang tidak berubah cukup dilayani dengan satu lookup cache: 304 jika
+ETag klien cocok, atau body yang sudah tersimpan jika tidak.
+
+Kunci versi hanya dibuat untuk poll yang sudah dipastikan ada di DB, dan
+dihapus saat poll dihapus, sehingga id acak tidak mengisi cache dan poll
+yang sudah dihapus tidak lagi dilayani dari cache.
+"""
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
+VERSION_KEY = 'polls:results:version:{}'
+BODY_KEY = 'polls:results:body:{}:{}'
+
+
+def _initial_version():
+    # Berbasis waktu agar versi baru setelah kunci hilang dari cache tidak
+    # pernah sama dengan ETag lama yang masih dipegang klien.
+    return int(time.time() * 1000)
+
+
+def _version_key(poll_id):
+    return VERSION_KEY.format(uuid.UUID(str(poll_id)).hex)
+
+
+def get_version(poll_id):
+    """Versi hasil poll saat ini, atau None jika belum ada di cache"""
+    return cache.get(_version_key(poll_id))
+
+
+def create_version(poll_id):
+    """Versi awal untuk poll yang sudah dipastikan ada"""
+    key = _version_key(poll_id)
+    cache.add(key, _initial_version(), timeout=None)
+    return cache.get(key)
+
+
+def bump_version(poll_id):
+    """Menandai hasil poll sudah berubah"""
+    key = _version_key(poll_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, _initial_version(), timeout=None)
+
+
+def make_etag(poll_id, version):
+    return f'"{uuid.UUID(str(poll_id)).hex}-{version}"'
+
+
+def get_body(poll_id, version):
+    return cache.get(BODY_KEY.format(uuid.UUID(str(poll_id)).hex, version))
+
+
+def set_body(poll_id, version, body):
+    timeout = getattr(settings, 'POLLS_RESULTS_CACHE_TIMEOUT', 300)
+    cache.set(BODY_KEY.format(uuid.UUID(str(poll_id)).hex, version), body, timeout)
+
+
+def bump_poll_version(sender, instance, **kwargs):
+    """Receiver post_save Poll: perubahan judul/status ikut membatalkan cache"""
+    bump_version(instance.pk)
+
+
+def forget_poll(sender, instance, **kwargs):
+    """Receiver post_delete Poll: ETag dan body lama tidak dilayani lagi"""
+    cache.delete(_version_key(instance.pk))
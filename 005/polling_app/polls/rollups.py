@@ -0,0 +1,137 @@
+"""
+Rollup jumlah vote per opsi dalam bucket waktu tetap.
+
+Setiap vote menaikkan satu baris ``VoteRollup`` per resolusi yang aktif
+(default per menit dan per jam), di transaksi yang sama dengan insert
+Vote. Endpoint timeline membaca rollup saja, sehingga biayanya sebanding
+dengan jumlah bucket x opsi dalam rentang, bukan jumlah vote.
+
+Konfigurasi::
+
+    POLLS_ROLLUP_RESOLUTIONS = ['1m', '1h']
+"""
+from collections import defaultdict
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+
+from .models import Vote, VoteRollup
+
+# Label resolusi yang dikenal -> lebar bucket (detik)
+RESOLUTIONS = {
+    '1m': 60,
+    '5m': 300,
+    '1h': 3600,
+    '1d': 86400,
+}
+DEFAULT_RESOLUTIONS = ['1m', '1h']
+
+
+def active_resolutions():
+    """Dict label -> detik untuk resolusi yang dipelihara"""
+    labels = getattr(settings, 'POLLS_ROLLUP_RESOLUTIONS', DEFAULT_RESOLUTIONS)
+    return {label: RESOLUTIONS[label] for label in labels}
+
+
+def bucket_start(moment, resolution):
+    """Awal bucket (UTC) yang memuat ``moment``"""
+    epoch = int(moment.timestamp())
+    return datetime.fromtimestamp(epoch - epoch % resolution, tz=dt_timezone.utc)
+
+
+def increment_rollups(poll_id, votes):
+    """
+    Menaikkan rollup untuk ``votes``, iterable ``(option_id, created_at)``.
+
+    Harus dipanggil di dalam ``transaction.atomic()`` yang sama dengan insert
+    Vote. Satu UPDATE per bucket yang tersentuh; bucket baru dibuat dengan
+    INSERT, dan jika bentrok dengan request bersamaan kembali ke UPDATE.
+    """
+    counts = defaultdict(int)
+    for option_id, created_at in votes:
+        for resolution in active_resolutions().values():
+            counts[option_id, resolution, bucket_start(created_at, resolution)] += 1
+
+    for (option_id, resolution, start), count in counts.items():
+        bucket = VoteRollup.objects.filter(option_id=option_id, resolution=resolution, bucket_start=start)
+        if bucket.update(count=F('count') + count):
+            continue
+        try:
+            with transaction.atomic():
+                VoteRollup.objects.create(
+                    poll_id=poll_id, option_id=option_id, resolution=resolution,
+                    bucket_start=start, count=count,
+                )
+        except IntegrityError:
+            bucket.update(count=F('count') + count)
+
+
+def decrement_rollups(votes):
+    """
+    Menurunkan rollup untuk vote yang dihapus. ``votes`` adalah iterable
+    ``(option_id, menit, jumlah)``; karena semua resolusi kelipatan menit,
+    cukup satu UPDATE per bucket yang tersentuh.
+    """
+    counts = defaultdict(int)
+    for option_id, minute, count in votes:
+        for resolution in active_resolutions().values():
+            counts[option_id, resolution, bucket_start(minute, resolution)] += count
+
+    for (option_id, resolution, start), count in counts.items():
+        VoteRollup.objects.filter(option_id=option_id, resolution=resolution, bucket_start=start).update(
+            count=Greatest(F('count') - count, 0)
+        )
+
+
+def rebuild_rollups(poll_ids=None):
+    """
+    Membangun ulang rollup dari tabel Vote, mis. setelah vote dihapus atau
+    resolusi baru diaktifkan.
+    """
+    votes = Vote.objects.order_by('poll_id')
+    if poll_ids is not None:
+        votes = votes.filter(poll_id__in=poll_ids)
+
+    with transaction.atomic():
+        # Rollup poll yang diarsipkan beku; vote-nya sudah tidak ada di tabel
+        existing = VoteRollup.objects.filter(poll__archived_at__isnull=True)
+        if poll_ids is not None:
+            existing = existing.filter(poll_id__in=poll_ids)
+        existing.delete()
+
+        rows = defaultdict(int)
+        for poll_id, option_id, created_at in votes.values_list(
+                'poll_id', 'option_id', 'created_at').iterator(chunk_size=2000):
+            for resolution in active_resolutions().values():
+                rows[poll_id, option_id, resolution, bucket_start(created_at, resolution)] += 1
+        VoteRollup.objects.bulk_create(
+            [
+                VoteRollup(poll_id=poll_id, option_id=option_id, resolution=resolution,
+                           bucket_start=start, count=count)
+                for (poll_id, option_id, resolution, start), count in rows.items()
+            ],
+            batch_size=500,
+        )
+    return len(rows)
+
+
+def timeline(poll, resolution, since, until):
+    """
+    Data timeline ``poll`` untuk bucket dalam ``[since, until)``. Hanya
+    bucket yang berisi vote yang dikembalikan.
+    """
+    rows = (
+        VoteRollup.objects
+        .filter(poll=poll, resolution=resolution, bucket_start__gte=since, bucket_start__lt=until)
+        .order_by('bucket_start')
+        .values_list('bucket_start', 'option_id', 'count')
+    )
+    buckets = {}
+    for start, option_id, count in rows:
+        bucket = buckets.setdefault(start, {'start': start.isoformat(), 'total': 0, 'counts': {}})
+        bucket['counts'][str(option_id)] = count
+        bucket['total'] += count
+    return list(buckets.values())
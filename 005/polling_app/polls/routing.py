@@ -1,8 +1,8 @@
 from django.urls import re_path
+
 from . import consumers
 
 websocket_urlpatterns = [
-    # Untuk saat ini kosong, karena kita menggunakan SSE bukan WebSocket
-    # Bisa ditambahkan nanti jika diperlukan WebSocket
+    # Satu WebSocket untuk banyak poll: subscribe/unsubscribe dan vote
+    re_path(r'^ws/polls/$', consumers.PollMultiplexConsumer.as_asgi()),
 ]
-
@@ -0,0 +1,110 @@
+"""
+Alur pencatatan vote yang dipakai bersama oleh view dan consumer.
+"""
+import functools
+from collections import defaultdict
+from datetime import timezone as dt_timezone
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+from django.db.models.functions import Greatest, TruncMinute
+
+from . import live, results_cache
+from .counters import decrement_vote_counters, increment_vote_counters
+from .models import Option, Poll, Vote
+from .rollups import decrement_rollups, increment_rollups
+from .snapshot import PollSnapshot
+from .voters import voted_set
+
+
+class AlreadyVoted(Exception):
+    """Pemilih sudah memberikan vote untuk poll ini"""
+
+
+def cast_vote(option, voter_key, ip_address, user_agent=''):
+    """
+    Menyimpan satu vote untuk ``option`` beserta kenaikan counternya.
+
+    Duplikat dideteksi oleh constraint unik ``(poll, voter_key)`` saat insert,
+    sehingga tidak perlu query cek terpisah dan aman terhadap request
+    bersamaan. Melempar ``AlreadyVoted`` jika pemilih sudah vote.
+    """
+    try:
+        with transaction.atomic():
+            vote = Vote.objects.create(
+                poll_id=option.poll_id,
+                option=option,
+                voter_key=voter_key,
+                ip_address=ip_address,
+                user_agent=user_agent,
+            )
+            increment_vote_counters(option.poll_id, {option.id: 1})
+            increment_rollups(option.poll_id, [(option.id, vote.created_at)])
+    except IntegrityError:
+        raise AlreadyVoted(voter_key)
+
+    transaction.on_commit(lambda: notify_poll_changed(option.poll), robust=True)
+    return vote
+
+
+def notify_poll_changed(poll):
+    """
+    Dipanggil setelah vote baru ter-commit: membatalkan cache hasil dan
+    mengirim snapshot terbaru ke listener SSE.
+    """
+    results_cache.bump_version(poll.id)
+    live.publish_snapshot(PollSnapshot.build(poll))
+
+
+def release_deleted_votes(votes):
+    """
+    Dipanggil oleh ``VoteQuerySet.delete`` sebelum ``votes`` dihapus, di
+    transaksi yang sama: satu query agregat per (opsi, menit), lalu satu
+    UPDATE per opsi, poll dan bucket rollup, tanpa memuat baris Vote. Poll
+    yang diarsipkan dilewati karena counternya beku.
+    """
+    rows = list(
+        votes.filter(poll__archived_at__isnull=True).order_by()
+        .annotate(minute=TruncMinute('created_at', tzinfo=dt_timezone.utc))
+        .values_list('poll_id', 'option_id', 'minute')
+        .annotate(count=Count('pk'))
+    )
+    poll_counts, option_counts = defaultdict(int), defaultdict(int)
+    for poll_id, option_id, _, count in rows:
+        poll_counts[poll_id] += count
+        option_counts[option_id] += count
+    decrement_vote_counters(poll_counts, option_counts)
+    decrement_rollups((option_id, minute, count) for _, option_id, minute, count in rows)
+    for poll_id in poll_counts:
+        voted_set.forget(poll_id)
+        transaction.on_commit(functools.partial(notify_votes_deleted, poll_id), robust=True)
+
+
+def release_deleted_option(sender, instance, origin=None, **kwargs):
+    """
+    Receiver pre_delete Option: vote opsi ikut terhapus lewat cascade, jadi
+    total poll diturunkan sebesar counter opsi. Dilewati jika yang dihapus
+    adalah Poll-nya sendiri, karena counternya ikut hilang.
+    """
+    if isinstance(origin, Poll) or getattr(origin, 'model', None) is Poll:
+        return
+    # Counter di instance bisa sudah basi; baca nilai terkini
+    count = Option.objects.filter(pk=instance.pk).values_list('vote_count', flat=True).first()
+    if not count:
+        return
+    polls = Poll.objects.filter(pk=instance.poll_id, archived_at__isnull=True)
+    if polls.update(total_votes=Greatest(F('total_votes') - count, 0), sequence=F('sequence') + 1):
+        voted_set.forget(instance.poll_id)
+        transaction.on_commit(functools.partial(notify_votes_deleted, instance.poll_id), robust=True)
+
+
+def notify_votes_deleted(poll_id):
+    """
+    Setelah vote terhapus ter-commit: cache hasil dan listener SSE
+    diperbarui seperti vote baru. Set pemilih dibuang sekali lagi karena
+    bisa sudah diisi ulang dari tabel sebelum penghapusan ter-commit.
+    """
+    voted_set.forget(poll_id)
+    poll = Poll.objects.filter(pk=poll_id).first()
+    if poll is not None:
+        notify_poll_changed(poll)
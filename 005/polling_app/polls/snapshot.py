@@ -0,0 +1,72 @@
+"""
+Snapshot hasil poll yang dipakai bersama oleh API JSON, SSE, template dan admin.
+
+Semua jumlah vote opsi diambil dalam satu query dari counter denormalisasi
+(lihat polls.counters) bersama ``Poll.sequence``; total dihitung dari jumlah
+opsi sehingga selalu konsisten dengan angka per opsi dalam snapshot yang sama.
+"""
+from dataclasses import dataclass
+
+from django.utils import timezone
+
+from .models import Option
+
+
+@dataclass(frozen=True)
+class OptionResult:
+    """Hasil satu opsi dalam snapshot"""
+    id: object
+    text: str
+    votes: int
+    percentage: float
+
+    def as_dict(self):
+        return {
+            'id': str(self.id),
+            'text': self.text,
+            'votes': self.votes,
+            'percentage': self.percentage,
+        }
+
+
+@dataclass(frozen=True)
+class PollSnapshot:
+    """Hasil lengkap sebuah poll pada satu titik waktu"""
+    poll_id: object
+    title: str
+    total_votes: int
+    options: tuple
+    # ``Poll.sequence`` yang dibaca bersama counter opsi
+    sequence: int = 0
+
+    @classmethod
+    def build(cls, poll):
+        """Membuat snapshot untuk ``poll`` dengan satu query opsi"""
+        rows = list(
+            Option.objects.filter(poll_id=poll.id)
+            .order_by('position', 'created_at')
+            .values_list('id', 'text', 'vote_count', 'poll__sequence')
+        )
+        total = sum(row[2] for row in rows)
+        options = tuple(
+            OptionResult(
+                id=option_id,
+                text=text,
+                votes=votes,
+                percentage=round((votes / total) * 100, 1) if total else 0,
+            )
+            for option_id, text, votes, _ in rows
+        )
+        sequence = rows[0][3] if rows else 0
+        return cls(poll_id=poll.id, title=poll.title, total_votes=total, options=options, sequence=sequence)
+
+    def as_dict(self):
+        """Payload JSON yang dipakai oleh API dan SSE"""
+        return {
+            'poll_id': str(self.poll_id),
+            'title': self.title,
+            'total_votes': self.total_votes,
+            'sequence': self.sequence,
+            'results': [option.as_dict() for option in self.options],
+            'timestamp': timezone.now().isoformat(),
+        }
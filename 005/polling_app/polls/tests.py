@@ -1,3 +1,1235 @@
-from django.test import TestCase
+import asyncio
+import csv
+import functools
+import gzip
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from asgiref.testing import ApplicationCommunicator
+from channels.layers import get_channel_layer
+from django.contrib.auth import get_user_model
+from django.core.cache import cache, caches
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import IntegrityError, connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from polls_common import dbtuning, metrics
+
+from . import archive, consumers, ids, live, ratelimit, results_cache
+from .counters import find_counter_mismatches, increment_vote_counters
+from .ingest import VoteBuffer, write_votes
+from .models import Poll, Option, Vote, VoteRollup
+from .pagination import EstimatedCountPaginator, estimated_row_count
+from .rollups import rebuild_rollups
+from .services import AlreadyVoted
+from .voters import VotedSetCache, voted_set
+from .snapshot import PollSnapshot
+
+
+class PollTestMixin:
+    """Helper untuk membuat poll beserta opsinya"""
+
+    def create_poll(self, title='Makanan favorit?', options=('Sate', 'Rendang', 'Soto')):
+        poll = Poll.objects.create(title=title)
+        for text in options:
+            Option.objects.create(poll=poll, text=text)
+        return poll
+
+    def cast_vote(self, poll, option, ip='10.0.0.1'):
+        return self.client.post(
+            reverse('polls:vote_api', kwargs={'poll_id': poll.id}),
+            data=json.dumps({'option_id': str(option.id)}),
+            content_type='application/json',
+            REMOTE_ADDR=ip,
+        )
+
+
+class VoteCounterTests(PollTestMixin, TestCase):
+    def test_vote_increments_counters(self):
+        poll = self.create_poll()
+        sate, rendang, _ = poll.options.all()
+
+        self.cast_vote(poll, sate, ip='10.0.0.1')
+        self.cast_vote(poll, sate, ip='10.0.0.2')
+        self.cast_vote(poll, rendang, ip='10.0.0.3')
+
+        poll.refresh_from_db()
+        sate.refresh_from_db()
+        rendang.refresh_from_db()
+        self.assertEqual(poll.total_votes, 3)
+        self.assertEqual(sate.vote_count, 2)
+        self.assertEqual(rendang.vote_count, 1)
+
+    def test_rejected_vote_does_not_increment_counters(self):
+        poll = self.create_poll()
+        sate = poll.options.first()
+
+        self.cast_vote(poll, sate)
+        response = self.cast_vote(poll, sate)
+
+        self.assertEqual(response.status_code, 400)
+        poll.refresh_from_db()
+        self.assertEqual(poll.total_votes, 1)
+
+    def test_rebuild_command_fixes_drifted_counters(self):
+        poll = self.create_poll()
+        sate = poll.options.first()
+        Vote.objects.create(option=sate, ip_address='10.0.0.1')
+
+        with self.assertRaises(CommandError):
+            call_command('rebuild_vote_counts', '--check', stdout=StringIO())
+
+        call_command('rebuild_vote_counts', stdout=StringIO())
+
+        poll.refresh_from_db()
+        sate.refresh_from_db()
+        self.assertEqual(poll.total_votes, 1)
+        self.assertEqual(sate.vote_count, 1)
+        call_command('rebuild_vote_counts', '--check', stdout=StringIO())
+
+    def test_deleted_votes_decrement_counters_and_rollups(self):
+        poll = self.create_poll()
+        sate, rendang, _ = poll.options.all()
+        for n, option in enumerate([sate, sate, rendang]):
+            self.cast_vote(poll, option, ip=f'10.0.0.{n}')
+
+        Vote.objects.filter(option=sate).first().delete()
+        Vote.objects.filter(option=rendang).delete()
+
+        call_command('rebuild_vote_counts', '--check', stdout=StringIO())
+        poll.refresh_from_db()
+        self.assertEqual(poll.total_votes, 1)
+        self.assertEqual(sum(VoteRollup.objects.filter(resolution=60).values_list('count', flat=True)), 1)
+
+    def create_votes(self, poll, count):
+        options = list(poll.options.all())
+        Vote.objects.bulk_create(
+            Vote(poll=poll, option=options[n % len(options)], voter_key=f'k{n}', ip_address='10.0.0.1')
+            for n in range(count)
+        )
+
+    def test_vote_deletes_are_grouped_per_option(self):
+        queries = []
+        for count in (3, 30):
+            poll = self.create_poll()
+            self.create_votes(poll, count)
+            with CaptureQueriesContext(connection) as context:
+                Vote.objects.filter(poll=poll).delete()
+            queries.append(len(context))
+        self.assertEqual(queries[0], queries[1])
+
+    def test_poll_delete_stays_a_bulk_cascade(self):
+        queries = []
+        for count in (3, 30):
+            poll = self.create_poll()
+            self.create_votes(poll, count)
+            with CaptureQueriesContext(connection) as context:
+                poll.delete()
+            queries.append(len(context))
+            self.assertFalse(any(query['sql'].startswith('UPDATE') for query in context))
+        self.assertEqual(queries[0], queries[1])
+        self.assertFalse(Vote.objects.exists())
+
+    def test_option_delete_decrements_poll_total(self):
+        poll = self.create_poll()
+        sate, rendang, _ = poll.options.all()
+        for n, option in enumerate([sate, sate, rendang]):
+            self.cast_vote(poll, option, ip=f'10.0.0.{n}')
+
+        sate.delete()
+
+        poll.refresh_from_db()
+        self.assertEqual(poll.total_votes, 1)
+        self.assertEqual(find_counter_mismatches([poll.id]), [])
+
+
+class PollSnapshotTests(PollTestMixin, TestCase):
+    def test_snapshot_percentages(self):
+        poll = self.create_poll()
+        sate, rendang, soto = poll.options.all()
+        self.cast_vote(poll, sate, ip='10.0.0.1')
+        self.cast_vote(poll, sate, ip='10.0.0.2')
+        self.cast_vote(poll, rendang, ip='10.0.0.3')
+
+        snapshot = PollSnapshot.build(poll)
+
+        self.assertEqual(snapshot.total_votes, 3)
+        self.assertEqual(
+            [(option.text, option.votes, option.percentage) for option in snapshot.options],
+            [('Sate', 2, 66.7), ('Rendang', 1, 33.3), ('Soto', 0, 0)],
+        )
+
+    def test_results_api_query_count_is_independent_of_options(self):
+        poll = self.create_poll(options=[f'Opsi {i}' for i in range(10)])
+        url = reverse('polls:results_api', kwargs={'poll_id': poll.id})
+
+        with self.assertNumQueries(2):
+            response = self.client.get(url)
+
+        self.assertEqual(len(response.json()['results']), 10)
+
+    def test_detail_page_query_count_is_independent_of_options(self):
+        poll = self.create_poll(options=[f'Opsi {i}' for i in range(10)])
+
+        with self.assertNumQueries(3):
+            response = self.client.get(poll.get_absolute_url())
+
+        self.assertContains(response, 'Opsi 9')
+
+
+def parse_sse(chunk):
+    """Mengurai satu event SSE menjadi dict field -> nilai"""
+    if isinstance(chunk, bytes):
+        chunk = chunk.decode()
+    fields = dict(line.split(': ', 1) for line in chunk.strip().splitlines())
+    fields['data'] = json.loads(fields['data'])
+    return fields
+
+
+class PollStreamTests(PollTestMixin, TestCase):
+    async def open_stream(self, poll, headers=None):
+        url = reverse('polls:stream', kwargs={'poll_id': poll.id})
+        response = await self.async_client.get(url, headers=headers)
+        return aiter(response.streaming_content)
+
+    async def publish(self, poll):
+        snapshot = await sync_to_async(PollSnapshot.build)(poll)
+        await get_channel_layer().group_send(
+            live.poll_group_name(poll.id),
+            {'type': live.UPDATE_MESSAGE_TYPE, 'data': snapshot.as_dict()},
+        )
+
+    async def test_push_stream_sends_snapshot_then_deltas(self):
+        poll = await sync_to_async(self.create_poll)()
+        sate = await poll.options.afirst()
+        stream = await self.open_stream(poll)
+
+        first = parse_sse(await anext(stream))
+        self.assertEqual(first['event'], 'snapshot')
+        self.assertEqual(first['id'], '0')
+        self.assertEqual(len(first['data']['results']), 3)
+
+        await Vote.objects.acreate(option=sate, ip_address='10.0.0.1')
+        await sync_to_async(increment_vote_counters)(poll.id, {sate.id: 1})
+        await self.publish(poll)
+        event = parse_sse(await asyncio.wait_for(anext(stream), 1))
+        await stream.aclose()
+
+        self.assertEqual(event['event'], 'delta')
+        self.assertEqual(event['id'], '1')
+        self.assertEqual(event['data']['total_votes'], 1)
+        self.assertEqual(event['data']['changes'], [{'id': str(sate.id), 'votes': 1}])
+
+    async def test_deleted_vote_publishes_delta_with_higher_event_id(self):
+        poll = await sync_to_async(self.create_poll)()
+        sate = await poll.options.afirst()
+        for n in range(2):
+            await Vote.objects.acreate(option=sate, ip_address=f'10.0.0.{n}')
+            await sync_to_async(increment_vote_counters)(poll.id, {sate.id: 1})
+        stream = await self.open_stream(poll)
+        self.assertEqual(parse_sse(await anext(stream))['id'], '2')
+
+        def delete_vote():
+            with self.captureOnCommitCallbacks(execute=True):
+                Vote.objects.filter(poll=poll).first().delete()
+
+        await sync_to_async(delete_vote)()
+        event = parse_sse(await asyncio.wait_for(anext(stream), 1))
+        await stream.aclose()
+
+        # total_votes turun, tetapi ID event tetap naik
+        self.assertEqual(event['event'], 'delta')
+        self.assertEqual(event['id'], '3')
+        self.assertEqual(event['data']['total_votes'], 1)
+
+    async def test_reconnect_with_last_event_id_replays_missed_deltas(self):
+        poll = await sync_to_async(self.create_poll)()
+        sate = await poll.options.afirst()
+        stream = await self.open_stream(poll)
+        await anext(stream)
+
+        for n in range(3):
+            await Vote.objects.acreate(option=sate, ip_address=f'10.0.0.{n}')
+            await sync_to_async(increment_vote_counters)(poll.id, {sate.id: 1})
+            await self.publish(poll)
+        first_delta = parse_sse(await asyncio.wait_for(anext(stream), 1))
+        await stream.aclose()
+
+        resumed = await self.open_stream(poll, headers={'Last-Event-ID': first_delta['id']})
+        replayed = [parse_sse(await anext(resumed)) for _ in range(2)]
+        await resumed.aclose()
+
+        self.assertEqual([event['id'] for event in replayed], ['2', '3'])
+        self.assertTrue(all(event['event'] == 'delta' for event in replayed))
+
+    @override_settings(POLLS_SSE_GROUP_REFRESH=0.05)
+    async def test_feed_renews_group_membership(self):
+        poll = await sync_to_async(self.create_poll)()
+        feed = live.PollFeed(poll)
+        await feed.start()
+        group = get_channel_layer().groups[live.poll_group_name(poll.id)]
+        joined = group[feed._channel]
+
+        await asyncio.sleep(0.15)
+        feed._task.cancel()
+
+        self.assertGreater(group[feed._channel], joined)
+
+    def test_unknown_last_event_id_gets_full_snapshot(self):
+        feed = live.PollFeed(self.create_poll())
+        feed.event_id = 10
+        feed.events.append({'id': 10, 'prev': 9, 'payload': {}})
+
+        self.assertEqual(feed.missed_since(10), [])
+        self.assertEqual(len(feed.missed_since(9)), 1)
+        self.assertIsNone(feed.missed_since(3))
+
+    def test_vote_publishes_snapshot_on_commit(self):
+        poll = self.create_poll()
+        sate = poll.options.first()
+
+        with mock.patch.object(live, 'publish_snapshot') as publish:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.cast_vote(poll, sate)
+
+        snapshot = publish.call_args.args[0]
+        self.assertEqual(snapshot.total_votes, 1)
+
+
+@override_settings(POLLS_WS_COALESCE_MS=20)
+class PollWebSocketTests(PollTestMixin, TestCase):
+    async def connect(self):
+        socket = ApplicationCommunicator(consumers.PollMultiplexConsumer.as_asgi(), {
+            'type': 'websocket', 'path': '/ws/polls/', 'headers': [], 'client': ('10.0.0.9', 5000),
+        })
+        await socket.send_input({'type': 'websocket.connect'})
+        self.assertEqual((await socket.receive_output(1))['type'], 'websocket.accept')
+        return socket
+
+    async def send(self, socket, message):
+        await socket.send_input({'type': 'websocket.receive', 'text': json.dumps(message)})
+
+    async def receive(self, socket):
+        return json.loads((await socket.receive_output(1))['text'])
+
+    async def close(self, socket):
+        await socket.send_input({'type': 'websocket.disconnect', 'code': 1000})
+        await socket.wait(1)
+
+    async def publish(self, poll, option):
+        await Vote.objects.acreate(option=option, ip_address=f'10.1.0.{await Vote.objects.acount()}')
+        await sync_to_async(increment_vote_counters)(poll.id, {option.id: 1})
+        snapshot = await sync_to_async(PollSnapshot.build)(poll)
+        await get_channel_layer().group_send(
+            live.poll_group_name(poll.id),
+            {'type': live.UPDATE_MESSAGE_TYPE, 'data': snapshot.as_dict()},
+        )
+
+    async def test_subscribe_many_polls_gets_one_snapshot_frame(self):
+        first = await sync_to_async(self.create_poll)()
+        second = await sync_to_async(self.create_poll)(title='Minuman favorit?')
+        socket = await self.connect()
+
+        await self.send(socket, {'action': 'subscribe', 'poll_ids': [str(first.id), str(second.id), 'bukan-uuid']})
+        ack = await self.receive(socket)
+        frame = await self.receive(socket)
+        await self.close(socket)
+
+        self.assertEqual(ack['poll_ids'], [str(first.id), str(second.id)])
+        self.assertEqual(ack['rejected'], ['bukan-uuid'])
+        self.assertEqual(frame['type'], 'updates')
+        self.assertEqual({update['poll_id'] for update in frame['polls']}, {str(first.id), str(second.id)})
+        self.assertTrue(all(update['event'] == 'snapshot' for update in frame['polls']))
+
+    async def test_deltas_within_window_are_coalesced(self):
+        poll = await sync_to_async(self.create_poll)()
+        sate = await poll.options.afirst()
+        socket = await self.connect()
+        await self.send(socket, {'action': 'subscribe', 'poll_ids': [str(poll.id)]})
+        await self.receive(socket)
+        await self.receive(socket)
+
+        await self.publish(poll, sate)
+        await self.publish(poll, sate)
+        frame = await self.receive(socket)
+
+        self.assertEqual(len(frame['polls']), 1)
+        update = frame['polls'][0]
+        self.assertEqual((update['event'], update['prev'], update['id']), ('delta', 0, 2))
+        self.assertEqual(update['data']['changes'], [{'id': str(sate.id), 'votes': 2}])
+
+        await self.send(socket, {'action': 'unsubscribe', 'poll_ids': [str(poll.id)]})
+        self.assertEqual((await self.receive(socket))['poll_ids'], [str(poll.id)])
+        await self.publish(poll, sate)
+        self.assertTrue(await socket.receive_nothing(0.1))
+        await self.close(socket)
+
+    async def test_vote_over_socket(self):
+        poll = await sync_to_async(self.create_poll)()
+        sate = await poll.options.afirst()
+        socket = await self.connect()
+        message = {'action': 'vote', 'poll_id': str(poll.id), 'option_id': str(sate.id), 'ref': 7}
+
+        await self.send(socket, message)
+        accepted = await self.receive(socket)
+        await self.send(socket, message)
+        rejected = await self.receive(socket)
+        await self.close(socket)
+
+        self.assertEqual((accepted['type'], accepted['ref']), ('vote', 7))
+        self.assertTrue(await Vote.objects.filter(id=accepted['vote_id'], voter_key='10.0.0.9').aexists())
+        self.assertEqual((rejected['type'], rejected['ref']), ('error', 7))
+        await poll.arefresh_from_db()
+        self.assertEqual(poll.total_votes, 1)
+
+    async def test_socket_vote_can_be_cast_again_after_delete(self):
+        poll = await sync_to_async(self.create_poll)()
+        sate = await poll.options.afirst()
+        socket = await self.connect()
+        message = {'action': 'vote', 'poll_id': str(poll.id), 'option_id': str(sate.id)}
+
+        await self.send(socket, message)
+        accepted = await self.receive(socket)
+        await (await Vote.objects.aget(id=accepted['vote_id'])).adelete()
+        await self.send(socket, message)
+        retried = await self.receive(socket)
+        await self.close(socket)
+
+        self.assertEqual(retried['type'], 'vote')
+
+
+@override_settings(POLLS_RATE_LIMIT={'CACHE': 'ratelimit', 'IP': {'RATE': 0.01, 'BURST': 2}})
+class RateLimitTests(PollTestMixin, TestCase):
+    def setUp(self):
+        self.cache = caches['ratelimit']
+        self.cache.clear()
+        self.polls = [self.create_poll(title=f'Poll {n}') for n in range(3)]
+        # Bucket di cache tidak ikut di-rollback antar test
+        self.addCleanup(self.cache.clear)
+
+    def test_flood_is_rejected_before_any_query(self):
+        for poll in self.polls[:2]:
+            self.assertEqual(self.cast_vote(poll, poll.options.first()).status_code, 200)
+
+        throttled = ratelimit.throttled['ip']
+        option = self.polls[2].options.first()
+        with self.assertNumQueries(0):
+            response = self.cast_vote(self.polls[2], option)
+
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '100')
+        self.assertEqual(ratelimit.throttled['ip'], throttled + 1)
+        self.assertIn('polls_rate_limited_total{scope="ip"}', metrics.render_metrics())
+        # IP lain tidak terpengaruh
+        self.assertEqual(self.cast_vote(self.polls[2], option, ip='10.0.0.2').status_code, 200)
+
+    def test_bucket_refills_over_time(self):
+        take = functools.partial(ratelimit.take, self.cache, 'ip', '10.0.0.3', 1, 2)
+
+        self.assertEqual([take(now=100), take(now=100)], [0, 0])
+        self.assertAlmostEqual(take(now=100), 1)
+        self.assertAlmostEqual(take(now=100.5), 0.5)
+        self.assertEqual(take(now=101), 0)
+
+    @override_settings(POLLS_RATE_LIMIT={
+        'CACHE': 'ratelimit', 'IP': {'RATE': 0.01, 'BURST': 1}, 'POLL': {'RATE': 0.01, 'BURST': 1},
+    })
+    def test_rejected_request_spends_no_tokens(self):
+        ratelimit.check(ip='10.0.0.5', poll='a')
+        with self.assertRaises(ratelimit.RateLimited) as raised:
+            ratelimit.check(ip='10.0.0.6', poll='a')
+        self.assertEqual(raised.exception.scope, 'poll')
+
+        # Token IP 10.0.0.6 masih utuh untuk poll lain
+        ratelimit.check(ip='10.0.0.6', poll='b')
+
+    def test_buckets_do_not_share_the_results_cache(self):
+        ratelimit.check(ip='10.0.0.7', poll='a')
+        self.assertIsNotNone(self.cache.get(ratelimit.KEY.format('ip', '10.0.0.7')))
+        self.assertIsNone(cache.get(ratelimit.KEY.format('ip', '10.0.0.7')))
+
+
+class DuplicateVoteTests(PollTestMixin, TestCase):
+    def test_vote_stores_poll_and_voter_key(self):
+        poll = self.create_poll()
+        sate = poll.options.first()
+
+        response = self.cast_vote(poll, sate, ip='10.0.0.9')
+
+        vote = Vote.objects.get(pk=response.json()['vote_id'])
+        self.assertEqual(vote.poll_id, poll.id)
+        self.assertEqual(vote.voter_key, '10.0.0.9')
+
+    def test_same_voter_key_is_rejected_by_constraint(self):
+        poll = self.create_poll()
+        sate, rendang, _ = poll.options.all()
+        self.cast_vote(poll, sate)
+
+        # Lewati cache di memori agar constraint DB yang menolak
+        with mock.patch.object(voted_set, 'contains', return_value=False):
+            with self.assertNumQueries(5):
+                # select opsi, savepoint, insert gagal, rollback savepoint, release
+                response = self.cast_vote(poll, rendang)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['error'], 'Anda sudah memberikan vote untuk poll ini')
+        self.assertEqual(Vote.objects.filter(poll=poll).count(), 1)
+
+    def test_same_voter_may_vote_in_other_polls(self):
+        first = self.create_poll()
+        second = self.create_poll(title='Minuman favorit?', options=('Teh', 'Kopi'))
+
+        self.assertEqual(self.cast_vote(first, first.options.first()).status_code, 200)
+        self.assertEqual(self.cast_vote(second, second.options.first()).status_code, 200)
+
+    def test_option_from_other_poll_is_rejected(self):
+        first = self.create_poll()
+        second = self.create_poll(title='Minuman favorit?', options=('Teh', 'Kopi'))
+
+        self.cast_vote(first, second.options.first())
+
+        self.assertFalse(Vote.objects.exists())
+
+    def test_detail_shows_has_voted(self):
+        poll = self.create_poll()
+        self.cast_vote(poll, poll.options.first(), ip='10.0.0.5')
+
+        response = self.client.get(poll.get_absolute_url(), REMOTE_ADDR='10.0.0.5')
+
+        self.assertTrue(response.context['has_voted'])
+
+
+class VoteBufferTests(PollTestMixin, TestCase):
+    def setUp(self):
+        self.log_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.log_dir)
+        self.poll = self.create_poll()
+        self.sate, self.rendang, _ = self.poll.options.all()
+
+    def test_flush_writes_batch_and_counters(self):
+        buffer = VoteBuffer(self.log_dir)
+        buffer.submit(self.sate, '10.0.0.1', '10.0.0.1')
+        buffer.submit(self.sate, '10.0.0.2', '10.0.0.2')
+        buffer.submit(self.rendang, '10.0.0.3', '10.0.0.3')
+        self.assertFalse(Vote.objects.exists())
+
+        self.assertEqual(buffer.flush(), 3)
+
+        self.poll.refresh_from_db()
+        self.sate.refresh_from_db()
+        self.assertEqual(self.poll.total_votes, 3)
+        self.assertEqual(self.sate.vote_count, 2)
+        # Hanya log aktif (kosong) yang tersisa
+        self.assertEqual(len(os.listdir(self.log_dir)), 1)
+
+    def test_pending_voter_is_rejected(self):
+        buffer = VoteBuffer(self.log_dir)
+        buffer.submit(self.sate, '10.0.0.1', '10.0.0.1')
+
+        with self.assertRaises(AlreadyVoted):
+            buffer.submit(self.rendang, '10.0.0.1', '10.0.0.1')
+
+    def test_recovery_after_crash_is_idempotent(self):
+        crashed = VoteBuffer(self.log_dir)
+        crashed.submit(self.sate, '10.0.0.1', '10.0.0.1')
+        crashed.submit(self.rendang, '10.0.0.2', '10.0.0.2')
+        # Simulasi crash: proses mati tanpa flush, lock file ikut lepas
+        crashed._log.close()
+        log_path = crashed._log_path
+        entries = [json.loads(line) for line in log_path.read_text().splitlines()]
+
+        # Sebagian batch sudah tersimpan sebelum crash
+        write_votes(entries[:1])
+        recovered = VoteBuffer(self.log_dir).recover()
+
+        self.assertEqual(recovered, 1)
+        self.assertFalse(log_path.exists())
+        self.poll.refresh_from_db()
+        self.assertEqual(self.poll.total_votes, 2)
+        call_command('rebuild_vote_counts', '--check', stdout=StringIO())
+
+    def test_votes_for_deleted_poll_do_not_fail_the_batch(self):
+        other = self.create_poll(title='Dihapus')
+        buffer = VoteBuffer(self.log_dir)
+        buffer.submit(self.sate, '10.0.0.1', '10.0.0.1')
+        buffer.submit(other.options.first(), '10.0.0.1', '10.0.0.1')
+        other.delete()
+
+        with self.assertLogs('polls.ingest', 'WARNING'):
+            self.assertEqual(buffer.flush(), 1)
+
+        self.assertEqual(Vote.objects.get().poll_id, self.poll.id)
+        self.assertFalse(buffer._pending_keys)
+        self.assertEqual(len(os.listdir(self.log_dir)), 1)
+
+    def test_replay_keeps_accepted_time(self):
+        crashed = VoteBuffer(self.log_dir)
+        crashed.submit(self.sate, '10.0.0.1', '10.0.0.1')
+        crashed._log.close()
+        entry = json.loads(crashed._log_path.read_text())
+        accepted = timezone.now() - timedelta(hours=3)
+        entry['accepted_at'] = accepted.isoformat()
+        crashed._log_path.write_text(json.dumps(entry) + '\n')
+
+        VoteBuffer(self.log_dir).recover()
+
+        self.assertEqual(Vote.objects.get().created_at, accepted)
+        rollup = VoteRollup.objects.get(option=self.sate, resolution=60)
+        self.assertEqual(rollup.bucket_start, accepted.replace(second=0, microsecond=0))
+
+    def test_rejected_segment_is_quarantined(self):
+        crashed = VoteBuffer(self.log_dir)
+        crashed.submit(self.sate, '10.0.0.1', '10.0.0.1')
+        crashed._log.close()
+
+        with mock.patch('polls.ingest.write_votes', side_effect=IntegrityError('rusak')), \
+                self.assertLogs('polls.ingest', 'ERROR'):
+            self.assertEqual(VoteBuffer(self.log_dir).recover(), 0)
+
+        self.assertFalse(crashed._log_path.exists())
+        self.assertTrue(crashed._log_path.with_suffix('.failed').exists())
+
+    def test_vote_view_queues_when_buffer_enabled(self):
+        buffer = VoteBuffer(self.log_dir)
+
+        with mock.patch('polls.views.get_vote_buffer', return_value=buffer):
+            response = self.cast_vote(self.poll, self.sate)
+
+        self.assertEqual(response.status_code, 202)
+        self.assertTrue(response.json()['queued'])
+        buffer.flush()
+        self.assertTrue(Vote.objects.filter(pk=response.json()['vote_id']).exists())
+
+
+class VotedSetCacheTests(PollTestMixin, TestCase):
+    def test_repeat_voter_rejected_without_insert(self):
+        poll = self.create_poll()
+        sate = poll.options.first()
+        self.cast_vote(poll, sate)
+
+        # Hanya validasi opsi; tidak ada insert yang gagal di DB
+        with self.assertNumQueries(1):
+            response = self.cast_vote(poll, sate)
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_unknown_poll_is_not_warmed(self):
+        poll_id = uuid.uuid4()
+        response = self.client.post(
+            reverse('polls:vote_api', kwargs={'poll_id': poll_id}),
+            data=json.dumps({'option_id': str(uuid.uuid4())}),
+            content_type='application/json',
+        )
+
+        self.assertNotEqual(response.status_code, 200)
+        self.assertNotIn(poll_id, voted_set._polls)
+
+    def test_counters_are_consistent_across_threads(self):
+        poll = self.create_poll()
+        cache = VotedSetCache()
+        cache.add(poll.id, 'k')
+
+        def lookup(_):
+            for key in ('k', 'x') * 500:
+                cache.contains(poll.id, key)
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(lookup, range(8)))
+
+        self.assertEqual(cache.stats()['hits'], 4000)
+        self.assertEqual(cache.stats()['misses'], 4000)
+
+    def test_lazy_warm_from_existing_votes(self):
+        poll = self.create_poll()
+        Vote.objects.create(option=poll.options.first(), ip_address='10.0.0.1')
+        cache = VotedSetCache()
+
+        self.assertTrue(cache.contains(poll.id, '10.0.0.1'))
+        self.assertFalse(cache.contains(poll.id, '10.0.0.2'))
+        self.assertEqual(cache.stats()['hits'], 1)
+        self.assertEqual(cache.stats()['misses'], 1)
+
+    def test_lru_limit(self):
+        cache = VotedSetCache(max_polls=2)
+        first, second, third = (self.create_poll(title=t).id for t in 'abc')
+        for poll_id in (first, second, third):
+            cache.add(poll_id, 'k')
+
+        self.assertEqual(cache.stats()['polls'], 2)
+        self.assertNotIn(first, cache._polls)
+
+    def test_deleted_vote_is_forgotten(self):
+        poll = self.create_poll()
+        self.cast_vote(poll, poll.options.first(), ip='10.0.0.7')
+
+        Vote.objects.filter(poll=poll).delete()
+
+        self.assertFalse(voted_set.contains(poll.id, '10.0.0.7'))
+
+    def test_stats_endpoint(self):
+        response = self.client.get(reverse('polls:cache_stats'))
+
+        self.assertIn('hit_ratio', response.json()['voted_set'])
+
+
+class ResultsCacheTests(PollTestMixin, TestCase):
+    def setUp(self):
+        self.poll = self.create_poll()
+        self.url = reverse('polls:results_api', kwargs={'poll_id': self.poll.id})
+
+    def test_unchanged_poll_is_served_from_cache(self):
+        first = self.client.get(self.url)
+
+        with self.assertNumQueries(0):
+            second = self.client.get(self.url)
+
+        self.assertEqual(first.content, second.content)
+        self.assertEqual(first['ETag'], second['ETag'])
+
+    def test_matching_etag_returns_304_without_body(self):
+        etag = self.client.get(self.url)['ETag']
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['ETag'], etag)
+
+    def test_vote_changes_etag_and_results(self):
+        etag = self.client.get(self.url)['ETag']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.cast_vote(self.poll, self.poll.options.first())
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.json()['total_votes'], 1)
+
+    def test_deactivated_poll_is_not_served_from_cache(self):
+        self.client.get(self.url)
+
+        self.poll.is_active = False
+        self.poll.save()
+
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+    def test_deleted_poll_is_not_served_from_cache(self):
+        etag = self.client.get(self.url)['ETag']
+
+        self.poll.delete()
+
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 404)
+
+    def test_unknown_poll_creates_no_version(self):
+        poll_id = uuid.uuid4()
+        url = reverse('polls:results_api', kwargs={'poll_id': poll_id})
+
+        self.assertEqual(self.client.get(url).status_code, 404)
+        self.assertIsNone(results_cache.get_version(poll_id))
+
+
+class MetricsTests(PollTestMixin, TestCase):
+    def sample(self, name, view):
+        prefix = f'{name}{{view="{view}"}} '
+        for line in self.client.get('/metrics').content.decode().splitlines():
+            if line.startswith(prefix):
+                return float(line[len(prefix):])
+        return 0
+
+    def test_request_is_recorded_per_url_name(self):
+        poll = self.create_poll()
+        url = reverse('polls:detail', kwargs={'poll_id': poll.id})
+        before = self.sample('polls_http_request_queries_count', 'polls:detail')
+        queries_before = self.sample('polls_http_request_queries_sum', 'polls:detail')
+
+        with self.assertNumQueries(3):
+            self.client.get(url)
+
+        self.assertEqual(self.sample('polls_http_request_queries_count', 'polls:detail'), before + 1)
+        self.assertEqual(self.sample('polls_http_request_queries_sum', 'polls:detail'), queries_before + 3)
+
+    def test_metrics_endpoint_uses_prometheus_format(self):
+        response = self.client.get('/metrics')
+
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        body = response.content.decode()
+        self.assertIn('# TYPE polls_http_request_duration_seconds histogram', body)
+        self.assertIn('polls_voted_set_hits_total', body)
+
+    @override_settings(POLLS_METRICS={'SLOW_REQUEST_MS': 0, 'SLOW_QUERY_COUNT': 2})
+    def test_slow_request_logs_slowest_sql(self):
+        poll = self.create_poll()
+        middleware = metrics.MetricsMiddleware(lambda request: self.client.get(
+            reverse('polls:results_api', kwargs={'poll_id': poll.id})))
+
+        with self.assertLogs('polls.metrics.slow', 'WARNING') as logs:
+            middleware(mock.Mock(method='GET', path='/x/', resolver_match=None))
+
+        self.assertIn('SELECT', logs.output[0])
+        self.assertEqual(logs.output[0].count(' ms: '), 2)
+
+
+class VoteRollupTests(PollTestMixin, TestCase):
+    def setUp(self):
+        self.poll = self.create_poll()
+        self.sate, self.rendang, _ = self.poll.options.all()
+        self.url = reverse('polls:timeline_api', kwargs={'poll_id': self.poll.id})
+
+    def test_vote_increments_every_resolution(self):
+        self.cast_vote(self.poll, self.sate, ip='10.0.0.1')
+        self.cast_vote(self.poll, self.sate, ip='10.0.0.2')
+        self.cast_vote(self.poll, self.rendang, ip='10.0.0.3')
+
+        counts = dict(
+            VoteRollup.objects.filter(option=self.sate).values_list('resolution', 'count')
+        )
+        self.assertEqual(counts, {60: 2, 3600: 2})
+
+    def test_batch_writer_increments_rollups(self):
+        entries = [
+            {'id': str(uuid.uuid4()), 'poll_id': str(self.poll.id), 'option_id': str(self.sate.id),
+             'voter_key': f'10.0.0.{i}', 'ip_address': f'10.0.0.{i}', 'user_agent': ''}
+            for i in range(3)
+        ]
+        write_votes(entries)
+        write_votes(entries)  # replay tidak menghitung ulang
+
+        self.assertEqual(VoteRollup.objects.get(option=self.sate, resolution=60).count, 3)
+
+    def test_timeline_query_count_is_independent_of_votes(self):
+        for i in range(20):
+            self.cast_vote(self.poll, self.sate if i % 2 else self.rendang, ip=f'10.0.1.{i}')
+
+        with self.assertNumQueries(3):
+            response = self.client.get(self.url, {'resolution': '1h'})
+
+        data = response.json()
+        self.assertEqual(data['resolution'], '1h')
+        self.assertEqual(len(data['options']), 3)
+        self.assertEqual(len(data['buckets']), 1)
+        self.assertEqual(data['buckets'][0]['total'], 20)
+        self.assertEqual(data['buckets'][0]['counts'][str(self.sate.id)], 10)
+
+    def test_timeline_range_is_respected(self):
+        self.cast_vote(self.poll, self.sate)
+
+        response = self.client.get(self.url, {'since': '2000-01-01T00:00:00', 'until': '2000-01-01T01:00:00'})
+
+        self.assertEqual(response.json()['buckets'], [])
+
+    def test_timeline_rejects_invalid_parameters(self):
+        self.assertEqual(self.client.get(self.url, {'resolution': '7m'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'since': 'kemarin'}).status_code, 400)
+        self.assertEqual(
+            self.client.get(self.url, {'since': '2000-01-01T00:00:00', 'until': '2001-01-01T00:00:00'}).status_code,
+            400,
+        )
+
+    @override_settings(POLLS_ROLLUP_RESOLUTIONS=())
+    def test_timeline_without_resolutions_is_400(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('error', response.json())
+
+    def test_rebuild_matches_incremental_rollups(self):
+        self.cast_vote(self.poll, self.sate, ip='10.0.0.1')
+        self.cast_vote(self.poll, self.rendang, ip='10.0.0.2')
+        incremental = set(VoteRollup.objects.values_list('option_id', 'resolution', 'bucket_start', 'count'))
+
+        rebuild_rollups([self.poll.id])
+
+        self.assertEqual(
+            set(VoteRollup.objects.values_list('option_id', 'resolution', 'bucket_start', 'count')),
+            incremental,
+        )
+
+
+@override_settings(POLLS_INDEX_PAGE_SIZE=3)
+class PollIndexTests(PollTestMixin, TestCase):
+    def setUp(self):
+        self.polls = [self.create_poll(title=f'Poll {i}') for i in range(7)]
+        # Timestamp sama untuk semua poll: urutan ditentukan oleh id
+        Poll.objects.update(created_at=self.polls[0].created_at)
+        self.url = reverse('polls:index')
+
+    def walk(self, sort):
+        titles, response = [], self.client.get(self.url, {'sort': sort})
+        while True:
+            titles += [poll.title for poll in response.context['polls']]
+            page = response.context['page']
+            if not page.has_next:
+                return titles, response
+            response = self.client.get(self.url, {'sort': sort, 'after': page.next_cursor})
+
+    def test_pages_cover_every_poll_once(self):
+        titles, _ = self.walk('new')
+
+        expected = [poll.title for poll in Poll.objects.order_by('-created_at', '-id')]
+        self.assertEqual(titles, expected)
+
+    def test_sort_by_votes_uses_counter(self):
+        Poll.objects.filter(pk=self.polls[4].pk).update(total_votes=9)
+        Poll.objects.filter(pk=self.polls[2].pk).update(total_votes=5)
+
+        titles, _ = self.walk('votes')
+
+        self.assertEqual(titles[:2], ['Poll 4', 'Poll 2'])
+        self.assertEqual(len(titles), 7)
+
+    def test_previous_page_returns_same_items(self):
+        first = self.client.get(self.url)
+        second = self.client.get(self.url, {'after': first.context['page'].next_cursor})
+
+        back = self.client.get(self.url, {'before': second.context['page'].prev_cursor})
+
+        self.assertEqual(list(back.context['polls']), list(first.context['polls']))
+        self.assertFalse(back.context['page'].has_previous)
+
+    def test_deep_page_is_a_single_query(self):
+        _, last = self.walk('new')
+        cursor = last.context['page'].prev_cursor
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, {'before': cursor})
+
+        self.assertEqual(response.context['polls'][0].option_count, 3)
+
+    def test_invalid_cursor_falls_back_to_first_page(self):
+        response = self.client.get(self.url, {'after': 'bukan-cursor'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['polls']), 3)
+
+
+class AdminChangelistTests(PollTestMixin, TestCase):
+    def setUp(self):
+        self.client.force_login(get_user_model().objects.create_superuser('admin', 'admin@example.com', 'pw'))
+        self.poll = self.create_poll()
+
+    def add_votes(self, count, start=0):
+        options = list(self.poll.options.all())
+        for i in range(start, start + count):
+            Vote.objects.create(poll=self.poll, option=options[i % 3], ip_address=f'10.1.{i // 250}.{i % 250}')
+
+    def changelist_queries(self, url, params=None):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, params or {})
+        self.assertEqual(response.status_code, 200)
+        return len(context)
+
+    def test_vote_changelist_queries_do_not_grow_with_rows(self):
+        url = reverse('admin:polls_vote_changelist')
+        self.add_votes(3)
+        small = self.changelist_queries(url)
+
+        self.add_votes(60, start=3)
+
+        self.assertEqual(self.changelist_queries(url), small)
+
+    def test_option_changelist_queries_do_not_grow_with_rows(self):
+        url = reverse('admin:polls_option_changelist')
+        small = self.changelist_queries(url)
+
+        for i in range(5):
+            self.create_poll(title=f'Poll {i}')
+
+        self.assertEqual(self.changelist_queries(url), small)
+
+    def test_poll_filter_renders_autocomplete_instead_of_poll_list(self):
+        for i in range(5):
+            self.create_poll(title=f'Poll lain {i}')
+        self.add_votes(2)
+
+        response = self.client.get(reverse('admin:polls_vote_changelist'), {'poll__id__exact': self.poll.id})
+
+        self.assertContains(response, 'admin-autocomplete')
+        self.assertNotContains(response, 'Poll lain 0')
+        self.assertEqual(response.context['cl'].result_count, 2)
+
+    def test_unfiltered_count_uses_table_statistics(self):
+        self.add_votes(30)
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+        self.assertEqual(estimated_row_count(Vote), 30)
+        with mock.patch.object(EstimatedCountPaginator, 'estimate_threshold', 10):
+            Vote.objects.all().delete()
+            paginator = EstimatedCountPaginator(Vote.objects.all(), 100)
+            # Perkiraan basi dari ANALYZE terakhir, bukan COUNT(*)
+            self.assertEqual(paginator.count, 30)
+            self.assertEqual(EstimatedCountPaginator(Vote.objects.filter(poll=self.poll), 100).count, 0)
+
+
+class PollImportTests(TestCase):
+    def setUp(self):
+        self.url = reverse('polls:import_polls')
+        self.client.force_login(get_user_model().objects.create_user('staf', password='pw', is_staff=True))
+
+    def post(self, body, content_type='application/json'):
+        response = self.client.post(self.url, data=body, content_type=content_type)
+        lines = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        return response, lines
+
+    def test_json_import_creates_polls_with_ordered_options(self):
+        payload = [
+            {'title': f'Poll {i}', 'options': ['Satu', 'Dua', 'Tiga']} for i in range(5)
+        ]
+
+        with override_settings(POLLS_IMPORT_BATCH_SIZE=2):
+            response, lines = self.post(json.dumps({'polls': payload}))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(lines[-1], {'status': 'ok', 'rows': 5, 'invalid': 0, 'created': 5})
+        poll = Poll.objects.get(id=lines[0]['id'])
+        self.assertEqual(poll.title, 'Poll 0')
+        self.assertEqual(list(poll.options.values_list('text', flat=True)), ['Satu', 'Dua', 'Tiga'])
+
+    def test_csv_import(self):
+        body = 'title,description,is_active,options\nKopi?,,tidak,Arabika|Robusta\n'
+
+        response, lines = self.post(body, content_type='text/csv')
+
+        self.assertEqual(lines[-1]['created'], 1)
+        poll = Poll.objects.get()
+        self.assertFalse(poll.is_active)
+        self.assertEqual(poll.options.count(), 2)
+
+    def test_invalid_rows_are_reported_and_nothing_is_created(self):
+        payload = [
+            {'title': 'Valid', 'options': ['A', 'B']},
+            {'title': '', 'options': ['A']},
+        ]
+
+        response, lines = self.post(json.dumps(payload))
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(lines[0]['row'], 2)
+        self.assertEqual(len(lines[0]['errors']), 2)
+        self.assertEqual(lines[-1]['status'], 'invalid')
+        self.assertFalse(Poll.objects.exists())
+
+    def test_non_staff_is_rejected(self):
+        self.client.force_login(get_user_model().objects.create_user('biasa', password='pw'))
+
+        response = self.client.post(self.url, data='[]', content_type='application/json')
+
+        self.assertEqual(response.status_code, 403)
+
+    def test_management_command(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as fh:
+            fh.write('title,options\nA?,Ya|Tidak\nB?,Ya|Tidak\n')
+        self.addCleanup(os.unlink, fh.name)
+
+        call_command('import_polls', fh.name, stdout=StringIO())
+
+        self.assertEqual(Poll.objects.count(), 2)
+        self.assertEqual(Option.objects.count(), 4)
+
+
+class VoteExportTests(PollTestMixin, TestCase):
+    def setUp(self):
+        self.client.force_login(get_user_model().objects.create_user('auditor', password='pw', is_staff=True))
+        self.poll = self.create_poll()
+        sate = self.poll.options.first()
+        for i in range(5):
+            Vote.objects.create(poll=self.poll, option=sate, ip_address=f'10.0.0.{i}', user_agent='Tes, "UA"')
+        self.url = reverse('polls:export_votes', kwargs={'poll_id': self.poll.id})
+
+    def test_csv_export_streams_every_vote(self):
+        response = self.client.get(self.url)
+
+        self.assertTrue(response.streaming)
+        self.assertIn('attachment', response['Content-Disposition'])
+        rows = list(csv.DictReader(b''.join(response.streaming_content).decode().splitlines()))
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(rows[0]['option'], 'Sate')
+        self.assertEqual(rows[0]['user_agent'], 'Tes, "UA"')
+
+    def test_gzip_ndjson_export(self):
+        response = self.client.get(self.url, {'format': 'ndjson', 'gzip': '1'})
+
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+        lines = gzip.decompress(b''.join(response.streaming_content)).decode().splitlines()
+        self.assertEqual({json.loads(line)['ip_address'] for line in lines}, {f'10.0.0.{i}' for i in range(5)})
+
+    def test_export_reads_votes_with_chunked_iterator(self):
+        with mock.patch('django.db.models.query.QuerySet.iterator', autospec=True,
+                        side_effect=lambda qs, chunk_size=None: iter(qs)) as iterator:
+            b''.join(self.client.get(self.url).streaming_content)
+
+        self.assertEqual(iterator.call_args.kwargs['chunk_size'], 2000)
+
+    async def test_asgi_export_is_streamed_asynchronously(self):
+        await self.async_client.aforce_login(await get_user_model().objects.aget(username='auditor'))
+
+        response = await self.async_client.get(self.url, {'format': 'ndjson'})
+
+        self.assertTrue(response.is_async)
+        body = b''.join([chunk async for chunk in response.streaming_content])
+        self.assertEqual(len(body.splitlines()), 5)
+
+    def test_non_staff_is_rejected(self):
+        self.client.logout()
+
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+    def test_management_command_writes_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'votes.csv.gz')
+            call_command('export_votes', str(self.poll.id), '--gzip', '-o', path, stderr=StringIO())
+            with gzip.open(path, 'rt') as fh:
+                self.assertEqual(len(list(csv.DictReader(fh))), 5)
+
+
+class VoteArchiveTests(PollTestMixin, TestCase):
+    def setUp(self):
+        self.archive_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.archive_dir)
+        override = override_settings(POLLS_ARCHIVE={'DIR': self.archive_dir, 'BATCH_SIZE': 2})
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.poll = self.create_poll()
+        self.sate, self.rendang, _ = self.poll.options.all()
+        for i in range(5):
+            self.cast_vote(self.poll, self.sate if i < 3 else self.rendang, ip=f'10.0.0.{i}')
+        self.poll.is_active = False
+        self.poll.save()
+        self.original = sorted(Vote.objects.values_list('id', 'option_id', 'voter_key', 'created_at'))
+
+    def test_archive_moves_votes_and_keeps_counters(self):
+        deleted = archive.archive_poll(self.poll)
+
+        self.assertEqual(deleted, 5)
+        self.assertFalse(Vote.objects.filter(poll=self.poll).exists())
+        self.assertTrue(archive.archive_path(self.poll.id).exists())
+        self.poll.refresh_from_db()
+        self.assertIsNotNone(self.poll.archived_at)
+        self.assertEqual(self.poll.total_votes, 5)
+
+        # Counter beku tidak disentuh oleh rebuild
+        call_command('rebuild_vote_counts', '--check', stdout=StringIO())
+        rebuild_rollups()
+        self.assertEqual(VoteRollup.objects.get(option=self.sate, resolution=60).count, 3)
+
+    def test_results_of_archived_poll_come_from_frozen_counters(self):
+        url = reverse('polls:results_api', kwargs={'poll_id': self.poll.id})
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+        archive.archive_poll(self.poll)
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 200)
+        results = {row['text']: row['votes'] for row in response.json()['results']}
+        self.assertEqual(results['Sate'], 3)
+        self.assertEqual(results['Rendang'], 2)
+
+    def test_restore_brings_back_identical_votes(self):
+        archive.archive_poll(self.poll)
+        self.poll.refresh_from_db()
+
+        restored = archive.restore_poll(self.poll)
+
+        self.assertEqual(restored, 5)
+        self.assertEqual(
+            sorted(Vote.objects.values_list('id', 'option_id', 'voter_key', 'created_at')), self.original,
+        )
+        self.poll.refresh_from_db()
+        self.assertIsNone(self.poll.archived_at)
+        self.assertFalse(archive.archive_path(self.poll.id).exists())
+
+    def test_restore_counts_only_inserted_votes(self):
+        kept = Vote.objects.filter(poll=self.poll).order_by('pk').first()
+        archive.archive_poll(self.poll)
+        self.poll.refresh_from_db()
+        # Sisa restore sebelumnya yang terputus
+        created_at = kept.created_at
+        Vote.objects.bulk_create([kept])
+        Vote.objects.filter(pk=kept.pk).update(created_at=created_at)
+
+        restored = archive.restore_poll(self.poll)
+
+        self.assertEqual(restored, 4)
+        self.assertEqual(
+            sorted(Vote.objects.values_list('id', 'option_id', 'voter_key', 'created_at')), self.original,
+        )
+
+    def test_active_poll_cannot_be_archived(self):
+        poll = self.create_poll(title='Masih buka')
+
+        with self.assertRaises(archive.ArchiveError):
+            archive.archive_poll(poll)
+
+    def test_command_archives_old_closed_polls(self):
+        Poll.objects.filter(pk=self.poll.pk).update(updated_at=timezone.now() - timedelta(days=40))
+
+        call_command('archive_polls', '--closed-days', '30', stdout=StringIO())
+
+        self.assertEqual(Vote.objects.count(), 0)
+        call_command('archive_polls', '--poll', str(self.poll.id), '--restore', stdout=StringIO())
+        self.assertEqual(Vote.objects.count(), 5)
+
+
+class VoteIdTests(PollTestMixin, TestCase):
+    def test_uuid7_is_time_ordered_and_versioned(self):
+        generated = [ids.uuid7() for _ in range(5000)]
+
+        self.assertEqual(generated, sorted(generated))
+        self.assertEqual(len(set(generated)), 5000)
+        self.assertTrue(all(value.version == 7 and value.variant == uuid.RFC_4122 for value in generated))
+
+    def test_vote_id_strategy_follows_setting(self):
+        poll = self.create_poll()
+
+        with override_settings(POLLS_VOTE_ID='uuid4'):
+            old = Vote.objects.create(option=poll.options.first(), ip_address='10.0.0.1')
+        new = json.loads(self.cast_vote(poll, poll.options.first(), ip='10.0.0.2').content)['vote_id']
+
+        self.assertEqual(old.id.version, 4)
+        self.assertEqual(uuid.UUID(new).version, 7)
+        # Vote lama tetap bisa dicari dengan id aslinya
+        self.assertTrue(Vote.objects.filter(id=old.id).exists())
+
+
+class DatabaseProfileTests(TestCase):
+    def pragma(self, raw, name):
+        return raw.execute(f'PRAGMA {name}').fetchone()[0]
+
+    def test_new_connections_get_sqlite_pragmas(self):
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA busy_timeout')
+            self.assertEqual(cursor.fetchone()[0], 20_000)
+
+    def test_file_database_switches_to_wal(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            raw = sqlite3.connect(os.path.join(tmp, 'db.sqlite3'))
+            dbtuning.configure_connection(None, mock.Mock(vendor='sqlite', connection=raw))
+
+            self.assertEqual(self.pragma(raw, 'journal_mode'), 'wal')
+            self.assertEqual(self.pragma(raw, 'synchronous'), 1)
+            raw.close()
+
+    @override_settings(POLLS_DB_PROFILE={'ENABLED': False})
+    def test_disabled_profile_leaves_connection_untouched(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            raw = sqlite3.connect(os.path.join(tmp, 'db.sqlite3'))
+            dbtuning.configure_connection(None, mock.Mock(vendor='sqlite', connection=raw))
+
+            self.assertEqual(self.pragma(raw, 'journal_mode'), 'delete')
+            raw.close()
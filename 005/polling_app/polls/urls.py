@@ -16,6 +16,10 @@ urlpatterns = [
     # API endpoints
     path('api/vote/<uuid:poll_id>/', views.vote, name='vote_api'),
     path('api/results/<uuid:poll_id>/', views.poll_results_api, name='results_api'),
+    path('api/results/<uuid:poll_id>/timeline/', views.poll_timeline_api, name='timeline_api'),
+    path('api/stats/', views.cache_stats, name='cache_stats'),
+    path('api/polls/import/', views.import_polls, name='import_polls'),
+    path('api/export/<uuid:poll_id>/votes/', views.export_votes, name='export_votes'),
     
     # Server-Sent Events untuk real-time updates
     path('stream/<uuid:poll_id>/', views.poll_stream, name='stream'),
@@ -1,19 +1,60 @@
-from django.shortcuts import render, get_object_or_404, redirect
-from django.http import JsonResponse, HttpResponse
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.shortcuts import render, get_object_or_404, aget_object_or_404, redirect
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, HttpResponse, HttpResponseNotModified, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 from django.contrib import messages
 from django.db import transaction
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.http import parse_etags
+from datetime import timedelta, timezone as dt_timezone
+from itertools import chain
+import io
 import json
+import time
 import uuid
+from . import exporter, importer, live, ratelimit, results_cache, rollups
+from .ingest import get_vote_buffer
 from .models import Poll, Option, Vote
+from .pagination import InvalidCursor, KeysetPaginator
+from .services import cast_vote, AlreadyVoted
+from .snapshot import PollSnapshot
+from .voters import voted_set
+
+
+# Urutan yang tersedia di halaman utama; id sebagai penentu agar kunci unik
+INDEX_ORDERINGS = {
+    'new': ('-created_at', '-id'),
+    'votes': ('-total_votes', '-created_at', '-id'),
+}
 
 
 def index(request):
-    """Halaman utama dengan daftar poll"""
-    polls = Poll.objects.filter(is_active=True).order_by('-created_at')[:10]
-    return render(request, 'polls/index.html', {'polls': polls})
+    """Halaman utama dengan daftar poll, dipaginasi dengan cursor"""
+    sort = request.GET.get('sort')
+    if sort not in INDEX_ORDERINGS:
+        sort = 'new'
+    # Total vote dari kolom counter, jumlah opsi lewat subquery: satu query per halaman
+    option_count = (
+        Option.objects.filter(poll=OuterRef('pk')).order_by()
+        .values('poll').annotate(n=Count('id')).values('n')
+    )
+    polls = Poll.objects.filter(is_active=True).annotate(
+        option_count=Coalesce(Subquery(option_count), 0),
+    )
+    paginator = KeysetPaginator(
+        polls, INDEX_ORDERINGS[sort], per_page=getattr(settings, 'POLLS_INDEX_PAGE_SIZE', 12),
+    )
+    try:
+        page = paginator.page(after=request.GET.get('after'), before=request.GET.get('before'))
+    except InvalidCursor:
+        page = paginator.page()
+    return render(request, 'polls/index.html', {'polls': page.items, 'page': page, 'sort': sort})
 
 
 def create_poll(request):
@@ -38,12 +79,11 @@ def create_poll(request):
                     description=description
                 )
                 
-                # Buat opsi-opsi
-                for option_text in options:
-                    Option.objects.create(
-                        poll=poll,
-                        text=option_text
-                    )
+                # Buat opsi-opsi dalam satu INSERT
+                Option.objects.bulk_create([
+                    Option(poll=poll, text=option_text, position=position)
+                    for position, option_text in enumerate(options)
+                ])
                 
                 messages.success(request, f'Poll "{title}" berhasil dibuat!')
                 return redirect('polls:detail', poll_id=poll.id)
@@ -58,15 +98,16 @@ def poll_detail(request, poll_id):
     """View untuk menampilkan detail poll dan form voting"""
     poll = get_object_or_404(Poll, id=poll_id, is_active=True)
     
-    # Cek apakah user sudah vote
+    # Cek apakah user sudah vote (memakai index unik poll + voter_key)
     user_ip = get_client_ip(request)
     has_voted = Vote.objects.filter(
-        option__poll=poll,
-        ip_address=user_ip
+        poll=poll,
+        voter_key=get_voter_key(request)
     ).exists()
     
     context = {
         'poll': poll,
+        'snapshot': PollSnapshot.build(poll),
         'has_voted': has_voted,
         'user_ip': user_ip
     }
@@ -76,11 +117,13 @@ def poll_detail(request, poll_id):
 
 @csrf_exempt
 @require_http_methods(["POST"])
+@ratelimit.rate_limit(
+    ip=lambda request, poll_id: get_client_ip(request),
+    poll=lambda request, poll_id: ratelimit.poll_key(poll_id),
+)
 def vote(request, poll_id):
     """API endpoint untuk voting"""
     try:
-        poll = get_object_or_404(Poll, id=poll_id, is_active=True)
-        
         # Parse JSON data
         data = json.loads(request.body)
         option_id = data.get('option_id')
@@ -88,32 +131,47 @@ def vote(request, poll_id):
         if not option_id:
             return JsonResponse({'error': 'Option ID diperlukan'}, status=400)
         
-        option = get_object_or_404(Option, id=option_id, poll=poll)
+        # Opsi dan poll aktifnya diambil dalam satu query
+        option = get_object_or_404(
+            Option.objects.select_related('poll'),
+            id=option_id, poll_id=poll_id, poll__is_active=True
+        )
+        
+        # Pemilih berulang ditolak dari cache di memori tanpa insert; dicek
+        # setelah validasi agar poll_id sembarang tidak mengisi cache
+        voter_key = get_voter_key(request)
+        if voted_set.contains(poll_id, voter_key):
+            return JsonResponse({'error': 'Anda sudah memberikan vote untuk poll ini'}, status=400)
         
         # Dapatkan IP address
         user_ip = get_client_ip(request)
         user_agent = request.META.get('HTTP_USER_AGENT', '')
         
-        # Cek apakah sudah vote
-        existing_vote = Vote.objects.filter(
-            option__poll=poll,
-            ip_address=user_ip
-        ).first()
-        
-        if existing_vote:
+        buffer = get_vote_buffer()
+        try:
+            if buffer is not None:
+                # Mode write-behind: vote disimpan oleh flusher secara batch
+                vote_id = buffer.submit(option, voter_key, user_ip, user_agent)
+            else:
+                # Insert langsung; duplikat ditolak oleh constraint unik
+                vote_id = cast_vote(option, voter_key, user_ip, user_agent).id
+        except AlreadyVoted:
+            voted_set.add(poll_id, voter_key)
             return JsonResponse({'error': 'Anda sudah memberikan vote untuk poll ini'}, status=400)
+        voted_set.add(poll_id, voter_key)
         
-        # Buat vote baru
-        vote = Vote.objects.create(
-            option=option,
-            ip_address=user_ip,
-            user_agent=user_agent
-        )
+        if buffer is not None:
+            return JsonResponse({
+                'success': True,
+                'message': 'Vote diterima dan sedang diproses',
+                'vote_id': str(vote_id),
+                'queued': True
+            }, status=202)
         
         return JsonResponse({
             'success': True,
             'message': 'Vote berhasil disimpan',
-            'vote_id': str(vote.id)
+            'vote_id': str(vote_id)
         })
         
     except json.JSONDecodeError:
@@ -124,75 +182,224 @@ def vote(request, poll_id):
 
 def poll_results_api(request, poll_id):
     """API endpoint untuk mendapatkan hasil poll dalam format JSON"""
-    poll = get_object_or_404(Poll, id=poll_id, is_active=True)
+    poll = None
+    version = results_cache.get_version(poll_id)
+    if version is None:
+        # Versi hanya dibuat untuk poll yang ada (lihat polls.results_cache)
+        poll = get_object_or_404(Poll.objects.with_results(), id=poll_id)
+        version = results_cache.create_version(poll_id)
+    etag = results_cache.make_etag(poll_id, version)
     
-    results = []
-    total_votes = poll.total_votes()
+    # Poll tidak berubah sejak request terakhir klien: cukup satu lookup cache
+    if etag in parse_etags(request.headers.get('If-None-Match', '')):
+        response = HttpResponseNotModified()
+    else:
+        body = results_cache.get_body(poll_id, version)
+        if body is None:
+            if poll is None:
+                poll = get_object_or_404(Poll.objects.with_results(), id=poll_id)
+            body = json.dumps(PollSnapshot.build(poll).as_dict())
+            results_cache.set_body(poll_id, version, body)
+        response = HttpResponse(body, content_type='application/json')
     
-    for option in poll.options.all():
-        vote_count = option.vote_count()
-        percentage = option.vote_percentage()
-        
-        results.append({
-            'id': str(option.id),
-            'text': option.text,
-            'votes': vote_count,
-            'percentage': percentage
-        })
+    response['ETag'] = etag
+    response['Cache-Control'] = 'no-cache'
+    return response
+
+
+def poll_timeline_api(request, poll_id):
+    """
+    API jumlah vote per opsi per bucket waktu, dibaca dari rollup.
+    
+    Parameter query: ``resolution`` (mis. ``1m``, ``1h``), ``since`` dan
+    ``until`` (ISO 8601). Default: 60 bucket terakhir hingga sekarang.
+    """
+    poll = get_object_or_404(Poll.objects.with_results(), id=poll_id)
+    resolutions = rollups.active_resolutions()
+    if not resolutions:
+        return JsonResponse({'error': 'Rollup tidak aktif (POLLS_ROLLUP_RESOLUTIONS kosong)'}, status=400)
+    label = request.GET.get('resolution') or next(iter(resolutions))
+    if label not in resolutions:
+        return JsonResponse(
+            {'error': f'Resolusi tidak dikenal, gunakan salah satu dari: {", ".join(resolutions)}'},
+            status=400,
+        )
+    resolution = resolutions[label]
+    
+    try:
+        until = parse_timeline_datetime(request.GET.get('until')) or timezone.now()
+        since = parse_timeline_datetime(request.GET.get('since')) or until - timedelta(seconds=resolution * 60)
+    except ValueError:
+        return JsonResponse({'error': 'Format waktu tidak valid, gunakan ISO 8601'}, status=400)
+    if since >= until:
+        return JsonResponse({'error': 'since harus lebih awal dari until'}, status=400)
+    
+    max_buckets = getattr(settings, 'POLLS_TIMELINE_MAX_BUCKETS', 1440)
+    if (until - since).total_seconds() / resolution > max_buckets:
+        return JsonResponse(
+            {'error': f'Rentang terlalu panjang, maksimal {max_buckets} bucket; gunakan resolusi lebih besar'},
+            status=400,
+        )
     
+    since = rollups.bucket_start(since, resolution)
     return JsonResponse({
         'poll_id': str(poll.id),
-        'title': poll.title,
-        'total_votes': total_votes,
-        'results': results,
-        'timestamp': timezone.now().isoformat()
+        'resolution': label,
+        'since': since.isoformat(),
+        'until': until.isoformat(),
+        'options': [
+            {'id': str(option_id), 'text': text}
+            for option_id, text in poll.options.values_list('id', 'text')
+        ],
+        'buckets': rollups.timeline(poll, resolution, since, until),
     })
 
 
-def poll_stream(request, poll_id):
-    """Server-Sent Events endpoint untuk real-time updates"""
-    poll = get_object_or_404(Poll, id=poll_id, is_active=True)
+def parse_timeline_datetime(value):
+    """ISO 8601 ke datetime aware (UTC jika tanpa zona); None jika kosong"""
+    if not value:
+        return None
+    parsed = parse_datetime(value)
+    if parsed is None:
+        raise ValueError(value)
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed, dt_timezone.utc)
+    return parsed
+
+
+async def poll_stream(request, poll_id):
+    """
+    Server-Sent Events endpoint untuk real-time updates.
     
-    def event_stream():
-        """Generator untuk SSE"""
-        import time
-        
-        while True:
-            # Dapatkan data terbaru
-            results = []
-            total_votes = poll.total_votes()
-            
-            for option in poll.options.all():
-                vote_count = option.vote_count()
-                percentage = option.vote_percentage()
-                
-                results.append({
-                    'id': str(option.id),
-                    'text': option.text,
-                    'votes': vote_count,
-                    'percentage': percentage
-                })
-            
-            data = {
-                'poll_id': str(poll.id),
-                'title': poll.title,
-                'total_votes': total_votes,
-                'results': results,
-                'timestamp': timezone.now().isoformat()
-            }
-            
-            yield f"data: {json.dumps(data)}\n\n"
-            time.sleep(2)  # Update setiap 2 detik
-    
-    response = HttpResponse(event_stream(), content_type='text/event-stream')
+    Event pertama berupa snapshot penuh, berikutnya hanya delta opsi yang
+    berubah. Klien yang reconnect mengirim ``Last-Event-ID`` (atau query
+    ``last_event_id``) untuk melanjutkan dari event terakhir yang diterima.
+    """
+    poll = await aget_object_or_404(Poll, id=poll_id, is_active=True)
+    last_event_id = get_last_event_id(request)
+    
+    # Mode push hanya bisa dipakai di server ASGI dengan channel layer;
+    # selain itu kembali ke polling berkala.
+    if isinstance(request, ASGIRequest) and get_channel_layer() is not None:
+        stream = live.stream(poll, last_event_id)
+    else:
+        stream = polling_event_stream(poll)
+    
+    response = StreamingHttpResponse(stream, content_type='text/event-stream')
     response['Cache-Control'] = 'no-cache'
-    response['Connection'] = 'keep-alive'
     response['Access-Control-Allow-Origin'] = '*'
-    response['Access-Control-Allow-Headers'] = 'Cache-Control'
+    response['Access-Control-Allow-Headers'] = 'Cache-Control, Last-Event-ID'
     
     return response
 
 
+def polling_event_stream(poll):
+    """Generator SSE sinkron untuk server WSGI (query setiap 2 detik)"""
+    data = PollSnapshot.build(poll).as_dict()
+    yield live.snapshot_event(data)
+    counts = live.counts_of(data)
+    while True:
+        time.sleep(2)
+        data = PollSnapshot.build(poll).as_dict()
+        delta = live.make_delta(counts, data)
+        if delta['changes']:
+            counts = live.counts_of(data)
+            yield live.sse_event(delta, event='delta', event_id=data['sequence'])
+        else:
+            yield ": keep-alive\n\n"
+
+
+def get_last_event_id(request):
+    """ID event SSE terakhir yang diterima klien, atau None"""
+    value = request.headers.get('Last-Event-ID') or request.GET.get('last_event_id')
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def cache_stats(request):
+    """API endpoint statistik cache di memori proses ini, untuk tuning"""
+    return JsonResponse({
+        'voted_set': voted_set.stats(),
+    })
+
+
+@require_http_methods(["POST"])
+def import_polls(request):
+    """
+    API import poll massal (khusus staff), lihat ``polls.importer``.
+    
+    Format dari query ``format`` (``json``/``csv``) atau Content-Type. Respon
+    berupa NDJSON yang di-stream: satu baris per poll (``id``) atau per baris
+    yang tidak valid (``errors``), diakhiri baris ringkasan.
+    """
+    if not (request.user.is_active and request.user.is_staff):
+        return JsonResponse({'error': 'Hanya staff yang boleh mengimpor poll'}, status=403)
+    
+    fmt = request.GET.get('format')
+    if fmt is None:
+        fmt = 'csv' if request.content_type in ('text/csv', 'application/csv') else 'json'
+    try:
+        # Dibaca dari stream request, tidak dibatasi DATA_UPLOAD_MAX_MEMORY_SIZE
+        rows = importer.read_rows(io.BytesIO(request.read()), fmt)
+    except importer.PayloadError as e:
+        return JsonResponse({'error': f'Payload tidak valid: {e}'}, status=400)
+    
+    max_rows = getattr(settings, 'POLLS_IMPORT_MAX_ROWS', 50_000)
+    if len(rows) > max_rows:
+        return JsonResponse({'error': f'Maksimal {max_rows} poll per import'}, status=400)
+    
+    poll_rows, invalid = importer.validate_rows(rows)
+    if invalid:
+        lines = (
+            json.dumps({'row': row, 'errors': errors}) + '\n' for row, errors in invalid
+        )
+        summary = {'status': 'invalid', 'rows': len(rows), 'invalid': len(invalid), 'created': 0}
+        return StreamingHttpResponse(
+            chain(lines, [json.dumps(summary) + '\n']),
+            content_type='application/x-ndjson', status=400,
+        )
+    
+    batch_size = getattr(settings, 'POLLS_IMPORT_BATCH_SIZE', 500)
+    
+    def results():
+        created = 0
+        for row, poll_id in importer.create_polls(poll_rows, batch_size=batch_size):
+            created += 1
+            yield json.dumps({'row': row, 'id': str(poll_id)}) + '\n'
+        yield json.dumps({'status': 'ok', 'rows': len(rows), 'invalid': 0, 'created': created}) + '\n'
+    
+    return StreamingHttpResponse(results(), content_type='application/x-ndjson')
+
+
+@require_http_methods(["GET"])
+def export_votes(request, poll_id):
+    """
+    Export seluruh vote sebuah poll untuk audit (khusus staff).
+    
+    Query ``format`` = ``csv`` (default) atau ``ndjson``; ``gzip=1`` untuk
+    mengompresi on the fly. Vote di-stream dari DB per chunk.
+    """
+    if not (request.user.is_active and request.user.is_staff):
+        return JsonResponse({'error': 'Hanya staff yang boleh mengekspor vote'}, status=403)
+    
+    fmt = request.GET.get('format', 'csv')
+    if fmt not in exporter.FORMATS:
+        return JsonResponse({'error': f'Format harus salah satu dari: {", ".join(exporter.FORMATS)}'}, status=400)
+    compress = request.GET.get('gzip') in ('1', 'true')
+    poll = get_object_or_404(Poll, id=poll_id)
+    
+    chunks = exporter.export_votes(poll.id, fmt, compress=compress)
+    if isinstance(request, ASGIRequest):
+        chunks = exporter.aiter_blocks(chunks)
+    response = StreamingHttpResponse(
+        chunks, content_type='application/gzip' if compress else exporter.CONTENT_TYPES[fmt],
+    )
+    response['Content-Disposition'] = f'attachment; filename="{exporter.filename(poll.id, fmt, compress)}"'
+    return response
+
+
 def get_client_ip(request):
     """Helper function untuk mendapatkan IP address client"""
     x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
@@ -202,3 +409,8 @@ def get_client_ip(request):
         ip = request.META.get('REMOTE_ADDR')
     return ip
 
+
+def get_voter_key(request):
+    """Kunci pemilih yang dipakai untuk membatasi satu vote per poll"""
+    return get_client_ip(request)
+
@@ -0,0 +1,126 @@
+"""
+Cache di memori berisi kunci pemilih yang sudah vote, per poll.
+
+Dipakai untuk menolak vote berulang sebelum menyentuh DB. Hanya hasil
+positif yang dipercaya: kunci yang tidak ada di cache tetap melewati
+constraint unik ``(poll, voter_key)`` di DB, sehingga cache yang belum
+lengkap (mis. dari proses lain) tidak pernah menerima vote ganda.
+
+Set per poll diisi lazily dari tabel Vote saat pertama kali dibutuhkan
+(maksimal ``WARM_LIMIT`` kunci) dan diperbarui setiap vote diterima.
+Jumlah poll yang disimpan dibatasi ``MAX_POLLS`` dengan urutan LRU.
+"""
+import threading
+import uuid
+from collections import OrderedDict
+
+from django.conf import settings
+
+from .models import Vote
+
+DEFAULTS = {
+    'MAX_POLLS': 1000,
+    'WARM_LIMIT': 100_000,
+}
+
+
+def _poll_key(poll_id):
+    """Kunci poll yang sama untuk ``uuid.UUID`` maupun string"""
+    return poll_id if isinstance(poll_id, uuid.UUID) else uuid.UUID(str(poll_id))
+
+
+class VotedSetCache:
+    """Set kunci pemilih per poll dengan counter hit/miss"""
+
+    def __init__(self, max_polls=1000, warm_limit=100_000):
+        self.max_polls = max_polls
+        self.warm_limit = warm_limit
+        self.hits = 0
+        self.misses = 0
+        self._polls = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _keys_for(self, poll_id):
+        poll_id = _poll_key(poll_id)
+        with self._lock:
+            keys = self._polls.get(poll_id)
+            if keys is not None:
+                self._polls.move_to_end(poll_id)
+                return keys
+
+        keys = set(
+            Vote.objects.filter(poll_id=poll_id)
+            .values_list('voter_key', flat=True)[:self.warm_limit]
+        )
+        with self._lock:
+            # Thread lain mungkin sudah mengisi lebih dulu
+            keys = self._polls.setdefault(poll_id, keys)
+            self._polls.move_to_end(poll_id)
+            while len(self._polls) > self.max_polls:
+                self._polls.popitem(last=False)
+        return keys
+
+    def contains(self, poll_id, voter_key):
+        """
+        True jika ``voter_key`` pasti sudah vote di ``poll_id``. Panggil
+        setelah poll divalidasi agar id sembarang tidak ikut di-warm.
+        """
+        keys = self._keys_for(poll_id)
+        with self._lock:
+            found = voter_key in keys
+            if found:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return found
+
+    def add(self, poll_id, voter_key):
+        """Mencatat vote yang diterima"""
+        keys = self._keys_for(poll_id)
+        with self._lock:
+            keys.add(voter_key)
+
+    def discard(self, poll_id, voter_key):
+        """Menghapus kunci, mis. setelah vote dihapus"""
+        with self._lock:
+            keys = self._polls.get(_poll_key(poll_id))
+            if keys is not None:
+                keys.discard(voter_key)
+
+    def forget(self, poll_id):
+        """Membuang seluruh set untuk sebuah poll"""
+        with self._lock:
+            self._polls.pop(_poll_key(poll_id), None)
+
+    def stats(self):
+        with self._lock:
+            keys = sum(len(keys) for keys in self._polls.values())
+            polls = len(self._polls)
+            hits, misses = self.hits, self.misses
+        lookups = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': round(hits / lookups, 4) if lookups else 0,
+            'polls': polls,
+            'keys': keys,
+        }
+
+
+_config = {**DEFAULTS, **getattr(settings, 'POLLS_VOTED_SET', {})}
+voted_set = VotedSetCache(max_polls=_config['MAX_POLLS'], warm_limit=_config['WARM_LIMIT'])
+
+
+def voted_set_metrics():
+    """Baris metrik Prometheus untuk ``/metrics``"""
+    stats = voted_set.stats()
+    return [
+        '# TYPE polls_voted_set_hits_total counter',
+        f'polls_voted_set_hits_total {stats["hits"]}',
+        '# TYPE polls_voted_set_misses_total counter',
+        f'polls_voted_set_misses_total {stats["misses"]}',
+        '# TYPE polls_voted_set_polls gauge',
+        f'polls_voted_set_polls {stats["polls"]}',
+        '# TYPE polls_voted_set_keys gauge',
+        f'polls_voted_set_keys {stats["keys"]}',
+    ]
@@ -0,0 +1,9 @@
+"""
+Modul yang dipakai bersama oleh proyek ``polling`` dan ``polling_app`` di
+folder 005: instrumentasi ``/metrics`` (``polls_common.metrics``) dan
+tuning koneksi database (``polls_common.dbtuning``).
+
+Paket ini dipasang ke virtualenv lewat ``005/pyproject.toml``
+(``pip install -e 005``) agar bisa diimpor dari ``manage.py``, ASGI/WSGI,
+maupun benchmark.
+"""
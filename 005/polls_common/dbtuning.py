@@ -0,0 +1,60 @@
+"""
+Profil tuning database yang diterapkan ke setiap koneksi baru lewat
+signal ``connection_created``.
+
+SQLite: WAL (pembaca tidak memblokir penulis), ``synchronous=NORMAL``
+(aman di WAL, tanpa fsync per commit), ``busy_timeout`` agar penulis
+bersamaan menunggu alih-alih gagal "database is locked", dan ``mmap_size``.
+PostgreSQL: parameter sesi dari ``POSTGRES_SETTINGS``.
+
+Konfigurasi lewat ``settings.POLLS_DB_PROFILE``; key yang diisi menggantikan
+default-nya secara utuh::
+
+    POLLS_DB_PROFILE = {
+        'ENABLED': True,
+        'SQLITE_PRAGMAS': {'journal_mode': 'WAL', 'synchronous': 'NORMAL', ...},
+        'POSTGRES_SETTINGS': {'idle_in_transaction_session_timeout': '60s'},
+    }
+
+Persistent connection (``CONN_MAX_AGE``/``CONN_HEALTH_CHECKS``) dan
+``transaction_mode`` SQLite diatur langsung di ``DATABASES``.
+"""
+from django.conf import settings
+
+DEFAULTS = {
+    'ENABLED': True,
+    'SQLITE_PRAGMAS': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': 20_000,
+        'mmap_size': 256 * 1024 * 1024,
+        'temp_store': 'MEMORY',
+    },
+    'POSTGRES_SETTINGS': {
+        # Transaksi yang lupa ditutup tidak menahan lock selamanya
+        'idle_in_transaction_session_timeout': '60s',
+    },
+}
+
+
+def get_profile():
+    return {**DEFAULTS, **getattr(settings, 'POLLS_DB_PROFILE', {})}
+
+
+def configure_connection(sender, connection, **kwargs):
+    """Receiver ``connection_created``"""
+    profile = get_profile()
+    if not profile['ENABLED']:
+        return
+    # Memakai koneksi DB-API langsung: bukan query request, jadi tidak
+    # ikut dihitung metrik atau assertNumQueries
+    raw = connection.connection
+    if connection.vendor == 'sqlite':
+        for name, value in profile['SQLITE_PRAGMAS'].items():
+            if not name.isidentifier():
+                raise ValueError(f'Nama PRAGMA tidak valid: {name!r}')
+            raw.execute(f'PRAGMA {name} = {value}')
+    elif connection.vendor == 'postgresql':
+        with raw.cursor() as cursor:
+            for name, value in profile['POSTGRES_SETTINGS'].items():
+                cursor.execute('SELECT set_config(%s, %s, false)', [name, str(value)])
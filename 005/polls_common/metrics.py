@@ -0,0 +1,218 @@
+"""
+Instrumentasi per view: latency, jumlah query SQL, total waktu SQL dan
+ukuran respon, disimpan sebagai histogram di memori proses dan diekspos
+di ``/metrics`` dalam format teks Prometheus.
+
+Opsional, request yang lebih lambat dari ``SLOW_REQUEST_MS`` dicatat ke
+logger ``polls.metrics.slow`` beserta SQL dari ``SLOW_QUERY_COUNT`` query
+paling lambat::
+
+    POLLS_METRICS = {
+        'SLOW_REQUEST_MS': 500,
+        'SLOW_QUERY_COUNT': 5,
+    }
+"""
+import contextvars
+import heapq
+import logging
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse
+
+logger = logging.getLogger('polls.metrics.slow')
+
+DEFAULTS = {
+    'SLOW_REQUEST_MS': None,
+    'SLOW_QUERY_COUNT': 5,
+}
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+
+class Histogram:
+    """Histogram kumulatif bergaya Prometheus dengan satu label ``view``"""
+
+    def __init__(self, name, help_text, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, view, value):
+        with self._lock:
+            series = self._series.get(view)
+            if series is None:
+                series = self._series[view] = [[0] * len(self.buckets), 0.0, 0]
+            counts = series[0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            series = sorted((view, list(counts), total, count)
+                            for view, (counts, total, count) in self._series.items())
+        for view, counts, total, count in series:
+            label = f'view="{_escape(view)}"'
+            for bound, bucket_count in zip(self.buckets, counts):
+                lines.append(f'{self.name}_bucket{{{label},le="{bound}"}} {bucket_count}')
+            lines.append(f'{self.name}_bucket{{{label},le="+Inf"}} {count}')
+            lines.append(f'{self.name}_sum{{{label}}} {total}')
+            lines.append(f'{self.name}_count{{{label}}} {count}')
+        return lines
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+request_latency = Histogram(
+    'polls_http_request_duration_seconds', 'Latency request per view.', LATENCY_BUCKETS)
+request_queries = Histogram(
+    'polls_http_request_queries', 'Jumlah query SQL per request.', QUERY_BUCKETS)
+request_sql_time = Histogram(
+    'polls_http_request_sql_duration_seconds', 'Total waktu SQL per request.', LATENCY_BUCKETS)
+response_size = Histogram(
+    'polls_http_response_size_bytes', 'Ukuran body respon (non-streaming).', SIZE_BUCKETS)
+
+HISTOGRAMS = [request_latency, request_queries, request_sql_time, response_size]
+
+# Fungsi tambahan yang mengembalikan baris metrik (counter/gauge milik modul lain)
+_collectors = []
+
+
+def register_collector(collector):
+    _collectors.append(collector)
+    return collector
+
+
+class QueryRecorder:
+    """Mencatat jumlah dan durasi query untuk satu request"""
+
+    def __init__(self, keep_slowest=0):
+        self.count = 0
+        self.duration = 0.0
+        self.keep_slowest = keep_slowest
+        self.slowest = []
+
+    def record(self, sql, duration):
+        self.count += 1
+        self.duration += duration
+        if self.keep_slowest:
+            entry = (duration, self.count, sql)
+            if len(self.slowest) < self.keep_slowest:
+                heapq.heappush(self.slowest, entry)
+            else:
+                heapq.heappushpop(self.slowest, entry)
+
+
+# Recorder milik request yang sedang berjalan. ContextVar ikut terbawa ke
+# thread sync_to_async, jadi query dari view sync di bawah ASGI tetap
+# tercatat pada request asalnya.
+_current_recorder = contextvars.ContextVar('polls_query_recorder', default=None)
+
+
+def _record_query(execute, sql, params, many, context):
+    recorder = _current_recorder.get()
+    if recorder is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        recorder.record(sql, time.perf_counter() - start)
+
+
+def _install_wrapper(connection):
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+def _on_connection_created(sender, connection, **kwargs):
+    _install_wrapper(connection)
+
+
+class MetricsMiddleware:
+    """Middleware pencatat metrik; letakkan paling atas di ``MIDDLEWARE``"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.config = {**DEFAULTS, **getattr(settings, 'POLLS_METRICS', {})}
+        connection_created.connect(_on_connection_created, dispatch_uid='polls.metrics')
+        for connection in connections.all(initialized_only=True):
+            _install_wrapper(connection)
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        recorder, token, start = self._begin()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current_recorder.reset(token)
+        self._finish(request, response, recorder, start)
+        return response
+
+    async def __acall__(self, request):
+        recorder, token, start = self._begin()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current_recorder.reset(token)
+        self._finish(request, response, recorder, start)
+        return response
+
+    def _begin(self):
+        keep = self.config['SLOW_QUERY_COUNT'] if self.config['SLOW_REQUEST_MS'] is not None else 0
+        recorder = QueryRecorder(keep_slowest=keep)
+        return recorder, _current_recorder.set(recorder), time.perf_counter()
+
+    def _finish(self, request, response, recorder, start):
+        latency = time.perf_counter() - start
+        match = request.resolver_match
+        view = match.view_name if match is not None else 'unmatched'
+
+        request_latency.observe(view, latency)
+        request_queries.observe(view, recorder.count)
+        request_sql_time.observe(view, recorder.duration)
+        if not response.streaming:
+            response_size.observe(view, len(response.content))
+
+        slow_ms = self.config['SLOW_REQUEST_MS']
+        if slow_ms is not None and latency * 1000 >= slow_ms:
+            slowest = sorted(recorder.slowest, reverse=True)
+            logger.warning(
+                'Request lambat %s %s (%s): %.1f ms, %d query, SQL %.1f ms\n%s',
+                request.method, request.path, view, latency * 1000,
+                recorder.count, recorder.duration * 1000,
+                '\n'.join(f'  {duration * 1000:.1f} ms: {sql}' for duration, _, sql in slowest),
+            )
+
+
+def render_metrics():
+    lines = []
+    for histogram in HISTOGRAMS:
+        lines.extend(histogram.render())
+    for collector in _collectors:
+        lines.extend(collector())
+    return '\n'.join(lines) + '\n'
+
+
+def metrics_view(request):
+    """Endpoint ``/metrics`` dalam format teks Prometheus"""
+    return HttpResponse(render_metrics(), content_type='text/plain; version=0.0.4; charset=utf-8')